@@ -0,0 +1,143 @@
+"""
+Benchmark de startup: script gerado por f-string (formato antigo do runner)
+contra o harness fixo pré-compilado.
+
+Uso:
+    python benchmarks/harness_startup.py            # interpretador local
+    python benchmarks/harness_startup.py --docker   # imagens python:3.11-alpine x wanda-runner
+
+No modo local o harness roda com `-S -s -E -m wanda_harness` a partir de um
+diretório temporário com o .pyc já gerado (o equivalente ao `-I -S -m` da
+imagem, que não procura módulos no diretório corrente).
+"""
+import argparse
+import compileall
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from wanda_python.runner.harness import HARNESS_VERSION  # noqa: E402
+from wanda_python.runner.protocol import build_job  # noqa: E402
+
+CODE = """\
+def strategy(card1, card2, card3):
+    if card1 == card2:
+        return card3
+    return card1
+"""
+TEST_CASES = [
+    ["pedra", "pedra", "papel"],
+    ["pedra", "papel", "tesoura"],
+    ["papel", "papel", "pedra"],
+    ["tesoura", "tesoura", "papel"],
+    ["pedra", "papel", "papel"],
+    ["tesoura", "papel", "tesoura"],
+    ["papel", "pedra", "pedra"],
+    ["tesoura", "papel", "papel"],
+    ["papel", "tesoura", "tesoura"],
+    ["pedra", "tesoura", "pedra"],
+]
+VALID_RETURNS = ["pedra", "papel", "tesoura"]
+
+
+def build_generated_script(code: str, test_cases: list, valid_returns: list) -> str:
+    # reprodução do antigo _build_run_script do container_runner
+    return f"""\
+import sys
+import json
+
+{code}
+
+test_cases = {test_cases}
+valid_returns = {valid_returns}
+results = []
+
+for i, args in enumerate(test_cases):
+    try:
+        output = strategy(*args)
+        game_valid = output in valid_returns
+        entry = {{
+            "output": output,
+            "valid": True,
+            "gameValid": game_valid
+        }}
+        if not game_valid:
+            entry["fallback"] = "NEXT_AVAILABLE_CARD"
+        results.append(entry)
+    except Exception as e:
+        results.append({{
+            "output": None,
+            "valid": False,
+            "gameValid": False,
+            "error": str(e)
+        }})
+        break
+
+print(json.dumps(results))
+sys.exit(0)
+"""
+
+
+def measure(cmd: list, stdin: str, iterations: int, cwd: str = None) -> list:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = subprocess.run(cmd, input=stdin, capture_output=True, text=True, cwd=cwd)
+        timings.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"Falha ao executar {cmd[:4]}: {result.stderr}")
+    return timings
+
+
+def report(name: str, timings: list) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<40} media={statistics.mean(timings):8.2f}ms  p50={statistics.median(timings):8.2f}ms  p95={p95:8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--docker", action="store_true", help="compara as imagens docker em vez do python local")
+    args = parser.parse_args()
+
+    script = build_generated_script(CODE, TEST_CASES, VALID_RETURNS)
+    job = build_job("run", code=CODE, test_cases=TEST_CASES, valid_returns=VALID_RETURNS) + "\n"
+
+    if args.docker:
+        generated_cmd = ["docker", "run", "--rm", "-i", "python:3.11-alpine", "python", "-"]
+        harness_cmd = ["docker", "run", "--rm", "-i", f"wanda-runner:{HARNESS_VERSION}"]
+        report("script gerado (python:3.11-alpine)", measure(generated_cmd, script, args.iterations))
+        report(f"harness (wanda-runner:{HARNESS_VERSION})", measure(harness_cmd, job, args.iterations))
+        return
+
+    tmpdir = tempfile.mkdtemp(prefix="wanda_bench_")
+    try:
+        shutil.copy(os.path.join(ROOT, "wanda_python", "runner", "harness.py"),
+                    os.path.join(tmpdir, "wanda_harness.py"))
+        compileall.compile_dir(tmpdir, quiet=1)
+
+        report("script gerado (python -)", measure([sys.executable, "-"], script, args.iterations))
+        report("harness (-S -s -E -m wanda_harness)",
+               measure([sys.executable, "-S", "-s", "-E", "-m", "wanda_harness"], job, args.iterations, cwd=tmpdir))
+
+        # confere que as duas saídas são equivalentes
+        generated = json.loads(subprocess.run([sys.executable, "-"], input=script,
+                                              capture_output=True, text=True).stdout)
+        harness = json.loads(subprocess.run([sys.executable, "-S", "-s", "-E", "-m", "wanda_harness"], input=job,
+                                            capture_output=True, text=True, cwd=tmpdir).stdout)
+        assert [r["output"] for r in generated] == [r["output"] for r in harness["results"]]
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
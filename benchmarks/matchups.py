@@ -0,0 +1,76 @@
+"""
+Benchmark da análise de confrontos (games/matchups.py): taxas de vitória de
+todos os pares de uma turma a partir das tabelas-verdade.
+
+Uso:
+    python benchmarks/matchups.py
+    python benchmarks/matchups.py --strategies 400 --repeat 20
+
+As tabelas são sintéticas (saída sorteada em cada entrada, sempre uma carta
+válida): o custo da conta não depende do que a estratégia faz, só do número
+de estratégias, dos rounds e do método. A avaliação das tabelas na sandbox
+fica de fora — ela acontece uma vez por código e vai para o cache.
+"""
+import argparse
+import random
+import statistics
+import sys
+import os
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from wanda_python.games.engine import JOKENPO_CARDS, BITS_CARDS  # noqa: E402
+from wanda_python.games.matchups import (FUNCTION_ARITY, EXACT, MONTE_CARLO, matchup_rates,  # noqa: E402
+                                         strategy_cards)
+from wanda_python.runner.truth_table import INPUT_SPACES  # noqa: E402
+
+SCENARIOS = [
+    ("JOKENPO", "jokenpo1", 5, EXACT),
+    ("JOKENPO", "jokenpo1", 100, EXACT),
+    ("JOKENPO", "jokenpo1", 5, MONTE_CARLO),
+    ("JOKENPO", "jokenpo2", 5, EXACT),
+    ("JOKENPO", "jokenpo2", 100, EXACT),
+    ("JOKENPO", "jokenpo2", 5, MONTE_CARLO),
+    ("BITS", "bits", None, EXACT),
+]
+
+
+def synthetic_cards(function_name: str, strategies: int, rng: random.Random) -> np.ndarray:
+    inputs = INPUT_SPACES[FUNCTION_ARITY[function_name]][0]
+    cards = JOKENPO_CARDS if function_name != "bits" else BITS_CARDS
+    return np.stack([strategy_cards(function_name, [rng.choice(cards) for _ in inputs], inputs)
+                     for _ in range(strategies)])
+
+
+def report(name: str, timings: list) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"  {name:<28} media={statistics.mean(timings):8.1f}ms  p50={statistics.median(timings):8.1f}ms  "
+          f"p95={p95:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--strategies", type=int, default=200, help="estratégias na turma")
+    parser.add_argument("--repeat", type=int, default=10, help="repetições de cada cenário")
+    parser.add_argument("--samples", type=int, default=500, help="partidas por par no Monte Carlo")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"# {args.strategies} estratégias ({args.strategies * args.strategies} pares)")
+    for game, function_name, rounds, method in SCENARIOS:
+        cards = synthetic_cards(function_name, args.strategies, rng)
+        timings = []
+        for seed in range(args.repeat):
+            start = time.perf_counter()
+            matchup_rates(game, function_name, cards, rounds=rounds, method=method, samples=args.samples, seed=seed)
+            timings.append((time.perf_counter() - start) * 1000)
+        report(f"{function_name} {method} r={rounds or '-'}", timings)
+
+
+if __name__ == "__main__":
+    main()
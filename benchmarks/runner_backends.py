@@ -0,0 +1,177 @@
+"""
+Benchmark dos backends de sandbox (WANDA_RUNNER_BACKEND).
+
+Uso:
+    python benchmarks/runner_backends.py                         # todos os backends registrados
+    python benchmarks/runner_backends.py --backend namespace     # só os escolhidos (pode repetir)
+
+Roda a mesma carga em cada backend de `wanda_python.runner.backends.BACKENDS`:
+    - run frio: um job run por sandbox nova, em sequência (o /run sem pool);
+    - run quente: jobs run numa sandbox já no ar, em modo serve (zygote);
+    - sessão: rounds de uma sessão aberta, um por vez, como o Java faz;
+    - concorrente: jobs run disparados todos juntos.
+Imprime p50/p95/p99 da latência e jobs/s de cada carga. Backend que não
+sobe (sem Docker, sem user namespaces...) aparece como indisponível.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from wanda_python.runner.backends import BACKENDS, get_backend, shutdown_backends  # noqa: E402
+from wanda_python.runner.protocol import build_job  # noqa: E402
+
+CODE = """\
+def strategy(card1, card2, card3):
+    if card1 == card2:
+        return card3
+    return card1
+"""
+TEST_CASES = [
+    ["pedra", "pedra", "papel"],
+    ["pedra", "papel", "tesoura"],
+    ["papel", "papel", "pedra"],
+    ["tesoura", "tesoura", "papel"],
+    ["pedra", "papel", "papel"],
+    ["tesoura", "papel", "tesoura"],
+    ["papel", "pedra", "pedra"],
+    ["tesoura", "papel", "papel"],
+    ["papel", "tesoura", "tesoura"],
+    ["pedra", "tesoura", "pedra"],
+]
+VALID_RETURNS = ["pedra", "papel", "tesoura"]
+TIMEOUT = 30
+
+
+def run_job() -> str:
+    return build_job("run", code=CODE, test_cases=TEST_CASES, valid_returns=VALID_RETURNS)
+
+
+async def _send(process, payload: dict) -> dict:
+    process.stdin.write(json.dumps(payload).encode() + b"\n")
+    await process.stdin.drain()
+    return json.loads(await asyncio.wait_for(process.stdout.readline(), timeout=TIMEOUT))
+
+
+async def measure_cold(backend, jobs: int):
+    timings = []
+    start = time.perf_counter()
+    for _ in range(jobs):
+        t0 = time.perf_counter()
+        result = await backend.execute(run_job(), TIMEOUT)
+        timings.append(time.perf_counter() - t0)
+        if not result["ok"]:
+            raise RuntimeError(result["stderr"] or "job run falhou")
+    return timings, time.perf_counter() - start
+
+
+async def measure_warm(backend, jobs: int):
+    name = f"wanda_bench_{uuid.uuid4().hex}"
+    process = await backend.start_session(name)
+    try:
+        ready = await _send(process, json.loads(build_job("serve")))
+        assert ready.get("ready"), ready
+        job = {**json.loads(run_job()), "timeout": TIMEOUT}
+        timings = []
+        start = time.perf_counter()
+        for _ in range(jobs):
+            t0 = time.perf_counter()
+            response = await _send(process, job)
+            timings.append(time.perf_counter() - t0)
+            assert response.get("ok"), response
+        return timings, time.perf_counter() - start
+    finally:
+        await backend.kill(name, process)
+
+
+async def measure_session(backend, rounds: int):
+    name = f"wanda_bench_{uuid.uuid4().hex}"
+    process = await backend.start_session(name)
+    try:
+        ready = await _send(process, json.loads(build_job("session")))
+        assert ready.get("ready"), ready
+        loaded = await _send(process, {"p1": CODE, "p2": CODE, "framing": "json"})
+        assert loaded.get("loaded"), loaded
+        params = {"p1": ["pedra", "papel", "tesoura"], "p2": ["tesoura", "tesoura", "papel"]}
+        timings = []
+        start = time.perf_counter()
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            response = await _send(process, params)
+            timings.append(time.perf_counter() - t0)
+            assert "error" not in response, response
+        return timings, time.perf_counter() - start
+    finally:
+        await backend.kill(name, process)
+
+
+async def measure_concurrent(backend, jobs: int):
+    async def one():
+        t0 = time.perf_counter()
+        result = await backend.execute(run_job(), TIMEOUT)
+        if not result["ok"]:
+            raise RuntimeError(result["stderr"] or "job run falhou")
+        return time.perf_counter() - t0
+
+    start = time.perf_counter()
+    timings = await asyncio.gather(*(one() for _ in range(jobs)))
+    return list(timings), time.perf_counter() - start
+
+
+def percentile(timings: list, p: float) -> float:
+    ordered = sorted(timings)
+    return ordered[max(0, math.ceil(len(ordered) * p) - 1)]
+
+
+def report(name: str, timings: list, elapsed: float) -> None:
+    ms = [t * 1000 for t in timings]
+    print(f"  {name:<22} p50={percentile(ms, 0.50):9.2f}ms  p95={percentile(ms, 0.95):9.2f}ms  "
+          f"p99={percentile(ms, 0.99):9.2f}ms  {len(ms) / elapsed:9.1f} jobs/s")
+
+
+async def bench_backend(name: str, args) -> None:
+    backend = get_backend(name)
+    print(f"# {name}")
+    try:
+        report("run frio", *await measure_cold(backend, args.cold))
+    except Exception as e:
+        print(f"  indisponível: {e}")
+        return
+    workloads = [
+        ("run quente", measure_warm, args.warm),
+        (f"sessão ({args.rounds} rounds)", measure_session, args.rounds),
+        (f"concorrente ({args.concurrent})", measure_concurrent, args.concurrent),
+    ]
+    for label, measure, size in workloads:
+        try:
+            report(label, *await measure(backend, size))
+        except Exception as e:
+            print(f"  {label:<22} falhou: {e}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS),
+                        help="backend a medir (padrão: todos os registrados)")
+    parser.add_argument("--cold", type=int, default=20, help="jobs do run frio")
+    parser.add_argument("--warm", type=int, default=200, help="jobs do run quente")
+    parser.add_argument("--rounds", type=int, default=1000, help="rounds da sessão")
+    parser.add_argument("--concurrent", type=int, default=50, help="jobs disparados juntos")
+    args = parser.parse_args()
+
+    try:
+        for name in args.backend or list(BACKENDS):
+            await bench_backend(name, args)
+    finally:
+        await shutdown_backends()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,152 @@
+"""
+Benchmark dos rounds de sessão: protocolo de linhas JSON contra o framing
+binário (prefixo de tamanho e cartas em 1 byte).
+
+Uso:
+    python benchmarks/session_framing.py               # interpretador local
+    python benchmarks/session_framing.py --docker      # imagem wanda-runner
+
+Mede a latência de ida e volta de um round (escreve os parâmetros, espera a
+resposta) com um round por vez, como o Java faz, e o custo só de
+codificar/decodificar no host.
+"""
+import argparse
+import compileall
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from wanda_python.runner.harness import HARNESS_VERSION, encode_choices  # noqa: E402
+from wanda_python.runner.protocol import (build_job, FRAME_HEADER, frame, encode_round,  # noqa: E402
+    decode_response)
+
+JOKENPO = """\
+def strategy(card1, card2, card3):
+    if card1 == card2:
+        return card3
+    return card1
+"""
+BITS = """\
+def strategy(bit8, bit16, bit32, firewall, opp_last):
+    if opp_last == "BIT32" and firewall:
+        return "FIREWALL"
+    for card, available in (("BIT32", bit32), ("BIT16", bit16), ("BIT8", bit8)):
+        if available:
+            return card
+    return "FIREWALL"
+"""
+SCENARIOS = {
+    "jokenpo1": (JOKENPO, ["pedra", "papel", "tesoura"], ["tesoura", "tesoura", "papel"]),
+    "bits": (BITS, [1, 0, 1, 1, "BIT32"], [0, 1, 1, 0, None]),
+}
+
+
+class Session:
+    """Container (ou processo local) de sessão falando um dos dois framings."""
+
+    def __init__(self, cmd: list, code: str, framing: str, cwd: str = None):
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=cwd)
+        self._send_line(build_job("session"))
+        assert json.loads(self.process.stdout.readline())["ready"]
+        self._send_line(json.dumps({"p1": code, "p2": code, "framing": framing}))
+        ack = json.loads(self.process.stdout.readline())
+        assert ack["loaded"] and ack["framing"] == framing, ack
+        self.framing = framing
+
+    def _send_line(self, line: str) -> None:
+        self.process.stdin.write(line.encode() + b"\n")
+        self.process.stdin.flush()
+
+    def round(self, params_p1: list, params_p2: list) -> dict:
+        stdout = self.process.stdout
+        if self.framing == "binary":
+            self.process.stdin.write(frame(encode_round(params_p1, params_p2)))
+            self.process.stdin.flush()
+            (size,) = FRAME_HEADER.unpack(stdout.read(FRAME_HEADER.size))
+            return decode_response(stdout.read(size))
+        self._send_line(json.dumps({"p1": params_p1, "p2": params_p2}))
+        return json.loads(stdout.readline())
+
+    def close(self) -> None:
+        self.process.stdin.close()
+        self.process.wait()
+
+
+def measure_round_trip(cmd: list, code: str, params: tuple, framing: str, rounds: int, cwd: str = None) -> list:
+    session = Session(cmd, code, framing, cwd)
+    try:
+        for _ in range(50):
+            session.round(*params)  # aquecimento
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            response = session.round(*params)
+            timings.append((time.perf_counter() - start) * 1_000_000)
+            assert "error" not in response, response
+        return timings
+    finally:
+        session.close()
+
+
+def measure_codec(params: tuple, framing: str, rounds: int) -> float:
+    # custo no host por round: codificar o pedido e decodificar uma resposta típica
+    response_line = json.dumps({"p1": "pedra", "p2": "tesoura"}).encode() + b"\n"
+    response_frame = encode_choices("pedra", "tesoura")
+    start = time.perf_counter()
+    for _ in range(rounds):
+        if framing == "binary":
+            frame(encode_round(*params))
+            decode_response(response_frame)
+        else:
+            (json.dumps({"p1": params[0], "p2": params[1]}) + "\n").encode()
+            json.loads(response_line.decode().strip())
+    return (time.perf_counter() - start) / rounds * 1_000_000
+
+
+def report(name: str, timings: list) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(f"{name:<28} media={statistics.mean(timings):8.1f}us  p50={statistics.median(timings):8.1f}us  "
+          f"p95={p95:8.1f}us  p99={p99:8.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--docker", action="store_true", help="usa a imagem wanda-runner em vez do python local")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.docker:
+        cmd, cwd = ["docker", "run", "--rm", "-i", f"wanda-runner:{HARNESS_VERSION}"], None
+    else:
+        tmpdir = tempfile.mkdtemp(prefix="wanda_bench_")
+        shutil.copy(os.path.join(ROOT, "wanda_python", "runner", "harness.py"),
+                    os.path.join(tmpdir, "wanda_harness.py"))
+        compileall.compile_dir(tmpdir, quiet=1)
+        cmd, cwd = [sys.executable, "-S", "-s", "-E", "-m", "wanda_harness"], tmpdir
+
+    try:
+        for game, (code, params_p1, params_p2) in SCENARIOS.items():
+            params = (params_p1, params_p2)
+            print(f"# {game}")
+            for framing in ("json", "binary"):
+                report(f"ida e volta ({framing})", measure_round_trip(cmd, code, params, framing, args.rounds, cwd))
+            for framing in ("json", "binary"):
+                print(f"{'codec no host (' + framing + ')':<28} {measure_codec(params, framing, 100_000):8.2f}us/round")
+    finally:
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
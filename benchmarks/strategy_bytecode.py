@@ -0,0 +1,171 @@
+"""
+Benchmark do bytecode compilado no host (`code_bc`, WANDA_SANDBOX_BYTECODE)
+contra o harness compilando o código-fonte do aluno.
+
+Uso:
+    python benchmarks/strategy_bytecode.py
+    python benchmarks/strategy_bytecode.py --jobs 500
+
+Roda o job run de 10 casos num zygote local (`-S -s -E -m wanda_harness` a
+partir de um diretório temporário, como em harness_startup.py), alternando
+jobs só com o fonte e jobs com o bytecode, para uma estratégia mínima e
+para uma do tamanho das que os alunos enviam. Também mede isolado o passo
+que muda dentro da sandbox: compile() contra marshal.loads().
+"""
+import argparse
+import base64
+import compileall
+import json
+import marshal
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from wanda_python.runner.protocol import build_job, compile_strategy  # noqa: E402
+
+SMALL = """\
+def strategy(card1, card2, card3):
+    if card1 == card2:
+        return card3
+    return card1
+"""
+# estratégia no estilo das submissões reais: contagem, regras por posição,
+# comentários e vários ramos
+LARGE = '''\
+def strategy(card1, card2, card3):
+    """Joga a carta que ganha da mais repetida; desempata pela posição."""
+    beats = {"pedra": "papel", "papel": "tesoura", "tesoura": "pedra"}
+    loses = {value: key for key, value in beats.items()}
+    hand = [card1, card2, card3]
+    counts = {}
+    for card in hand:
+        counts[card] = counts.get(card, 0) + 1
+    # mão toda igual: não tem escolha
+    if len(counts) == 1:
+        return card1
+    most = max(counts, key=lambda card: (counts[card], -hand.index(card)))
+    target = beats[most]
+    if target in hand:
+        return target
+    # sem a carta que ganha, tenta ao menos empatar com a mais repetida
+    if counts[most] >= 2:
+        return most
+    for card in hand:
+        if loses[card] in hand and card != most:
+            return card
+    ranking = sorted(hand, key=lambda card: (hand.count(card), hand.index(card)))
+    if ranking[0] == ranking[-1]:
+        return ranking[0]
+    if card1 == beats.get(card3):
+        return card1
+    if card2 == beats.get(card1):
+        return card2
+    if card3 == beats.get(card2):
+        return card3
+    return ranking[-1]
+'''
+TEST_CASES = [
+    ["pedra", "pedra", "papel"],
+    ["pedra", "papel", "tesoura"],
+    ["papel", "papel", "pedra"],
+    ["tesoura", "tesoura", "papel"],
+    ["pedra", "papel", "papel"],
+    ["tesoura", "papel", "tesoura"],
+    ["papel", "pedra", "pedra"],
+    ["tesoura", "papel", "papel"],
+    ["papel", "tesoura", "tesoura"],
+    ["pedra", "tesoura", "pedra"],
+]
+VALID_RETURNS = ["pedra", "papel", "tesoura"]
+TIMEOUT = 30
+
+
+def job_payload(code: str, bytecode: bool) -> bytes:
+    fields = {"code_bc": compile_strategy(code)} if bytecode else {}
+    job = json.loads(build_job("run", code=code, test_cases=TEST_CASES, valid_returns=VALID_RETURNS, **fields))
+    job["timeout"] = TIMEOUT
+    return (json.dumps(job) + "\n").encode()
+
+
+def measure_zygote(cwd: str, code: str, jobs: int) -> dict:
+    process = subprocess.Popen([sys.executable, "-S", "-s", "-E", "-m", "wanda_harness"], cwd=cwd,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    try:
+        process.stdin.write(build_job("serve").encode() + b"\n")
+        process.stdin.flush()
+        assert json.loads(process.stdout.readline()).get("ready")
+        payloads = {"fonte": job_payload(code, False), "bytecode": job_payload(code, True)}
+        timings = {label: [] for label in payloads}
+        outputs = {}
+        # alterna os dois tipos de job para o ruído da máquina cair nos dois
+        for _ in range(jobs):
+            for label, payload in payloads.items():
+                start = time.perf_counter()
+                process.stdin.write(payload)
+                process.stdin.flush()
+                response = json.loads(process.stdout.readline())
+                timings[label].append((time.perf_counter() - start) * 1000)
+                assert response.get("ok"), response
+                outputs[label] = [r["output"] for r in response["results"]]
+        assert outputs["fonte"] == outputs["bytecode"]
+        return timings
+    finally:
+        process.stdin.close()
+        process.wait()
+
+
+def measure_load(code: str, iterations: int) -> dict:
+    data = base64.b64decode(compile_strategy(code))[4:]
+    timings = {"compile()": [], "marshal.loads()": []}
+    for _ in range(iterations):
+        start = time.perf_counter()
+        compile(code, "<strategy>", "exec")
+        timings["compile()"].append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        marshal.loads(data)
+        timings["marshal.loads()"].append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name: str, timings: list) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"  {name:<18} media={statistics.mean(timings):8.3f}ms  p50={statistics.median(timings):8.3f}ms  "
+          f"p95={p95:8.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=300, help="jobs de cada tipo no zygote")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="wanda_bench_")
+    try:
+        shutil.copy(os.path.join(ROOT, "wanda_python", "runner", "harness.py"),
+                    os.path.join(tmpdir, "wanda_harness.py"))
+        shutil.copy(os.path.join(ROOT, "wanda_python", "games", "engine.py"),
+                    os.path.join(tmpdir, "wanda_engine.py"))
+        compileall.compile_dir(tmpdir, quiet=1)
+
+        for name, code in (("estratégia mínima", SMALL), ("estratégia típica", LARGE)):
+            print(f"# {name} ({len(code.splitlines())} linhas)")
+            zygote = measure_zygote(tmpdir, code, args.jobs)
+            for label, timings in zygote.items():
+                report(f"job {label}", timings)
+            saved = statistics.median(zygote["fonte"]) - statistics.median(zygote["bytecode"])
+            print(f"  {'economia por job':<18} p50={saved:8.3f}ms")
+            for label, timings in measure_load(code, args.jobs).items():
+                report(label, timings)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
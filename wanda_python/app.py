@@ -1,8 +1,19 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI
-from wanda_python.controllers import validate_controller, session_controller
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from wanda_python.controllers import validate_controller, session_controller, runner_controller, match_controller, tournament_controller, analytics_controller
+from wanda_python.runner.sandbox_pool import get_pool, shutdown_pool
+from wanda_python.runner.scheduler import SandboxQueueFull
+from wanda_python.runner.session_pool import get_session_pool, shutdown_session_pool
+from wanda_python.runner.session_manager import get_session_manager, shutdown_session_manager
+from wanda_python.runner.session_broker import start_session_broker, shutdown_session_broker
+from wanda_python.runner.backends import get_backend, shutdown_backends
+from wanda_python.runner.kill_reaper import get_kill_reaper, shutdown_kill_reaper
+from wanda_python.llm.gateway import shutdown_llm_gateway
+from wanda_python.llm.cache import shutdown_feedback_cache
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from wanda_python.otel import configure_otel
 from wanda_python.logging_config import setup_logging
@@ -10,10 +21,54 @@ setup_logging()
 
 configure_otel()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # backend desconhecido em WANDA_RUNNER_BACKEND falha na subida, não no primeiro job
+    get_backend()
+    # kills de sandboxes em background; os que vêm das threads do pool rodam neste loop
+    get_kill_reaper().start()
+    # sobe os pools de sandboxes junto com a aplicação
+    # (se WANDA_POOL_SIZE / WANDA_SESSION_POOL_SIZE > 0)
+    get_pool()
+    # com o broker ligado, só o worker dono das sessões mantém o pool de
+    # sessões e o reaper; os outros repassam as chamadas para ele
+    if await start_session_broker():
+        get_session_pool()
+        # reaper das sessões abandonadas (idle TTL / tempo máximo de vida)
+        get_session_manager().start()
+    yield
+    await shutdown_session_broker()
+    await shutdown_session_manager()
+    await shutdown_session_pool()
+    shutdown_pool()
+    # espera os kills pendentes antes de fechar as conexões dos backends
+    await shutdown_kill_reaper()
+    await shutdown_backends()
+    # fecha as conexões mantidas com a OpenAI
+    await shutdown_llm_gateway()
+    shutdown_feedback_cache()
+
+
+app = FastAPI(lifespan=lifespan)
 FastAPIInstrumentor.instrument_app(app)
 
+
+@app.exception_handler(SandboxQueueFull)
+async def sandbox_queue_full_handler(request: Request, exc: SandboxQueueFull):
+    # fila da lane cheia — recusa rápido e diz quando tentar de novo
+    return JSONResponse(
+        status_code=429,
+        content={"error": "SANDBOX_QUEUE_FULL", "errorDetail": str(exc), "lane": exc.lane},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # Registrar as rotas
 app.include_router(validate_controller.router, prefix="/api", tags=["Validation"])
 app.include_router(session_controller.router, prefix="/api", tags=["Session"])
+app.include_router(match_controller.router, prefix="/api", tags=["Match"])
+app.include_router(tournament_controller.router, prefix="/api", tags=["Tournament"])
+app.include_router(analytics_controller.router, prefix="/api", tags=["Analytics"])
+app.include_router(runner_controller.router, prefix="/api", tags=["Runner"])
 
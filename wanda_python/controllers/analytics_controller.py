@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from wanda_python.services.analytics_service import AnalyticsService
+from wanda_python.schema.analytics_dto import MatchupRequestDTO, MatchupResponseDTO
+
+router = APIRouter()
+
+def get_analytics_service() -> AnalyticsService:
+    return AnalyticsService()
+
+
+@router.post("/analytics/matchups", response_model=MatchupResponseDTO)
+async def matchups(data: MatchupRequestDTO, service: AnalyticsService = Depends(get_analytics_service)):
+    return await service.matchups(data)
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from wanda_python.services.match_service import MatchService
+from wanda_python.schema.match_dto import MatchRequestDTO, MatchResponseDTO
+
+router = APIRouter()
+
+def get_match_service() -> MatchService:
+    return MatchService()
+
+
+@router.post("/match", response_model=MatchResponseDTO)
+async def play_match(data: MatchRequestDTO, service: MatchService = Depends(get_match_service)):
+    return await service.play_match(data)
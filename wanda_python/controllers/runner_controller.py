@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from wanda_python.runner.kill_reaper import get_kill_reaper
+from wanda_python.runner.result_cache import get_result_cache
+from wanda_python.runner.sandbox_pool import get_pool
+from wanda_python.runner.scheduler import get_scheduler
+from wanda_python.runner.session_broker import session_stats, broker_stats
+from wanda_python.runner.truth_table import get_truth_tables
+from wanda_python.llm.gateway import get_llm_gateway
+from wanda_python.llm.cache import get_feedback_cache
+
+router = APIRouter()
+
+
+@router.get("/runner/stats")
+async def runner_stats():
+    # contadores do pool, das sessões e do scheduler — usados para dimensionar
+    # WANDA_POOL_SIZE, WANDA_MAX_SANDBOXES, WANDA_MAX_SESSIONS, os limites de fila
+    # e os tamanhos de cache (WANDA_RESULT_CACHE_SIZE, WANDA_TRUTH_TABLE_SIZE);
+    # "llm" mostra as chamadas à OpenAI em andamento e na fila (WANDA_LLM_MAX_CONCURRENCY)
+    # e "llmCache" o aproveitamento do cache de feedbacks (WANDA_LLM_CACHE_SIZE)
+    pool = get_pool()
+    return {
+        "pool": pool.stats() if pool else None,
+        **await session_stats(),
+        "sessionBroker": broker_stats(),
+        "scheduler": get_scheduler().stats(),
+        "resultCache": get_result_cache().stats(),
+        "killReaper": get_kill_reaper().stats(),
+        "truthTables": get_truth_tables().stats(),
+        "llm": get_llm_gateway().stats(),
+        "llmCache": get_feedback_cache().stats(),
+    }
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends
 from wanda_python.services.round_service import RoundService
 from wanda_python.schema.session_dto import (SessionCreateRequestDTO, SessionCreateResponseDTO,
-    SessionExecuteRequestDTO,SessionExecuteResponseDTO)
+    SessionExecuteRequestDTO,SessionExecuteResponseDTO, SessionExecuteBatchRequestDTO,
+    SessionExecuteBatchResponseDTO)
 
 router = APIRouter()
 
@@ -21,6 +22,13 @@ async def execute_round(data: SessionExecuteRequestDTO, service: RoundService =
     return SessionExecuteResponseDTO.create(result)
 
 
+@router.post("/session/{session_id}/execute-batch", response_model=SessionExecuteBatchResponseDTO)
+async def execute_rounds(session_id: str, data: SessionExecuteBatchRequestDTO, service: RoundService = Depends(get_round_service)):
+    rounds = [(r.player1Parameters, r.player2Parameters) for r in data.rounds]
+    results = await service.execute_rounds(session_id, rounds)
+    return SessionExecuteBatchResponseDTO.create(results)
+
+
 @router.delete("/session/{session_id}", status_code=200)
 async def close_session(session_id: str, service: RoundService = Depends(get_round_service)):
     await service.close_session(session_id)
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from wanda_python.services.tournament_service import TournamentService
+from wanda_python.schema.tournament_dto import TournamentRequestDTO, TournamentResponseDTO
+
+router = APIRouter()
+
+def get_tournament_service() -> TournamentService:
+    return TournamentService()
+
+
+@router.post("/tournament", response_model=TournamentResponseDTO)
+async def play_tournament(data: TournamentRequestDTO, service: TournamentService = Depends(get_tournament_service)):
+    return await service.play_tournament(data)
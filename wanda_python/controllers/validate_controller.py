@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
 from wanda_python.services.validate_service import ValidateService
 from wanda_python.services.round_service import RoundService
-from wanda_python.schema.validate_dto import ValidateRequest, ValidateResponse
+from wanda_python.schema.validate_dto import ValidateRequest, ValidateResponse, ValidateBatchRequest, ValidateBatchResponse
 from wanda_python.schema.round_dto import RoundRequestDTO, RoundResponseDTO
 from wanda_python.schema.round_bits_dto import RoundBitsRequestDTO
 
@@ -29,6 +29,11 @@ async def validate(data: ValidateRequest, service: ValidateService = Depends(get
     # Chama o método do serviço
     return await service.validate(data)
 
+@router.post("/validate/batch", response_model=ValidateBatchResponse)
+async def validate_batch(data: ValidateBatchRequest, service: ValidateService = Depends(get_validate_service)):
+    # Valida várias submissões num único sandbox
+    return await service.validate_batch(data)
+
 @router.post("/run", response_model=ValidateResponse)
 async def validate(data: ValidateRequest, service: ValidateService = Depends(get_validate_service)):
     # Chama o método do serviço
@@ -0,0 +1,195 @@
+"""
+Motor de partidas do Jokenpo e do BITS.
+
+Depende só da stdlib: além de poder rodar no host, é copiado para a imagem
+wanda-runner como `wanda_engine`, onde o harness (modo "match") joga a
+partida inteira entre as duas estratégias numa única chamada, em vez de
+um round trip HTTP por round.
+
+As estratégias são chamadas com os mesmos parâmetros da sessão round a
+round; um retorno que não é uma carta da mão (ou uma exceção) cai no
+fallback NEXT_AVAILABLE_CARD: o jogo usa a próxima carta disponível.
+"""
+import random
+
+FALLBACK = "NEXT_AVAILABLE_CARD"
+
+PLAYERS = ("p1", "p2")
+
+JOKENPO_CARDS = ["pedra", "papel", "tesoura"]
+# carta -> cartas que ela vence
+JOKENPO_BEATS = {
+    "pedra": {"tesoura"},
+    "papel": {"pedra"},
+    "tesoura": {"papel"},
+}
+# rounds de uma partida de Jokenpo quando o chamador não informa
+JOKENPO_DEFAULT_ROUNDS = 5
+
+# ordem também define a "próxima carta disponível" do fallback
+BITS_CARDS = ["BIT8", "BIT16", "BIT32", "FIREWALL"]
+# bit maior vence bit menor; o FIREWALL barra BIT16 e BIT32, mas o BIT8 passa
+BITS_BEATS = {
+    "BIT8": {"FIREWALL"},
+    "BIT16": {"BIT8"},
+    "BIT32": {"BIT8", "BIT16"},
+    "FIREWALL": {"BIT16", "BIT32"},
+}
+
+
+def _other(player: str) -> str:
+    return "p2" if player == "p1" else "p1"
+
+
+class JokenpoRules:
+    """
+    jokenpo1: a cada round cada jogador recebe 3 cartas e escolhe uma
+              -> strategy(card1, card2, card3)
+    jokenpo2: a cada round cada jogador recebe 2 cartas e vê as 2 do oponente
+              -> strategy(card1, card2, opponentCard1, opponentCard2)
+    """
+
+    beats = JOKENPO_BEATS
+    max_rounds = None
+
+    def __init__(self, function_name: str, rng: random.Random):
+        if function_name not in ("jokenpo1", "jokenpo2"):
+            raise ValueError(f"Função do Jokenpo desconhecida: {function_name}")
+        self.sees_opponent = function_name == "jokenpo2"
+        self.hand_size = 2 if self.sees_opponent else 3
+        self.rng = rng
+        self.hands = {}
+
+    def default_rounds(self) -> int:
+        return JOKENPO_DEFAULT_ROUNDS
+
+    def start_round(self) -> None:
+        self.hands = {
+            player: [self.rng.choice(JOKENPO_CARDS) for _ in range(self.hand_size)]
+            for player in PLAYERS
+        }
+
+    def params(self, player: str) -> list:
+        if self.sees_opponent:
+            return self.hands[player] + self.hands[_other(player)]
+        return list(self.hands[player])
+
+    def hand(self, player: str) -> list:
+        return self.hands[player]
+
+    def commit(self, cards: dict) -> None:
+        # a mão é descartada no fim do round
+        pass
+
+
+class BitsRules:
+    """
+    BITS: 4 rounds, cada jogador tem BIT8, BIT16, BIT32 e FIREWALL uma vez.
+    -> strategy(bit8, bit16, bit32, firewall, opp_last), onde cada bit é 1
+    se a carta ainda está na mão e opp_last é a última carta do oponente
+    (None no primeiro round).
+    """
+
+    beats = BITS_BEATS
+    max_rounds = len(BITS_CARDS)
+
+    def __init__(self, function_name: str, rng: random.Random):
+        self.available = {player: {card: 1 for card in BITS_CARDS} for player in PLAYERS}
+        self.last = {player: None for player in PLAYERS}
+
+    def default_rounds(self) -> int:
+        return self.max_rounds
+
+    def start_round(self) -> None:
+        pass
+
+    def params(self, player: str) -> list:
+        available = self.available[player]
+        return [available[card] for card in BITS_CARDS] + [self.last[_other(player)]]
+
+    def hand(self, player: str) -> list:
+        return [card for card in BITS_CARDS if self.available[player][card]]
+
+    def commit(self, cards: dict) -> None:
+        for player, card in cards.items():
+            self.available[player][card] = 0
+            self.last[player] = card
+
+
+RULES = {
+    "JOKENPO": JokenpoRules,
+    "BITS": BitsRules,
+}
+
+
+def round_winner(beats: dict, card_p1: str, card_p2: str):
+    """Retorna "p1", "p2" ou None (empate)."""
+    if card_p2 in beats[card_p1]:
+        return "p1"
+    if card_p1 in beats[card_p2]:
+        return "p2"
+    return None
+
+
+def _play(strategy, rules, player: str) -> dict:
+    params = rules.params(player)
+    hand = rules.hand(player)
+    entry = {"params": params, "output": None}
+    try:
+        output = strategy(*params)
+        entry["output"] = output
+        valid = output in hand
+    except Exception as e:
+        entry["error"] = str(e)
+        valid = False
+
+    if valid:
+        entry["card"] = entry["output"]
+    else:
+        entry["card"] = hand[0]
+        entry["fallback"] = FALLBACK
+    return entry
+
+
+def play_match(game: str, function_name: str, strategy_p1, strategy_p2, seed: int = None, rounds: int = None) -> dict:
+    """
+    Joga uma partida completa e devolve o log de rounds e o placar.
+    Com a mesma seed (e as mesmas estratégias) a partida é sempre igual.
+    """
+    if game not in RULES:
+        raise ValueError(f"Jogo desconhecido: {game}")
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+
+    rules = RULES[game](function_name, random.Random(seed))
+    total = rules.default_rounds() if rounds is None else int(rounds)
+    if rules.max_rounds is not None:
+        total = min(total, rules.max_rounds)
+
+    strategies = {"p1": strategy_p1, "p2": strategy_p2}
+    score = {"p1": 0, "p2": 0, "draws": 0}
+    log = []
+    for number in range(1, total + 1):
+        rules.start_round()
+        plays = {player: _play(strategies[player], rules, player) for player in PLAYERS}
+        cards = {player: plays[player]["card"] for player in PLAYERS}
+        winner = round_winner(rules.beats, cards["p1"], cards["p2"])
+        rules.commit(cards)
+        score[winner or "draws"] += 1
+        log.append({"round": number, "p1": plays["p1"], "p2": plays["p2"], "winner": winner})
+
+    if score["p1"] > score["p2"]:
+        match_winner = "p1"
+    elif score["p2"] > score["p1"]:
+        match_winner = "p2"
+    else:
+        match_winner = None
+
+    return {
+        "game": game,
+        "function": function_name,
+        "seed": seed,
+        "rounds": log,
+        "score": score,
+        "winner": match_winner,
+    }
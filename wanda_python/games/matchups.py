@@ -0,0 +1,244 @@
+"""
+Análise de confrontos entre estratégias puras, com NumPy.
+
+Com a tabela-verdade de cada estratégia (runner/truth_table.py) a carta
+efetivamente jogada em cada entrada é conhecida — já com o fallback
+NEXT_AVAILABLE_CARD do engine. Empilhando as tabelas da turma em arrays,
+as taxas de vitória/empate/derrota de todos os pares saem de operações
+matriciais, sem simular partidas:
+
+- jokenpo1/jokenpo2: as mãos de cada round são sorteadas de forma
+  independente, então um round é a mesma distribuição em toda a partida.
+  A probabilidade por round vem de um produto de matrizes; a da partida,
+  da distribuição do saldo de rounds (vitórias - derrotas) depois de
+  `rounds` rounds, calculada pela FFT;
+- BITS: não há sorteio — as mãos são fixas, então cada partida entre duas
+  estratégias puras é determinística e as 4 jogadas de todos os pares são
+  simuladas de uma vez.
+
+No Monte Carlo as mãos são sorteadas (as mesmas para todos os pares) e as
+partidas jogadas em lote; serve para conferir o exato. O BITS é sempre exato.
+"""
+import numpy as np
+
+from .engine import JOKENPO_CARDS, JOKENPO_BEATS, JOKENPO_DEFAULT_ROUNDS, BITS_CARDS, BITS_BEATS
+
+EXACT = "exact"
+MONTE_CARLO = "montecarlo"
+
+# amostras por bloco no Monte Carlo: limita a memória a N² x bloco
+_MC_CHUNK = 64
+# pares por bloco na FFT do saldo de rounds
+_FFT_CHUNK = 4096
+
+# aridade da strategy de cada função (ver runner/truth_table.INPUT_SPACES)
+FUNCTION_ARITY = {"jokenpo1": 3, "jokenpo2": 4, "bits": 5}
+
+
+def _beats_matrix(cards: list, beats: dict) -> np.ndarray:
+    return np.array([[1 if other in beats[card] else 0 for other in cards] for card in cards], dtype=np.float64)
+
+
+JOKENPO_MATRIX = _beats_matrix(JOKENPO_CARDS, JOKENPO_BEATS)
+BITS_MATRIX = _beats_matrix(BITS_CARDS, BITS_BEATS)
+
+
+def jokenpo_cards(outputs: list, hand_size: int, inputs: list) -> np.ndarray:
+    """
+    Índice da carta jogada (em JOKENPO_CARDS) para cada entrada: a saída da
+    estratégia se estiver na mão, senão a primeira carta da mão (fallback do engine).
+    """
+    index = {card: i for i, card in enumerate(JOKENPO_CARDS)}
+    cards = np.empty(len(inputs), dtype=np.int8)
+    for position, (params, output) in enumerate(zip(inputs, outputs)):
+        hand = params[:hand_size]
+        cards[position] = index[output if output in hand else hand[0]]
+    return cards
+
+
+def bits_cards(outputs: list, inputs: list) -> np.ndarray:
+    """Índice da carta jogada (em BITS_CARDS) para cada entrada; -1 se a mão está vazia."""
+    index = {card: i for i, card in enumerate(BITS_CARDS)}
+    cards = np.full(len(inputs), -1, dtype=np.int8)
+    for position, (params, output) in enumerate(zip(inputs, outputs)):
+        hand = [card for card, available in zip(BITS_CARDS, params[:len(BITS_CARDS)]) if available]
+        if hand:
+            cards[position] = index[output if output in hand else hand[0]]
+    return cards
+
+
+def strategy_cards(function_name: str, outputs: list, inputs: list) -> np.ndarray:
+    """Linha de `cards` de uma estratégia a partir das saídas da tabela-verdade."""
+    if function_name == "bits":
+        return bits_cards(outputs, inputs)
+    return jokenpo_cards(outputs, 3 if function_name == "jokenpo1" else 2, inputs)
+
+
+def _one_hot(cards: np.ndarray, size: int) -> np.ndarray:
+    return np.eye(size, dtype=np.float64)[cards]
+
+
+def jokenpo_round_rates(cards: np.ndarray, function_name: str) -> tuple:
+    """
+    Probabilidades de vitória e de empate num round, para todos os pares
+    (linha = jogador 1). `cards` é (N, 27) no jokenpo1 e (N, 81) no jokenpo2.
+    """
+    hot = _one_hot(cards, len(JOKENPO_CARDS))
+    if function_name == "jokenpo1":
+        # cada jogador recebe a própria mão, independente da do oponente
+        played = hot.mean(axis=1)
+        return played @ JOKENPO_MATRIX @ played.T, played @ played.T
+
+    # jokenpo2: a entrada é (mão própria, mão do oponente), 9 x 9 mãos ordenadas;
+    # o jogador 2 vê as mesmas mãos com os papéis trocados
+    count = cards.shape[0]
+    hot = hot.reshape(count, 9, 9, len(JOKENPO_CARDS))
+    mirrored = hot.transpose(0, 2, 1, 3)
+    own = hot.reshape(count, -1)
+    wins = own @ (mirrored @ JOKENPO_MATRIX.T).reshape(count, -1).T / 81
+    draws = own @ mirrored.reshape(count, -1).T / 81
+    return wins, draws
+
+
+def _power(values: np.ndarray, exponent: int) -> np.ndarray:
+    # potência por quadrados: bem mais rápido que ** em arrays complexos
+    result = np.ones_like(values)
+    while exponent:
+        if exponent & 1:
+            result = result * values
+        exponent >>= 1
+        if exponent:
+            values = values * values
+    return result
+
+
+def match_rates(round_win: np.ndarray, round_draw: np.ndarray, rounds: int) -> tuple:
+    """
+    Vitória/empate/derrota na partida a partir das probabilidades por round
+    (matrizes N x N, linha = jogador 1): distribuição do saldo de rounds pela
+    FFT da função característica de um round. As regras são simétricas, então
+    só o triângulo de cima é calculado — o par (j, i) é o (i, j) espelhado.
+    """
+    count = round_win.shape[0]
+    upper = np.triu_indices(count)
+    p_win, p_draw = round_win[upper], round_draw[upper]
+    p_loss = np.clip(1 - p_win - p_draw, 0, 1)
+    size = 1 << (2 * rounds + 1).bit_length()
+    # espectro de um round: sum_d P(d) e^(-2 pi i k d / size), só as frequências k >= 0
+    phase = np.exp(-2j * np.pi * np.arange(size // 2 + 1) / size)
+    win = np.empty(p_win.size)
+    draw = np.empty(p_win.size)
+    for start in range(0, p_win.size, _FFT_CHUNK):
+        chunk = slice(start, start + _FFT_CHUNK)
+        step = p_draw[chunk, None] + p_win[chunk, None] * phase + p_loss[chunk, None] * phase.conj()
+        # saldo d fica na posição d mod size (cabe sem dar a volta: |d| <= rounds)
+        distribution = np.fft.irfft(_power(step, rounds), n=size, axis=1)
+        win[chunk] = distribution[:, 1:rounds + 1].sum(axis=1)
+        draw[chunk] = distribution[:, 0]
+
+    wins = np.empty_like(round_win)
+    draws = np.empty_like(round_win)
+    wins[upper] = np.clip(win, 0, 1)
+    draws[upper] = np.clip(draw, 0, 1)
+    losses = np.clip(1 - wins - draws, 0, 1)
+    lower = np.tril_indices(count, -1)
+    wins[lower] = losses.T[lower]
+    draws[lower] = draws.T[lower]
+    return wins, draws, np.clip(1 - wins - draws, 0, 1)
+
+
+def jokenpo_monte_carlo(cards: np.ndarray, function_name: str, rounds: int, samples: int,
+                        rng: np.random.Generator) -> tuple:
+    """Taxas de vitória/empate/derrota sorteando `samples` partidas (mãos iguais para todos os pares)."""
+    count = cards.shape[0]
+    hands = 27 if function_name == "jokenpo1" else 9
+    size = len(JOKENPO_CARDS)
+    # resultado do round para o jogador 1 (+1, 0, -1) indexado por carta_p1 * 3 + carta_p2
+    outcome = (JOKENPO_MATRIX - JOKENPO_MATRIX.T).astype(np.int8).ravel()
+    first_cards = cards.astype(np.int8) * size
+    wins = np.zeros((count, count))
+    draws = np.zeros((count, count))
+    for start in range(0, samples, _MC_CHUNK):
+        chunk = min(_MC_CHUNK, samples - start)
+        balance = np.zeros((count, count, chunk), dtype=np.int8)
+        for _ in range(rounds):
+            hand_p1 = rng.integers(hands, size=chunk)
+            hand_p2 = rng.integers(hands, size=chunk)
+            if function_name == "jokenpo1":
+                index_p1, index_p2 = hand_p1, hand_p2
+            else:
+                index_p1, index_p2 = hand_p1 * 9 + hand_p2, hand_p2 * 9 + hand_p1
+            balance += outcome.take(first_cards[:, None, index_p1] + cards[None, :, index_p2])
+        wins += np.count_nonzero(balance > 0, axis=2)
+        draws += np.count_nonzero(balance == 0, axis=2)
+    wins /= samples
+    draws /= samples
+    return wins, draws, 1 - wins - draws
+
+
+def _bits_input_index() -> np.ndarray:
+    # máscara de cartas na mão (bit i = BITS_CARDS[i]) -> posição no produto ((1, 0), repeat=4)
+    index = np.zeros(1 << len(BITS_CARDS), dtype=np.int64)
+    for mask in range(len(index)):
+        position = 0
+        for bit in range(len(BITS_CARDS)):
+            position = position * 2 + (0 if mask >> bit & 1 else 1)
+        index[mask] = position
+    return index
+
+
+_BITS_INPUT_INDEX = _bits_input_index()
+
+
+def bits_rates(cards: np.ndarray, rounds: int) -> tuple:
+    """
+    Partidas de BITS entre todos os pares, simuladas em conjunto. `cards` é
+    (N, 80): entrada = (bits da mão, última carta do oponente ou None).
+    Sem sorteio, cada par tem um resultado só: as taxas são 0 ou 1.
+    """
+    count = cards.shape[0]
+    beats = BITS_MATRIX.astype(np.int8)
+    row = np.arange(count)[:, None]
+    column = np.arange(count)[None, :]
+    full = (1 << len(BITS_CARDS)) - 1
+    mask_p1 = np.full((count, count), full)
+    mask_p2 = np.full((count, count), full)
+    # 0 = nenhuma carta ainda; senão 1 + índice em BITS_CARDS
+    last_p1 = np.zeros((count, count), dtype=np.int64)
+    last_p2 = np.zeros((count, count), dtype=np.int64)
+    balance = np.zeros((count, count), dtype=np.int16)
+    for _ in range(rounds):
+        card_p1 = cards[row, _BITS_INPUT_INDEX[mask_p1] * 5 + last_p2].astype(np.int64)
+        card_p2 = cards[column, _BITS_INPUT_INDEX[mask_p2] * 5 + last_p1].astype(np.int64)
+        balance += beats[card_p1, card_p2] - beats[card_p2, card_p1]
+        mask_p1 &= ~(1 << card_p1)
+        mask_p2 &= ~(1 << card_p2)
+        last_p1, last_p2 = card_p1 + 1, card_p2 + 1
+    wins = (balance > 0).astype(np.float64)
+    draws = (balance == 0).astype(np.float64)
+    return wins, draws, 1 - wins - draws
+
+
+def match_rounds(game: str, rounds: int = None) -> int:
+    """Rounds efetivos de cada partida: o padrão do jogo, e no BITS no máximo uma carta por round."""
+    if game == "BITS":
+        return len(BITS_CARDS) if rounds is None else min(rounds, len(BITS_CARDS))
+    return JOKENPO_DEFAULT_ROUNDS if rounds is None else rounds
+
+
+def matchup_rates(game: str, function_name: str, cards: np.ndarray, rounds: int = None, method: str = EXACT,
+                  samples: int = 500, seed: int = None) -> tuple:
+    """
+    Matrizes (N, N) de vitória, empate e derrota na partida, com a estratégia
+    da linha como jogador 1. `cards` vem de strategy_cards, uma linha por
+    estratégia.
+    """
+    if game not in ("JOKENPO", "BITS"):
+        raise ValueError(f"Jogo desconhecido: {game}")
+    rounds = match_rounds(game, rounds)
+    if game == "BITS":
+        return bits_rates(cards, rounds)
+    if method == MONTE_CARLO:
+        return jokenpo_monte_carlo(cards, function_name, rounds, samples, np.random.default_rng(seed))
+    round_win, round_draw = jokenpo_round_rates(cards, function_name)
+    return match_rates(round_win, round_draw, rounds)
@@ -0,0 +1,48 @@
+import ast
+from typing import Optional, Dict, Any, List, Callable
+
+from ...runner.container_runner import run_tests_batch_async
+
+
+async def validate_batch_codes(
+    codes: List[str],
+    test_cases: list,
+    check_signature: Callable[[ast.AST], Optional[str]],
+) -> List[Dict[str, Any]]:
+    """
+    Validação em lote comum aos jogos: assinatura de cada código e execução
+    de todas as submissões num único container. `check_signature` recebe a
+    AST e devolve a mensagem de erro da assinatura (ou None). Erros de
+    execução voltam crus, sem explicação da OpenAI, para não multiplicar
+    custo e latência pelo tamanho da turma.
+    """
+    answers: List[Optional[Dict[str, Any]]] = [None] * len(codes)
+    pending = []
+    for i, code in enumerate(codes):
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            answers[i] = {"valid": False, "answer": "Não consegui analisar a sua função por erro de sintaxe.", "thought": ""}
+            continue
+        sig_msg = check_signature(tree)
+        if sig_msg:
+            answers[i] = {"valid": False, "answer": sig_msg, "thought": ""}
+            continue
+        pending.append(i)
+
+    results = await run_tests_batch_async([(codes[i], test_cases) for i in pending])
+    for i, result in zip(pending, results):
+        answers[i] = _batch_answer(result)
+    return answers
+
+
+def _batch_answer(result: Dict[str, Any]) -> Dict[str, Any]:
+    if result["timed_out"]:
+        return {
+            "valid": False,
+            "answer": "Sua função demorou demais para executar. Verifique se há loops infinitos.",
+            "thought": ""
+        }
+    if not result["ok"]:
+        return {"valid": False, "answer": result["stderr"], "thought": ""}
+    return {"valid": True, "answer": "aceita", "thought": ""}
@@ -1,11 +1,28 @@
 import ast
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 from ...validators.signature_validator import SignatureValidator
 from ...validators.semantics_validator import SemanticsValidator
 from ...validators.execution_validator import ExecutionValidator
 from ..registry import GameSpec
-from ...runner.container_runner import run_submit, run_tests
+from ...runner.container_runner import run_submit_async, run_tests_async
+from .batch import validate_batch_codes
+
+# Casos de teste usados no RUN e no VALIDATE
+TEST_CASES = [
+    [1, 1, 1, 1, None],
+    [1, 0, 1, 0, "BIT32"],
+    [0, 1, 1, 1, "BIT16"],
+    [1, 1, 0, 1, "FIREWALL"],
+    [0, 1, 0, 1, "BIT8"],
+    [1, 0, 0, 1, "BIT16"],
+    [0, 0, 1, 0, "BIT32"],
+    [1, 1, 0, 0, "BIT8"],
+    [0, 0, 0, 1, None],
+    [0, 1, 0, 0, "BIT32"],
+]
+
+VALID_RETURNS = ["BIT8", "BIT16", "BIT32", "FIREWALL"]
 
 def _normalize_style(style: str) -> str:
     s = (style or "").strip().upper()
@@ -45,7 +62,7 @@ class BitsPipeline:
                 "answer": sig_msg,
                 "thought": ""
             }
-        sem_dict = self._semantics.validate_semantics_bits(
+        sem_dict = await self._semantics.validate_semantics_bits(
             code=code,
             tree=tree,
             assistantStyle=style,
@@ -86,21 +103,7 @@ class BitsPipeline:
             return {"valid": False, "answer": sig_msg, "thought": ""}
 
         # 3) Execução de testes via container
-        test_cases = [
-            [1, 1, 1, 1, None],
-            [1, 0, 1, 0, "BIT32"],
-            [0, 1, 1, 1, "BIT16"],
-            [1, 1, 0, 1, "FIREWALL"],
-            [0, 1, 0, 1, "BIT8"],
-            [1, 0, 0, 1, "BIT16"],
-            [0, 0, 1, 0, "BIT32"],
-            [1, 1, 0, 0, "BIT8"],
-            [0, 0, 0, 1, None],
-            [0, 1, 0, 0, "BIT32"],
-        ]
-        valid_returns = ["BIT8", "BIT16", "BIT32", "FIREWALL"]
-
-        result = run_tests(code=code, test_cases=test_cases, valid_returns=valid_returns)
+        result = await run_tests_async(code=code, test_cases=TEST_CASES, valid_returns=VALID_RETURNS)
 
         if result["timed_out"]:
             return {
@@ -110,7 +113,7 @@ class BitsPipeline:
             }
 
         if not result["ok"]:
-            error_dict = self._execution.error_execution(
+            error_dict = await self._execution.error_execution(
                 code=code, erro=result["stderr"],
                 openai_api_key=openai_api_key, assistantStyle=style
             )
@@ -123,7 +126,7 @@ class BitsPipeline:
         # verifica se algum caso teve erro de execução
         first_error = next((r for r in result["results"] if not r["valid"]), None)
         if first_error:
-            error_dict = self._execution.error_execution(
+            error_dict = await self._execution.error_execution(
                 code=code, erro=first_error.get("error", "Erro de execução"),
                 openai_api_key=openai_api_key, assistantStyle=style
             )
@@ -134,7 +137,7 @@ class BitsPipeline:
             }
 
         # 4) passa os resultados pro prompt
-        tests = self._execution.feedback_outputs_tests_bits(
+        tests = await self._execution.feedback_outputs_tests_bits(
             result["results"], openai_api_key, style
         )
 
@@ -165,20 +168,7 @@ class BitsPipeline:
             }
 
         # 3) Execução de testes via container
-        test_cases = [
-            [1, 1, 1, 1, None],
-            [1, 0, 1, 0, "BIT32"],
-            [0, 1, 1, 1, "BIT16"],
-            [1, 1, 0, 1, "FIREWALL"],
-            [0, 1, 0, 1, "BIT8"],
-            [1, 0, 0, 1, "BIT16"],
-            [0, 0, 1, 0, "BIT32"],
-            [1, 1, 0, 0, "BIT8"],
-            [0, 0, 0, 1, None],
-            [0, 1, 0, 0, "BIT32"],
-        ]
-
-        result = run_submit(code=code, test_cases=test_cases)
+        result = await run_submit_async(code=code, test_cases=TEST_CASES)
 
         # timeout — mensagem fixa, sem OpenAI
         if result["timed_out"]:
@@ -190,7 +180,7 @@ class BitsPipeline:
 
         # erro de execução — passa pro OpenAI explicar
         if not result["ok"]:
-            error_dict = self._execution.error_execution(
+            error_dict = await self._execution.error_execution(
                 code=code,
                 erro=result["stderr"],
                 openai_api_key=openai_api_key,
@@ -209,4 +199,14 @@ class BitsPipeline:
             "thought": ""
         }
 
-    
+    async def validate_batch(self, codes: List[str], assistant_style: str, function_name: str) -> List[Dict[str, Any]]:
+        """
+        Validação em lote: assinatura de cada código e execução de todas as
+        submissões num único container. Erros de execução voltam crus, sem
+        explicação da OpenAI.
+        """
+        style = _normalize_style(assistant_style)
+        return await validate_batch_codes(
+            codes, TEST_CASES,
+            lambda tree: self._signature.validate_bits_signature(tree=tree, assistant_style=style, spec=self.spec)
+        )
@@ -1,13 +1,44 @@
 import ast
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 from ...validators.signature_validator import SignatureValidator
 from ...validators.semantics_validator import SemanticsValidator
 from ...validators.execution_validator import ExecutionValidator
-from ...runner.container_runner import run_submit, run_tests
+from ...runner.container_runner import run_submit_async, run_tests_async
+from .batch import validate_batch_codes
 
 from ..registry import GameSpec
 
+# Casos de teste usados no RUN e no VALIDATE
+TEST_CASES_BY_FUNCTION = {
+    "jokenpo1": [
+        ["pedra", "pedra", "papel"],
+        ["pedra", "papel", "tesoura"],
+        ["papel", "papel", "pedra"],
+        ["tesoura", "tesoura", "papel"],
+        ["pedra", "papel", "papel"],
+        ["tesoura", "papel", "tesoura"],
+        ["papel", "pedra", "pedra"],
+        ["tesoura", "papel", "papel"],
+        ["papel", "tesoura", "tesoura"],
+        ["pedra", "tesoura", "pedra"],
+    ],
+    "jokenpo2": [
+        ["pedra", "papel", "tesoura", "pedra"],
+        ["papel", "pedra", "papel", "tesoura"],
+        ["tesoura", "tesoura", "pedra", "papel"],
+        ["pedra", "pedra", "papel", "tesoura"],
+        ["papel", "papel", "pedra", "tesoura"],
+        ["tesoura", "tesoura", "pedra", "papel"],
+        ["pedra", "papel", "pedra", "tesoura"],
+        ["pedra", "tesoura", "papel", "papel"],
+        ["papel", "tesoura", "pedra", "pedra"],
+        ["pedra", "tesoura", "tesoura", "papel"],
+    ]
+}
+
+VALID_RETURNS = ["pedra", "papel", "tesoura"]
+
 def _normalize_style(style: str) -> str:
     s = (style or "").strip().upper()
     if s in ("VERBOSE", "SUCCINCT", "INTERMEDIATE", "INTERMEDIARY"):
@@ -68,7 +99,7 @@ class JokenpoPipeline:
                 "thought": ""
             }
 
-        sem_dict = self._semantics.validator(
+        sem_dict = await self._semantics.validator(
             code=code,
             tree=tree,
             assistantStyle=style,
@@ -107,37 +138,9 @@ class JokenpoPipeline:
             return {"valid": False, "answer": sig_msg, "thought": ""}
 
         # 3) Execução de testes via container
-        test_cases_by_function = {
-            "jokenpo1": [
-                ["pedra", "pedra", "papel"],
-                ["pedra", "papel", "tesoura"],
-                ["papel", "papel", "pedra"],
-                ["tesoura", "tesoura", "papel"],
-                ["pedra", "papel", "papel"],
-                ["tesoura", "papel", "tesoura"],
-                ["papel", "pedra", "pedra"],
-                ["tesoura", "papel", "papel"],
-                ["papel", "tesoura", "tesoura"],
-                ["pedra", "tesoura", "pedra"],
-            ],
-            "jokenpo2": [
-                ["pedra", "papel", "tesoura", "pedra"],
-                ["papel", "pedra", "papel", "tesoura"],
-                ["tesoura", "tesoura", "pedra", "papel"],
-                ["pedra", "pedra", "papel", "tesoura"],
-                ["papel", "papel", "pedra", "tesoura"],
-                ["tesoura", "tesoura", "pedra", "papel"],
-                ["pedra", "papel", "pedra", "tesoura"],
-                ["pedra", "tesoura", "papel", "papel"],
-                ["papel", "tesoura", "pedra", "pedra"],
-                ["pedra", "tesoura", "tesoura", "papel"],
-            ]
-        }
-
-        valid_returns = ["pedra", "papel", "tesoura"]
-        test_cases = test_cases_by_function.get(function_name, [])
+        test_cases = TEST_CASES_BY_FUNCTION.get(function_name, [])
 
-        result = run_tests(code=code, test_cases=test_cases, valid_returns=valid_returns)
+        result = await run_tests_async(code=code, test_cases=test_cases, valid_returns=VALID_RETURNS)
 
         if result["timed_out"]:
             return {
@@ -147,7 +150,7 @@ class JokenpoPipeline:
             }
 
         if not result["ok"]:
-            error_dict = self._execution.error_execution(
+            error_dict = await self._execution.error_execution(
                 code=code, erro=result["stderr"],
                 openai_api_key=openai_api_key, assistantStyle=style
             )
@@ -160,7 +163,7 @@ class JokenpoPipeline:
         # verifica se algum caso teve erro de execução
         first_error = next((r for r in result["results"] if not r["valid"]), None)
         if first_error:
-            error_dict = self._execution.error_execution(
+            error_dict = await self._execution.error_execution(
                 code=code, erro=first_error.get("error", "Erro de execução"),
                 openai_api_key=openai_api_key, assistantStyle=style
             )
@@ -180,7 +183,7 @@ class JokenpoPipeline:
             if i < len(test_cases):
                 r["inputs"] = dict(zip(names, test_cases[i]))
 
-        tests = self._execution.feedback_outputs_tests_jokenpo(
+        tests = await self._execution.feedback_outputs_tests_jokenpo(
             result["results"], openai_api_key, style
         )
 
@@ -229,35 +232,8 @@ class JokenpoPipeline:
             return {"valid": False, "answer": sig_msg, "thought": ""}
 
         # 3) Execução de testes via container
-        test_cases_by_function = {
-            "jokenpo1": [
-                ["pedra", "pedra", "papel"],
-                ["pedra", "papel", "tesoura"],
-                ["papel", "papel", "pedra"],
-                ["tesoura", "tesoura", "papel"],
-                ["pedra", "papel", "papel"],
-                ["tesoura", "papel", "tesoura"],
-                ["papel", "pedra", "pedra"],
-                ["tesoura", "papel", "papel"],
-                ["papel", "tesoura", "tesoura"],
-                ["pedra", "tesoura", "pedra"],
-            ],
-            "jokenpo2": [
-                ["pedra", "papel", "tesoura", "pedra"],
-                ["papel", "pedra", "papel", "tesoura"],
-                ["tesoura", "tesoura", "pedra", "papel"],
-                ["pedra", "pedra", "papel", "tesoura"],
-                ["papel", "papel", "pedra", "tesoura"],
-                ["tesoura", "tesoura", "pedra", "papel"],
-                ["pedra", "papel", "pedra", "tesoura"],
-                ["pedra", "tesoura", "papel", "papel"],
-                ["papel", "tesoura", "pedra", "pedra"],
-                ["pedra", "tesoura", "tesoura", "papel"],
-            ]
-        }
-
-        test_cases = test_cases_by_function.get(function_name, [])
-        result = run_submit(code=code, test_cases=test_cases)
+        test_cases = TEST_CASES_BY_FUNCTION.get(function_name, [])
+        result = await run_submit_async(code=code, test_cases=test_cases)
 
         # timeout — mensagem fixa
         if result["timed_out"]:
@@ -269,7 +245,7 @@ class JokenpoPipeline:
 
         # erro de execução — passa pro OpenAI explicar
         if not result["ok"]:
-            error_dict = self._execution.error_execution(
+            error_dict = await self._execution.error_execution(
                 code=code,
                 erro=result["stderr"],
                 openai_api_key=openai_api_key,
@@ -281,4 +257,19 @@ class JokenpoPipeline:
                 "thought": str(error_dict.get("pensamento", ""))
             }
 
-        return {"valid": True, "answer": "aceita", "thought": ""}
\ No newline at end of file
+        return {"valid": True, "answer": "aceita", "thought": ""}
+
+    async def validate_batch(self, codes: List[str], assistant_style: str, function_name: str) -> List[Dict[str, Any]]:
+        """
+        Validação em lote (revalidar uma turma inteira): assinatura de cada
+        código e execução de todas as submissões num único container.
+        Erros de execução voltam crus, sem explicação da OpenAI, para não
+        multiplicar custo e latência pelo tamanho da turma.
+        """
+        style = _normalize_style(assistant_style)
+        return await validate_batch_codes(
+            codes, TEST_CASES_BY_FUNCTION.get(function_name, []),
+            lambda tree: self._signature.validate_signature_and_parameters(
+                tree=tree, assistant_style=style, function_type=function_name
+            )
+        )
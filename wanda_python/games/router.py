@@ -1,4 +1,4 @@
-from typing import Protocol, Dict, Any, Tuple
+from typing import Protocol, Dict, Any, Tuple, List
 from .registry import REGISTRY, GameSpec
 from .pipelines.jokenpo import JokenpoPipeline
 from .pipelines.bits import BitsPipeline
@@ -36,6 +36,11 @@ class GameFeedbackPipeline(Protocol):
           "thought": str
         }
         """
+    async def validate_batch(self, codes: List[str], assistant_style: str, function_name: str) -> List[Dict[str, Any]]:
+        """
+        Validação em lote: executa todas as submissões num único sandbox.
+        Retorna um dict por código, na mesma ordem, no formato de validate().
+        """
 
 def resolve_pipeline(game_name: str, function_name: str) -> Tuple[GameSpec, GameFeedbackPipeline]:
     spec = REGISTRY.get(game_name)
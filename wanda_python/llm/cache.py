@@ -0,0 +1,264 @@
+"""
+Cache das respostas da OpenAI nos feedbacks.
+
+O aluno reenvia o mesmo código (ou o mesmo com outro comentário ou outra
+indentação) para /feedback e /run, e cada chamada custa segundos e tokens.
+A chave é o que decide a resposta: id e versão do template do prompt,
+estilo do assistente, jogo e função, o código normalizado pela AST
+(comentários e espaços não contam) e o contexto que entra no prompt — a
+mensagem de erro ou a tabela de resultados dos testes.
+
+Dois níveis: um LRU em memória e, com WANDA_LLM_CACHE_DB, um SQLite em
+disco que sobrevive a restarts e é compartilhado pelos workers. As entradas
+expiram depois de WANDA_LLM_CACHE_TTL; respostas vazias (erro ou timeout da
+API) nunca são guardadas.
+"""
+import ast
+import asyncio
+import contextvars
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+from opentelemetry import metrics
+
+from .config import LLM_MODEL, LLM_CACHE_SIZE, LLM_CACHE_TTL, LLM_CACHE_DB, LLM_CACHE_DB_MAX_ENTRIES
+from ..runner.result_cache import normalize_code
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+_lookups = meter.create_counter(
+    "wanda.llm.cache.lookups", unit="{lookup}",
+    description="Consultas ao cache de feedbacks, por resultado (memory, disk ou miss)",
+)
+
+# jogo e função da requisição em andamento (ver feedback_scope)
+_scope: contextvars.ContextVar = contextvars.ContextVar("wanda_llm_scope", default=("", ""))
+
+
+def feedback_scope(game: str, function: str) -> None:
+    """Marca o jogo e a função da requisição; vale para as chamadas feitas daqui em diante na mesma task."""
+    _scope.set((game or "", function or ""))
+
+
+def canonical_code(code: str) -> str:
+    # a AST ignora comentários, espaços e indentação; código que não compila
+    # (feedback de sintaxe) fica com a normalização de espaços do runner
+    try:
+        return ast.dump(ast.parse(code), include_attributes=False)
+    except (SyntaxError, ValueError):
+        return normalize_code(code)
+
+
+def feedback_key(template: str, version: str, style: str, code: Optional[str] = None, context=None) -> str:
+    """
+    Chave do feedback. `context` é o que além do código entra no prompt
+    (mensagem de erro, resultados dos testes); precisa ser serializável em JSON.
+    """
+    game, function = _scope.get()
+    code_hash = hashlib.sha256(canonical_code(code).encode()).hexdigest() if code is not None else None
+    payload = json.dumps([LLM_MODEL, template, version, style, game, function, code_hash, context],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class _DiskTier:
+    """Tabela SQLite chave -> resposta; as operações rodam fora do event loop (asyncio.to_thread)."""
+
+    def __init__(self, path: str, max_entries: int, ttl: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        # WAL: os workers leem enquanto um deles escreve
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS feedback ("
+            "key TEXT PRIMARY KEY, answer TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS feedback_accessed ON feedback (accessed)")
+
+    def get(self, key: str) -> Optional[tuple]:
+        """(created, resposta) da entrada, ou None se não existe ou expirou."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT answer, created FROM feedback WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] >= self.ttl:
+                self._conn.execute("DELETE FROM feedback WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE feedback SET accessed = ? WHERE key = ?", (now, key))
+        return row[1], json.loads(row[0])
+
+    def put(self, key: str, answer: dict) -> int:
+        """Grava e devolve quantas entradas saíram para respeitar o limite."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feedback (key, answer, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(answer), now, now),
+            )
+            self._conn.execute("DELETE FROM feedback WHERE created <= ?", (now - self.ttl,))
+            count = self._conn.execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
+            excess = count - self.max_entries
+            if excess > 0:
+                # as menos usadas saem primeiro
+                self._conn.execute(
+                    "DELETE FROM feedback WHERE key IN (SELECT key FROM feedback ORDER BY accessed LIMIT ?)", (excess,)
+                )
+            return max(excess, 0)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class FeedbackCache:
+    """LRU em memória limitado a `max_entries`, com o SQLite opcional atrás; entradas expiram após `ttl` segundos."""
+
+    def __init__(self, max_entries: int, ttl: float, db_path: str = "", db_max_entries: int = 0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[_DiskTier] = None
+        if db_path and max_entries > 0:
+            try:
+                self._disk = _DiskTier(db_path, db_max_entries, ttl)
+            except sqlite3.Error as e:
+                logger.error("Falha ao abrir o cache de feedbacks em disco. caminho=%s erro=%s", db_path, str(e))
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self._disk_evictions = 0
+        self._expired = 0
+        self._disk_errors = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] >= self.ttl:
+                del self._entries[key]
+                self._expired += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+        if entry is not None:
+            _lookups.add(1, {"result": "memory"})
+            return copy.deepcopy(entry[1])
+
+        row = None
+        if self._disk is not None:
+            try:
+                row = await asyncio.to_thread(self._disk.get, key)
+            except sqlite3.Error as e:
+                self._disk_failed("get", e)
+        if row is None:
+            with self._lock:
+                self._misses += 1
+            _lookups.add(1, {"result": "miss"})
+            return None
+        # sobe para a memória com o created do disco: a validade não recomeça
+        created, answer = row
+        self._remember(key, answer, created)
+        with self._lock:
+            self._disk_hits += 1
+        _lookups.add(1, {"result": "disk"})
+        return copy.deepcopy(answer)
+
+    async def put(self, key: str, answer: dict) -> None:
+        if self.max_entries <= 0 or not answer or not answer.get("resposta"):
+            return
+        self._remember(key, copy.deepcopy(answer), time.time())
+        with self._lock:
+            self._stores += 1
+        if self._disk is not None:
+            try:
+                evicted = await asyncio.to_thread(self._disk.put, key, answer)
+            except sqlite3.Error as e:
+                self._disk_failed("put", e)
+                return
+            with self._lock:
+                self._disk_evictions += evicted
+
+    def _remember(self, key: str, answer: dict, created: float) -> None:
+        with self._lock:
+            self._entries[key] = (created, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _disk_failed(self, operation: str, error: Exception) -> None:
+        # disco com problema não derruba o feedback: só perde o cache
+        with self._lock:
+            self._disk_errors += 1
+        logger.warning("Falha no cache de feedbacks em disco. operacao=%s erro=%s", operation, str(error))
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def stats(self) -> dict:
+        disk_entries = None
+        if self._disk is not None:
+            try:
+                disk_entries = self._disk.count()
+            except sqlite3.Error:
+                pass
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "diskEntries": disk_entries,
+                "ttlS": self.ttl,
+                "hits": self._hits,
+                "diskHits": self._disk_hits,
+                "misses": self._misses,
+                "hitRatio": round((self._hits + self._disk_hits) / lookups, 3) if lookups else 0.0,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "diskEvictions": self._disk_evictions,
+                "expired": self._expired,
+                "diskErrors": self._disk_errors,
+            }
+
+
+_cache: Optional[FeedbackCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_feedback_cache() -> FeedbackCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FeedbackCache(LLM_CACHE_SIZE, LLM_CACHE_TTL, LLM_CACHE_DB, LLM_CACHE_DB_MAX_ENTRIES)
+        return _cache
+
+
+def shutdown_feedback_cache() -> None:
+    global _cache
+    with _cache_lock:
+        cache, _cache = _cache, None
+    if cache is not None:
+        cache.close()
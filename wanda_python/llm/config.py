@@ -0,0 +1,20 @@
+import os
+
+# modelo usado nos feedbacks (sintaxe, semântica e execução)
+LLM_MODEL = os.getenv("WANDA_LLM_MODEL", "gpt-4o-mini")
+
+# máximo de chamadas simultâneas à OpenAI por worker; as excedentes esperam a vez
+LLM_MAX_CONCURRENCY = int(os.getenv("WANDA_LLM_MAX_CONCURRENCY", "16"))
+# limite (s) de cada chamada e quantas vezes o cliente repete em erro transitório
+LLM_TIMEOUT = float(os.getenv("WANDA_LLM_TIMEOUT", "20"))
+LLM_MAX_RETRIES = int(os.getenv("WANDA_LLM_MAX_RETRIES", "1"))
+# conexões HTTP mantidas abertas com a API (keep-alive) e por quanto tempo (s) ficam ociosas
+LLM_MAX_CONNECTIONS = int(os.getenv("WANDA_LLM_MAX_CONNECTIONS", "32"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("WANDA_LLM_KEEPALIVE_EXPIRY", "60"))
+
+# cache de feedbacks (0 desativa): entradas em memória e validade (s) de cada uma
+LLM_CACHE_SIZE = int(os.getenv("WANDA_LLM_CACHE_SIZE", "2048"))
+LLM_CACHE_TTL = float(os.getenv("WANDA_LLM_CACHE_TTL", "604800"))
+# arquivo SQLite do nível em disco (vazio desativa) e máximo de entradas nele
+LLM_CACHE_DB = os.getenv("WANDA_LLM_CACHE_DB", "")
+LLM_CACHE_DB_MAX_ENTRIES = int(os.getenv("WANDA_LLM_CACHE_DB_MAX_ENTRIES", "100000"))
@@ -0,0 +1,166 @@
+"""
+Gateway das chamadas à OpenAI usadas nos feedbacks.
+
+Um AsyncOpenAI por chave, criado na primeira chamada e mantido enquanto a
+aplicação roda: as conexões HTTP (e o handshake TLS) são reaproveitadas
+entre requisições. As chamadas são awaitables — o event loop segue
+atendendo outras requisições enquanto a resposta não chega — e um semáforo
+limita quantas ficam em andamento ao mesmo tempo. Chamadas com `cache_key`
+passam antes pelo cache de feedbacks (cache.py).
+"""
+import asyncio
+import json
+import threading
+import logging
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAIError
+from opentelemetry import trace
+
+from .cache import get_feedback_cache
+from .config import (LLM_MODEL, LLM_MAX_CONCURRENCY, LLM_TIMEOUT, LLM_MAX_RETRIES, LLM_MAX_CONNECTIONS,
+    LLM_KEEPALIVE_EXPIRY)
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": (
+        'Responda EXCLUSIVAMENTE com um objeto JSON contendo '
+        'as chaves "pensamento" e "resposta". Nada fora das chaves.'
+    )
+}
+
+EMPTY_ANSWER = {"pensamento": "", "resposta": ""}
+
+
+class LLMGateway:
+    def __init__(self, max_concurrency: int, timeout: float):
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._waiting = 0
+
+    def _client(self, api_key: str) -> AsyncOpenAI:
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                client = AsyncOpenAI(
+                    api_key=api_key,
+                    max_retries=LLM_MAX_RETRIES,
+                    http_client=DefaultAsyncHttpxClient(limits=httpx.Limits(
+                        max_connections=LLM_MAX_CONNECTIONS,
+                        max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+                    )),
+                )
+                self._clients[api_key] = client
+            return client
+
+    async def ask(self, prompt: str, api_key: str, max_tokens: int = 600, timeout: Optional[float] = None,
+                  cache_key: Optional[str] = None) -> dict:
+        """
+        Manda o prompt e devolve o JSON {"pensamento", "resposta"} da resposta.
+        Em erro da API ou timeout devolve os dois campos vazios. Com
+        `cache_key` (ver cache.feedback_key) a resposta sai do cache quando
+        já existe e é guardada quando não.
+        """
+        if cache_key is not None:
+            cached = await get_feedback_cache().get(cache_key)
+            if cached is not None:
+                return cached
+        answer = await self._ask(prompt, api_key, max_tokens, timeout)
+        if cache_key is not None:
+            await get_feedback_cache().put(cache_key, answer)
+        return answer
+
+    async def _ask(self, prompt: str, api_key: str, max_tokens: int, timeout: Optional[float]) -> dict:
+        with tracer.start_as_current_span("openai.chat") as span:
+            span.set_attribute("openai.model", LLM_MODEL)
+            span.set_attribute("openai.prompt_length", len(prompt))
+            client = self._client(api_key)
+
+            with self._lock:
+                self._waiting += 1
+            try:
+                await self._semaphore.acquire()
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+            with self._lock:
+                self._in_flight += 1
+                self._calls += 1
+            try:
+                answer = await client.chat.completions.create(
+                    model=LLM_MODEL,
+                    messages=[SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
+                    response_format={"type": "json_object"},
+                    max_tokens=max_tokens,
+                    timeout=self.timeout if timeout is None else timeout,
+                )
+            except OpenAIError as e:
+                with self._lock:
+                    self._errors += 1
+                span.record_exception(e)
+                span.set_status(trace.StatusCode.ERROR)
+                logger.error("Erro na chamada OpenAI", exc_info=True)
+                return dict(EMPTY_ANSWER)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                self._semaphore.release()
+
+            span.set_attribute("openai.tokens_total", answer.usage.total_tokens)
+            span.set_attribute("openai.tokens_prompt", answer.usage.prompt_tokens)
+            span.set_attribute("openai.tokens_completion", answer.usage.completion_tokens)
+            return json.loads(answer.choices[0].message.content)
+
+    async def close(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            await client.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "maxConcurrency": self.max_concurrency,
+                "inFlight": self._in_flight,
+                "waiting": self._waiting,
+                "calls": self._calls,
+                "errors": self._errors,
+                "clients": len(self._clients),
+            }
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway(LLM_MAX_CONCURRENCY, LLM_TIMEOUT)
+        return _gateway
+
+
+async def shutdown_llm_gateway() -> None:
+    global _gateway
+    with _gateway_lock:
+        gateway, _gateway = _gateway, None
+    if gateway is not None:
+        await gateway.close()
+
+
+async def ask_openai(prompt: str, api_key: str, max_tokens: int = 600, cache_key: Optional[str] = None) -> dict:
+    """Atalho usado pelos validadores: pergunta pelo gateway da aplicação."""
+    return await get_llm_gateway().ask(prompt, api_key, max_tokens=max_tokens, cache_key=cache_key)
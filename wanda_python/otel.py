@@ -8,6 +8,11 @@ from opentelemetry.sdk.resources import Resource
 from opentelemetry.propagate import set_global_textmap
 from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
 from opentelemetry.sdk.trace.sampling import ALWAYS_ON
+# Métricas
+from opentelemetry import metrics
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 # Logs
 from opentelemetry._logs import set_logger_provider
 from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
@@ -23,6 +28,7 @@ def configure_otel():
     })
 
     _configure_traces(resource)
+    _configure_metrics(resource)
     _configure_logs(resource)
     configure_logging()
 
@@ -37,6 +43,15 @@ def _configure_traces(resource):
     trace.set_tracer_provider(provider)
 
 
+def _configure_metrics(resource):
+    exporter = OTLPMetricExporter(
+        endpoint=os.getenv("OTEL_ENDPOINT", "http://localhost:4317"),
+        insecure=True
+    )
+    provider = MeterProvider(resource=resource, metric_readers=[PeriodicExportingMetricReader(exporter)])
+    metrics.set_meter_provider(provider)
+
+
 def _configure_logs(resource):
     logger_provider = LoggerProvider(resource=resource)
     exporter = OTLPLogExporter(
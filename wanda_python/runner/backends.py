@@ -0,0 +1,74 @@
+"""
+Backends de sandbox do runner.
+
+Os pipelines não sabem onde o código dos alunos roda: o container_runner e
+o pool de sessões só falam com o RunnerBackend escolhido em
+WANDA_RUNNER_BACKEND. Um backend novo implementa a interface abaixo e entra
+em BACKENDS (ou via register_backend).
+"""
+from typing import Callable, Dict, Optional, Protocol
+import logging
+
+from .config import RUNNER_BACKEND
+from .docker_cli import DockerCliBackend
+from .docker_api import DockerApiBackend
+from .namespace_runner import NamespaceBackend
+
+logger = logging.getLogger(__name__)
+
+
+class RunnerBackend(Protocol):
+    name: str
+
+    async def execute(self, job: str, timeout: int) -> dict:
+        """
+        Execução one-shot: entrega o job (linha JSON) ao harness e devolve o
+        dict padrão do runner (ok/timed_out/stdout/stderr/returncode...).
+        Timeout e falhas de infraestrutura viram dict, nunca exceção.
+        """
+
+    async def start_session(self, name: str):
+        """
+        Sobe uma sandbox interativa com o harness esperando no stdin.
+        Retorna um objeto com a interface de asyncio.subprocess.Process
+        (stdin, stdout, returncode, kill(), wait()).
+        """
+
+    async def kill(self, name: str, process) -> None:
+        """Mata a sandbox interativa e espera o processo terminar."""
+
+    async def close(self) -> None:
+        """Libera os recursos do backend (conexões, diretórios) no shutdown."""
+
+
+# fábricas dos backends disponíveis, pelo nome usado em WANDA_RUNNER_BACKEND
+BACKENDS: Dict[str, Callable[[], RunnerBackend]] = {
+    DockerCliBackend.name: DockerCliBackend,
+    DockerApiBackend.name: DockerApiBackend,
+    NamespaceBackend.name: NamespaceBackend,
+}
+
+_instances: Dict[str, RunnerBackend] = {}
+
+
+def register_backend(name: str, factory: Callable[[], RunnerBackend]) -> None:
+    BACKENDS[name] = factory
+
+
+def get_backend(name: Optional[str] = None) -> RunnerBackend:
+    """Backend pelo nome (padrão: WANDA_RUNNER_BACKEND), criado uma vez por processo."""
+    name = name or RUNNER_BACKEND
+    backend = _instances.get(name)
+    if backend is None:
+        factory = BACKENDS.get(name)
+        if factory is None:
+            logger.error("Backend de runner desconhecido. backend=%s", name)
+            raise ValueError(f"Backend de runner desconhecido: {name}")
+        backend = _instances[name] = factory()
+    return backend
+
+
+async def shutdown_backends() -> None:
+    for backend in list(_instances.values()):
+        await backend.close()
+    _instances.clear()
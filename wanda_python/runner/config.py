@@ -0,0 +1,124 @@
+import os
+import sys
+
+from .harness import HARNESS_VERSION
+
+# imagem do runner (docker/runner.Dockerfile) — o entrypoint é o harness fixo.
+# a tag acompanha a versão do harness para host e imagem nunca divergirem
+SANDBOX_IMAGE = os.getenv("WANDA_SANDBOX_IMAGE", f"wanda-runner:{HARNESS_VERSION}")
+
+# flags de seguranca compartilhadas por todos os `docker run` do runner
+SANDBOX_DOCKER_FLAGS = [
+    "--network", "none",  # sem acesso à internet
+    "--memory", "128m",  # limite de memória
+    "--cpus", "0.5",  # limite de CPU
+    "--user", "65534:65534",  # roda como usuario sem privilegios
+    "--cap-drop", "ALL",  # remove capacidades extras do container
+    "--security-opt", "no-new-privileges",  # impede escalacao de privilegios
+    "--pids-limit", "64",  # limita quantidade de processos
+    "--read-only",
+]
+
+# como o runner sobe as sandboxes: "docker-cli" (processos `docker run`),
+# "docker-api" (HTTP direto no socket do daemon, sem fork/exec por container) ou
+# "namespace" (sem Docker: namespaces do Linux + seccomp + rlimits, ver sandbox_launcher.py).
+# os nomes válidos são os de backends.BACKENDS
+RUNNER_BACKEND = os.getenv("WANDA_RUNNER_BACKEND", "docker-cli")
+# socket do daemon e versão da Engine API usados pelo backend docker-api
+DOCKER_SOCKET = os.getenv("WANDA_DOCKER_SOCKET", "/var/run/docker.sock")
+DOCKER_API_VERSION = os.getenv("WANDA_DOCKER_API_VERSION", "v1.41")
+# backend namespace: interpretador usado dentro da sandbox, limite de memória
+# (RLIMIT_AS, em MB — é memória virtual, por isso acima do --memory do container)
+# e de processos (o mesmo --pids-limit do container)
+NAMESPACE_PYTHON = os.getenv("WANDA_NS_PYTHON", sys.executable)
+NAMESPACE_MEMORY_MB = int(os.getenv("WANDA_NS_MEMORY_MB", "256"))
+NAMESPACE_PIDS_LIMIT = 64
+
+# pool de sandboxes pré-aquecidas (0 desativa o pool)
+POOL_SIZE = int(os.getenv("WANDA_POOL_SIZE", "0"))
+# quantos jobs um container do pool executa antes de ser substituído — cada
+# job já roda num fork do zygote, então reaproveitar o container é seguro
+POOL_MAX_JOBS_PER_CONTAINER = int(os.getenv("WANDA_POOL_MAX_JOBS", "100"))
+# limite de memória virtual (MB) de cada job dentro do container do pool
+POOL_JOB_MEMORY_MB = int(os.getenv("WANDA_POOL_JOB_MEMORY_MB", "256"))
+# quanto tempo (s) esperar por um container livre antes de cair no caminho frio
+POOL_ACQUIRE_TIMEOUT = float(os.getenv("WANDA_POOL_ACQUIRE_TIMEOUT", "2"))
+# tempo máximo (s) para um container novo do pool ficar pronto
+POOL_BOOT_TIMEOUT = float(os.getenv("WANDA_POOL_BOOT_TIMEOUT", "15"))
+# espera (s) antes de tentar subir de novo um container que falhou no boot
+POOL_RESPAWN_DELAY = float(os.getenv("WANDA_POOL_RESPAWN_DELAY", "5"))
+
+# reaper de kills: tentativas, tempo máximo (s) de cada uma e espera base (s)
+# entre elas — quem deu timeout não espera o container morrer
+KILL_ATTEMPTS = int(os.getenv("WANDA_KILL_ATTEMPTS", "3"))
+KILL_ATTEMPT_TIMEOUT = float(os.getenv("WANDA_KILL_TIMEOUT", "10"))
+KILL_RETRY_DELAY = float(os.getenv("WANDA_KILL_RETRY_DELAY", "1"))
+
+# manda junto de cada código o bytecode compilado no host ("0" desativa);
+# o harness só usa se o Python da sandbox for o mesmo da aplicação
+SANDBOX_BYTECODE = os.getenv("WANDA_SANDBOX_BYTECODE", "1") == "1"
+
+# cache de resultados de run/submit (0 desativa) e validade (s) de cada entrada
+RESULT_CACHE_SIZE = int(os.getenv("WANDA_RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL = float(os.getenv("WANDA_RESULT_CACHE_TTL", "600"))
+
+# tabelas-verdade de estratégias puras (0 desativa): máximo de códigos guardados
+TRUTH_TABLE_SIZE = int(os.getenv("WANDA_TRUTH_TABLE_SIZE", "512"))
+# limite (s) da avaliação de cada código quando vários são avaliados juntos (batch)
+TRUTH_TABLE_ITEM_TIMEOUT = 5
+
+# validação em lote (POST /api/validate/batch): máximo de códigos por pedido
+VALIDATE_BATCH_MAX_CODES = int(os.getenv("WANDA_VALIDATE_BATCH_MAX_CODES", "200"))
+
+# torneios (POST /api/tournament): em quantas sandboxes as partidas são
+# divididas, limite (s) de cada partida e máximo de estratégias por torneio
+TOURNAMENT_SHARDS = int(os.getenv("WANDA_TOURNAMENT_SHARDS", "4"))
+TOURNAMENT_MATCH_TIMEOUT = float(os.getenv("WANDA_TOURNAMENT_MATCH_TIMEOUT", "5"))
+TOURNAMENT_MAX_STRATEGIES = int(os.getenv("WANDA_TOURNAMENT_MAX_STRATEGIES", "64"))
+
+# análise de confrontos (POST /api/analytics/matchups): máximo de estratégias por pedido
+ANALYTICS_MAX_STRATEGIES = int(os.getenv("WANDA_ANALYTICS_MAX_STRATEGIES", "256"))
+# Monte Carlo: limite de partidas sorteadas x rounds por par (o custo cresce com os dois)
+ANALYTICS_MAX_SAMPLE_ROUNDS = int(os.getenv("WANDA_ANALYTICS_MAX_SAMPLE_ROUNDS", "50000"))
+
+# scheduler de admissão: máximo de sandboxes rodando ao mesmo tempo
+SCHEDULER_MAX_SANDBOXES = int(os.getenv("WANDA_MAX_SANDBOXES", "8"))
+# tamanho máximo da fila de espera de cada lane (cheia = 429)
+SCHEDULER_QUEUE_LIMITS = {
+    "session": int(os.getenv("WANDA_QUEUE_LIMIT_SESSION", "50")),
+    "validate": int(os.getenv("WANDA_QUEUE_LIMIT_VALIDATE", "50")),
+    "run": int(os.getenv("WANDA_QUEUE_LIMIT_RUN", "20")),
+}
+# tempo máximo (s) de espera na fila de cada lane; passou disso, 429 com Retry-After
+SCHEDULER_QUEUE_MAX_WAIT = {
+    "session": float(os.getenv("WANDA_QUEUE_MAX_WAIT_SESSION", "10")),
+    "validate": float(os.getenv("WANDA_QUEUE_MAX_WAIT_VALIDATE", "30")),
+    "run": float(os.getenv("WANDA_QUEUE_MAX_WAIT_RUN", "30")),
+}
+
+# pool de containers de sessão pré-aquecidos (0 desativa)
+SESSION_POOL_SIZE = int(os.getenv("WANDA_SESSION_POOL_SIZE", "0"))
+# tempo máximo (s) para um container de sessão ficar pronto
+SESSION_BOOT_TIMEOUT = float(os.getenv("WANDA_SESSION_BOOT_TIMEOUT", "15"))
+# tempo máximo (s) para carregar o código dos jogadores (ack "loaded")
+SESSION_LOAD_TIMEOUT = float(os.getenv("WANDA_SESSION_LOAD_TIMEOUT", "5"))
+# framing dos rounds de sessão: "json" (uma linha por round) ou "binary"
+# (frames com prefixo de tamanho e cartas codificadas em 1 byte)
+SESSION_FRAMING = os.getenv("WANDA_SESSION_FRAMING", "json")
+
+# sessões abertas ao mesmo tempo; acima disso a ociosa mais antiga (LRU) é derrubada.
+# cada sessão segura uma vaga do scheduler: o padrão fica na metade de WANDA_MAX_SANDBOXES
+# para que sessões ociosas não ocupem as vagas de validate/run
+SESSION_MAX_SESSIONS = int(os.getenv("WANDA_MAX_SESSIONS", str(max(1, SCHEDULER_MAX_SANDBOXES // 2))))
+# tempo (s) sem round até a sessão ser considerada abandonada
+SESSION_IDLE_TTL = float(os.getenv("WANDA_SESSION_IDLE_TTL", "120"))
+# tempo máximo de vida (s) de uma sessão, mesmo em uso
+SESSION_MAX_LIFETIME = float(os.getenv("WANDA_SESSION_MAX_LIFETIME", "1800"))
+# intervalo (s) entre as varreduras do reaper de sessões
+SESSION_REAPER_INTERVAL = float(os.getenv("WANDA_SESSION_REAPER_INTERVAL", "10"))
+# máximo de rounds por pedido em /session/{id}/execute-batch
+SESSION_BATCH_MAX_ROUNDS = int(os.getenv("WANDA_SESSION_BATCH_MAX_ROUNDS", "100"))
+
+# socket Unix do broker de sessões, para rodar com vários workers (vazio desativa:
+# cada processo guarda as próprias sessões)
+SESSION_BROKER_SOCKET = os.getenv("WANDA_SESSION_BROKER_SOCKET", "")
@@ -1,280 +1,418 @@
-import subprocess
 import uuid
-import os
 import json
+import random
+import time
 import asyncio
 import logging
+from typing import Optional
+
+from .config import (SESSION_LOAD_TIMEOUT, SESSION_FRAMING, TOURNAMENT_SHARDS, TOURNAMENT_MATCH_TIMEOUT,
+    TRUTH_TABLE_ITEM_TIMEOUT)
+from .backends import get_backend
+from .docker_cli import execute_in_container_sync
+from .protocol import (build_job, bytecode_fields, finish_usage, batch_results_from, FRAME_HEADER, frame, encode_round, decode_response)
+from .metrics import record_usage
+from .result_cache import get_result_cache, cache_key
+from .sandbox_pool import get_pool
+from .scheduler import get_scheduler, SandboxQueueFull, LANE_SESSION, LANE_VALIDATE, LANE_RUN
+from .session_pool import get_session_pool, start_session_container, kill_session_container
+from .session_manager import get_session_manager
+from .session_broker import get_broker_client, SessionBrokerError
+from .truth_table import TruthTable, get_truth_tables, pure_arity, evaluation_inputs
 
 logger = logging.getLogger(__name__)
 
-RUNNER_TMP_DIR = "/tmp/wanda_runner"
-RUNNER_VOLUME_NAME = "wanda_runner_tmp"
-
-_sessions: dict[str, asyncio.subprocess.Process] = {}
-
-def _execute_in_container(script: str, timeout: int = 5) -> dict:
-    # nome único pro arquivo temporário
-    # uuid para evitar colisoes em simultaneos
-    os.makedirs(RUNNER_TMP_DIR, exist_ok=True)
+def _accounted(result: dict, launched_at: float, mode: str, path: str) -> dict:
+    # fecha o usage da execução (wall, spawn, boot) e publica os histogramas
+    finish_usage(result, launched_at)
+    record_usage(result["usage"], mode=mode, path=path, ok=result["ok"])
+    return result
 
-    filename = f"wanda_{uuid.uuid4().hex}.py"
-    tmp_path = os.path.join(RUNNER_TMP_DIR, filename)
-    container_name = f"wanda_runner_{uuid.uuid4().hex}"
 
-    logger.info("Iniciando container. nome=%s", container_name)
+def _run_job(job: str, timeout: int, mode: str) -> dict:
+    # usa um container pré-aquecido do pool quando disponível;
+    # se o pool estiver desativado ou sem containers livres, cai no caminho frio
+    launched_at = time.monotonic()
+    pool = get_pool()
+    if pool is not None:
+        result = pool.execute(job, timeout)
+        if result is not None:
+            return _accounted(result, launched_at, mode, "pool")
+        launched_at = time.monotonic()
+    return _accounted(execute_in_container_sync(job, timeout), launched_at, mode, "docker-cli")
+
+
+async def _run_job_async(job: str, timeout: int, lane: str, mode: str) -> dict:
+    # passa pelo scheduler: limita sandboxes simultâneas e prioriza as lanes.
+    # pode levantar SandboxQueueFull (429) se a fila da lane estiver cheia
+    async with get_scheduler().slot(lane):
+        # o pool conversa com os containers por pipes síncronos — roda numa thread
+        # para não travar o event loop; o caminho frio já é assíncrono
+        launched_at = time.monotonic()
+        pool = get_pool()
+        if pool is not None:
+            result = await asyncio.to_thread(pool.execute, job, timeout)
+            if result is not None:
+                return _accounted(result, launched_at, mode, "pool")
+            launched_at = time.monotonic()
+        backend = get_backend()
+        return _accounted(await backend.execute(job, timeout), launched_at, mode, backend.name)
 
-    try:
-        # escreve o script no diretório compartilhado
-        with open(tmp_path, "w", encoding="utf-8") as f:
-            f.write(script)
-
-        # executa o container com protecoes
-        result = subprocess.run(
-            [
-                "docker", "run", "--rm",  # remove o container ao terminar
-                "--network", "none",  # sem acesso à internet
-                "--name", container_name,  # nome
-                "--memory", "128m",  # limite de memória
-                "--cpus", "0.5",  # limite de CPU
-                "--user", "65534:65534",  # roda como usuario sem privilegios
-                "--cap-drop", "ALL",  # remove capacidades extras do container
-                "--security-opt", "no-new-privileges",  # impede escalacao de privilegios
-                "--pids-limit", "64",  # limita quantidade de processos
-                "--read-only",
-                "-v", f"{RUNNER_VOLUME_NAME}:/scripts:ro",  # monta o volume nomeado em modo leitura
-                "python:3.11-alpine",  # imagem
-                "python", f"/scripts/{filename}"  # executa o arquivo dentro do container
-            ],
-            capture_output=True,  # captura stdout e stderr
-            text=True,  # retorna como string
-            timeout=timeout  # mata se demorar mais que timeout segundos
-        )
 
-        logger.info(
-            "Container finalizado. nome=%s returncode=%s",
-            container_name, result.returncode
-        )
+def run_submit(code: str, test_cases: list, timeout: int = 30) -> dict:
+    cache = get_result_cache()
+    key = cache_key("submit", code, test_cases, None)
+    result = cache.get(key)
+    if result is None:
+        job = build_job("submit", code=code, test_cases=test_cases, **bytecode_fields(code=code))
+        result = _run_job(job, timeout, "submit")
+        cache.put(key, result)
+    return result
 
-        # retorna resultado estruturado
-        return {
-            "ok": result.returncode == 0,
-            "timed_out": False,
-            "stdout": result.stdout.strip(),
-            "stderr": result.stderr.strip(),
-            "returncode": result.returncode
-        }
 
-    except subprocess.TimeoutExpired:
-        # timeout estourou
-        # matar o container
-        logger.error("Timeout. Matando container. nome=%s", container_name)
-        subprocess.run(
-            ["docker", "kill", container_name],
-            capture_output=True,  # silencia o output
-            text=True,
-            check=False
-        )
-        return {
-            "ok": False,
-            "timed_out": True,
-            "stdout": "",
-            "stderr": "Tempo limite de execução atingido.",
-            "returncode": -1
-        }
+async def run_submit_async(code: str, test_cases: list, timeout: int = 30, lane: str = LANE_VALIDATE) -> dict:
+    # hit no cache não ocupa vaga do scheduler
+    cache = get_result_cache()
+    key = cache_key("submit", code, test_cases, None)
+    result = cache.get(key)
+    if result is None:
+        job = build_job("submit", code=code, test_cases=test_cases, **bytecode_fields(code=code))
+        result = await _run_job_async(job, timeout, lane, "submit")
+        cache.put(key, result)
+    return result
 
-    except Exception as e:
-        # erro inesperado
-        logger.error("Erro inesperado ao executar container. erro=%s", str(e))
-        return {
-            "ok": False,
-            "timed_out": False,
-            "stdout": "",
-            "stderr": str(e),
-            "returncode": -1
-        }
 
-    finally:
-        # sempre deleta o arquivo, mesmo se der erro
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+def run_tests(code, test_cases, valid_returns, timeout=5):
+    cache = get_result_cache()
+    key = cache_key("run", code, test_cases, valid_returns)
+    result = cache.get(key)
+    if result is None:
+        job = build_job("run", code=code, test_cases=test_cases, valid_returns=valid_returns,
+                        **bytecode_fields(code=code))
+        result = _check_run_results(_run_job(job, timeout, "run"))
+        cache.put(key, result)
+    return result
 
-def _build_submit_script(code: str, test_cases: list) -> str:
-    return f"""\
-import sys
 
-{code}
+async def run_tests_async(code, test_cases, valid_returns, timeout=5, lane=LANE_RUN):
+    cache = get_result_cache()
+    key = cache_key("run", code, test_cases, valid_returns)
+    result = cache.get(key)
+    if result is None:
+        job = build_job("run", code=code, test_cases=test_cases, valid_returns=valid_returns,
+                        **bytecode_fields(code=code))
+        result = _check_run_results(await _run_job_async(job, timeout, lane, "run"))
+        cache.put(key, result)
+    return result
 
-test_cases = {test_cases}
 
-for i, args in enumerate(test_cases):
-    try:
-        result = strategy(*args)
-    except Exception as e:
-        print(f"Erro no caso {{i}}: {{e}}", file=sys.stderr)
-        sys.exit(1)
+def _build_batch_job(submissions: list, valid_returns, item_timeout: int) -> str:
+    # com valid_returns cada item roda no modo RUN; sem, no modo SUBMIT
+    items = []
+    for code, test_cases in submissions:
+        item = {"code": code, "test_cases": test_cases, **bytecode_fields(code=code)}
+        if valid_returns is not None:
+            item["valid_returns"] = valid_returns
+        items.append(item)
+    item_mode = "run" if valid_returns is not None else "submit"
+    return build_job("batch", item_mode=item_mode, item_timeout=item_timeout, items=items)
 
-sys.exit(0)
-"""
 
+def _batch_timeout(size: int, item_timeout: int) -> int:
+    # cada item tem o próprio limite dentro do container; o container todo
+    # recebe a soma mais uma folga para o boot
+    return size * item_timeout + 10
 
-def run_submit(code: str, test_cases: list, timeout: int = 30) -> dict:
-    script = _build_submit_script(code, test_cases)
-    return _execute_in_container(script, timeout)
 
+async def run_tests_batch_async(submissions: list, valid_returns: list = None, item_timeout: int = 5,
+                                lane: str = LANE_VALIDATE) -> list:
+    """
+    Avalia várias submissões [(code, test_cases), ...] em um único container.
+    Cada uma roda num processo filho isolado, com seu próprio limite de tempo.
+    Retorna um dict padrão do runner por submissão, na mesma ordem.
+    """
+    if not submissions:
+        return []
+    job = _build_batch_job(submissions, valid_returns, item_timeout)
+    result = await _run_job_async(job, _batch_timeout(len(submissions), item_timeout), lane, "batch")
+    return batch_results_from(result, len(submissions))
 
-def _build_run_script(code: str, test_cases: list, valid_returns: list) -> str:
-    return f"""\
-import sys
-import json
 
-{code}
+def _build_match_job(game: str, function_name: str, code_p1: str, code_p2: str, seed, rounds) -> str:
+    return build_job("match", game=game, function=function_name, p1=code_p1, p2=code_p2, seed=seed, rounds=rounds,
+                     **bytecode_fields(p1=code_p1, p2=code_p2))
 
-test_cases = {test_cases}
-valid_returns = {valid_returns}
-results = []
 
-for i, args in enumerate(test_cases):
-    try:
-        output = strategy(*args)
-        game_valid = output in valid_returns
-        entry = {{
-            "output": output,
-            "valid": True,
-            "gameValid": game_valid
-        }}
-        if not game_valid:
-            entry["fallback"] = "NEXT_AVAILABLE_CARD"
-            entry["note"] = "Retorno fora do esperado. O jogo ignora esse valor e usa a próxima carta disponível na mão do jogador."
-        results.append(entry)
-    except Exception as e:
-        results.append({{
-            "output": None,
-            "valid": False,
-            "gameValid": False,
-            "error": str(e)
-        }})
-        break
+async def run_match_async(game: str, function_name: str, code_p1: str, code_p2: str, seed: int = None,
+                          rounds: int = None, timeout: int = 30, lane: str = LANE_SESSION) -> dict:
+    """
+    Joga uma partida inteira entre as duas estratégias em uma única sandbox
+    (regras em games/engine.py). O dict padrão do runner traz a partida em `match`.
+    """
+    job = _build_match_job(game, function_name, code_p1, code_p2, seed, rounds)
+    return await _run_job_async(job, timeout, lane, "match")
 
-print(json.dumps(results))
-sys.exit(0)
-"""
 
+def _tournament_pairs(size: int, seed: int) -> list:
+    # todos contra todos, uma partida por par; a seed de cada partida sai da seed do torneio
+    rng = random.Random(seed)
+    return [(i, j, rng.randrange(2 ** 32)) for i in range(size) for j in range(i + 1, size)]
 
-def run_tests(code, test_cases, valid_returns, timeout=5):
-    script = _build_run_script(code, test_cases, valid_returns)
-    result = _execute_in_container(script, timeout)
 
-    if not result["ok"]:
-        return result
+def _tournament_shards(pairs: list, shards: int) -> list:
+    # intercalado: cada shard recebe partidas de todas as estratégias e os tempos se equilibram
+    count = min(max(1, shards), len(pairs))
+    return [pairs[k::count] for k in range(count)]
 
-    import json
-    last_line = result["stdout"].strip().split("\n")[-1]
-    try:
-        result["results"] = json.loads(last_line)
-    except json.JSONDecodeError:
-        logger.error("Falha ao parsear JSON do container. stdout=%s", result["stdout"])
-        result["ok"] = False
-        result["stderr"] = "Erro interno ao processar resultado."
-        result["results"] = []
 
-    return result
+def _build_tournament_job(game: str, function_name: str, codes: list, pairs: list, rounds) -> str:
+    # cada shard leva só o código das estratégias que jogam nele
+    keys = sorted({index for p1, p2, _ in pairs for index in (p1, p2)})
+    strategies = {str(index): {"code": codes[index], **bytecode_fields(code=codes[index])} for index in keys}
+    return build_job("tournament", game=game, function=function_name, rounds=rounds,
+                     match_timeout=TOURNAMENT_MATCH_TIMEOUT, strategies=strategies,
+                     pairs=[[str(p1), str(p2), seed] for p1, p2, seed in pairs])
 
 
+def _tournament_matches(result: dict, pairs: list) -> list:
+    """
+    Converte a resposta de um shard numa partida por par, com os índices das
+    estratégias em p1/p2. Se o shard inteiro falhou, todas as partidas dele
+    recebem o mesmo erro.
+    """
+    entries = result.get("tournament") if result["ok"] else None
+    if entries is None or len(entries) != len(pairs):
+        error = result["stderr"] or "Erro interno ao processar resultado."
+        return [{"p1": p1, "p2": p2, "seed": seed, "error": error, "timedOut": result["timed_out"]}
+                for p1, p2, seed in pairs]
+    return [{**entry, "p1": p1, "p2": p2} for entry, (p1, p2, _) in zip(entries, pairs)]
 
 
-def _build_session_script(code_p1: str, code_p2: str) -> str:
+async def run_tournament_async(game: str, function_name: str, codes: list, seed: int = None, rounds: int = None,
+                               lane: str = LANE_VALIDATE) -> dict:
     """
-    Gera o script que roda dentro do container durante toda a partida.
-    Fica em loop lendo um JSON por linha do stdin, executa as duas
-    estratégias e escreve um JSON por linha no stdout.
-
-    sys.stdout é redirecionado para /dev/null antes de carregar o código
-    dos jogadores — qualquer print dentro das strategies é silenciado.
-    O stdout real é preservado em _real_stdout e usado exclusivamente
-    para o protocolo JSON de comunicação com o Java.
+    Torneio todos contra todos entre as estratégias `codes`. As partidas são
+    divididas em até WANDA_TOURNAMENT_SHARDS sandboxes; dentro de cada uma o
+    harness compila cada estratégia uma vez e joga as partidas da fatia.
+    Retorna {"seed": ..., "matches": [...]}, uma partida por par (i < j).
     """
-    return f"""\
-import json
-import sys
-import os
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    shards = _tournament_shards(_tournament_pairs(len(codes), seed), TOURNAMENT_SHARDS)
 
-# preserva o stdout real — canal de comunicação com o Java
-_real_stdout = sys.stdout
+    # os shards disputam vagas do scheduler como qualquer job e rodam em paralelo
 
-# redireciona sys.stdout para /dev/null — silencia prints dos jogadores
-sys.stdout = open(os.devnull, "w")
+    async def play(pairs):
+        job = _build_tournament_job(game, function_name, codes, pairs, rounds)
+        result = await _run_job_async(job, _batch_timeout(len(pairs), TOURNAMENT_MATCH_TIMEOUT), lane, "tournament")
+        return _tournament_matches(result, pairs)
 
-# --- código do jogador 1 ---
-{code_p1}
-strategy_p1 = strategy
+    results = await asyncio.gather(*(play(pairs) for pairs in shards))
+    return {"seed": seed, "matches": sorted((match for matches in results for match in matches), key=_pair_order)}
 
-# --- código do jogador 2 ---
-{code_p2}
-strategy_p2 = strategy
 
-# loop de partida: 1 linha de input = 1 round
-for line in sys.stdin:
-    line = line.strip()
-    if not line:
-        continue
-    try:
-        params = json.loads(line)
-        r1 = strategy_p1(*params["p1"])
-        r2 = strategy_p2(*params["p2"])
-        _real_stdout.write(json.dumps({{"p1": r1, "p2": r2}}) + "\\n")
-        _real_stdout.flush()
-    except Exception as e:
-        _real_stdout.write(json.dumps({{"error": str(e)}}) + "\\n")
-        _real_stdout.flush()
-"""
+def _pair_order(match: dict) -> tuple:
+    return match["p1"], match["p2"]
+
+
+def _check_run_results(result: dict) -> dict:
+    if result["ok"] and "results" not in result:
+        logger.error("Resposta do harness sem resultados. stdout=%s", result["stdout"])
+        result["ok"] = False
+        result["stderr"] = "Erro interno ao processar resultado."
+        result["results"] = []
+    return result
 
 
-async def create_session(code_p1: str, code_p2: str) -> str:
+async def _evaluate_truth_tables(items: list) -> list:
+    # todo o espaço de entradas de cada código: um job run para um código só,
+    # um batch (um fork por código no mesmo container) para vários
+    if len(items) == 1:
+        code, arity = items[0]
+        inputs, valid_returns = evaluation_inputs(arity)
+        result = await run_tests_async(code, inputs, valid_returns, lane=LANE_SESSION)
+        results = [result]
+    else:
+        submissions = [(code, evaluation_inputs(arity)[0]) for code, arity in items]
+        # os retornos válidos só marcam gameValid: os dois jogos cabem na mesma lista
+        valid_returns = sorted({card for _, arity in items for card in evaluation_inputs(arity)[1]})
+        job = _build_batch_job(submissions, valid_returns, TRUTH_TABLE_ITEM_TIMEOUT)
+        batch = await _run_job_async(job, _batch_timeout(len(items), TRUTH_TABLE_ITEM_TIMEOUT), LANE_VALIDATE, "batch")
+        if not batch["ok"]:
+            raise RuntimeError(batch["stderr"] or "Falha no batch de tabelas-verdade.")
+        results = batch_results_from(batch, len(items))
+
+    evaluated = []
+    for result in results:
+        if result["ok"] and "results" in result:
+            evaluated.append(result["results"])
+        elif result["timed_out"] or len(items) > 1 or result["returncode"] == 1:
+            # estratégia que trava, levanta exceção ou derruba o próprio fork não
+            # vira tabela (returncode 1 = o harness respondeu com o erro do código)
+            evaluated.append(None)
+        else:
+            # a sandbox falhou antes de avaliar o código: não guarda nada, tenta de novo depois
+            raise RuntimeError(result["stderr"])
+    return evaluated
+
+
+async def truth_table(code: str) -> Optional[TruthTable]:
+    """Tabela-verdade da estratégia (avaliada na sandbox na primeira vez), ou None se não for pura."""
+    return await get_truth_tables().get_or_build(code, _evaluate_truth_tables)
+
+
+async def truth_tables(codes: list) -> list:
+    """Tabelas-verdade de vários códigos; os que faltam são avaliados numa única sandbox."""
+    return await get_truth_tables().get_or_build_many(codes, _evaluate_truth_tables)
+
+
+async def _session_tables(code_p1: str, code_p2: str) -> Optional[tuple]:
+    # a sessão só dispensa o container se as duas estratégias forem puras
+    if pure_arity(code_p1) is None or pure_arity(code_p2) is None:
+        return None
+    tables = await asyncio.gather(truth_table(code_p1), truth_table(code_p2))
+    return tables if all(table is not None for table in tables) else None
+
+
+async def create_session(code_p1: str, code_p2: str, framing: str = None) -> str:
+    # com vários workers, as sessões moram no worker dono do broker
+    broker = get_broker_client()
+    if broker is not None:
+        try:
+            return await broker.call("create", p1=code_p1, p2=code_p2, framing=framing)
+        except SessionBrokerError as e:
+            # dono fora do ar (outro worker assume o lock) ou sem conseguir criar:
+            # mesmo contrato do caminho local sem vaga — 429 e o cliente tenta de novo
+            logger.error("Falha no broker de sessoes ao criar sessao. erro=%s", str(e))
+            raise SandboxQueueFull(LANE_SESSION, retry_after=1)
+
     session_id = uuid.uuid4().hex
-    container_name = f"wanda_session_{session_id}"
-    script = _build_session_script(code_p1, code_p2)
 
-    # escreve o script no volume compartilhado
-    os.makedirs(RUNNER_TMP_DIR, exist_ok=True)
-    filename = f"wanda_session_{session_id}.py"
-    tmp_path = os.path.join(RUNNER_TMP_DIR, filename)
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        f.write(script)
+    # no limite de sessões, derruba a ociosa usada há mais tempo — antes das
+    # tabelas-verdade, cuja avaliação roda numa vaga da lane de sessão e
+    # ficaria na fila atrás das próprias sessões ociosas
+    sessions = get_session_manager()
+    handed = await sessions.make_room()
+    scheduler = get_scheduler()
+
+    try:
+        tables = await _session_tables(code_p1, code_p2)
+    except BaseException:
+        if handed:
+            scheduler.release()
+        raise
+    if tables is not None:
+        # estratégias puras: os rounds saem das tabelas, sem container nem vaga do scheduler
+        if handed:
+            scheduler.release()
+        sessions.add(session_id, {"tables": tables, "codes": (code_p1, code_p2)})
+        logger.info("Sessao criada com tabelas-verdade. session_id=%s", session_id)
+        return session_id
 
     logger.info("Criando sessao. session_id=%s", session_id)
 
-    # sobe o container em modo interativo (stdin/stdout abertos)
-    # --name garante que temos um handle pra matar o container via docker kill
-    # stderr=STDOUT evita deadlock de buffer no stderr
-    # -u desativa o buffering do stdout dentro do container
-    process = await asyncio.create_subprocess_exec(
-        "docker", "run", "--rm", "--interactive", "--init",
-        "--name", container_name,
-        "--network", "none",
-        "--memory", "128m",
-        "--cpus", "0.5",
-        "--user", "65534:65534",
-        "--cap-drop", "ALL",
-        "--security-opt", "no-new-privileges",
-        "--pids-limit", "64",
-        "--read-only",
-        "-v", f"{RUNNER_VOLUME_NAME}:/scripts:ro",
-        "python:3.11-alpine",
-        "python", "-u", f"/scripts/{filename}",
-        stdin=asyncio.subprocess.PIPE,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.STDOUT,  # mescla stderr no stdout — evita deadlock
-    )
+    # a sessão ocupa uma vaga do scheduler (lane de maior prioridade)
+    # do create até o _kill_session; se o make_room derrubou uma sessão,
+    # a vaga dela já é nossa
+    if not handed:
+        await scheduler.acquire(LANE_SESSION)
+
+    try:
+        # usa um container pré-aquecido quando houver; senão sobe um na hora
+        pool = get_session_pool()
+        container = pool.acquire() if pool is not None else None
+        if container is None:
+            container = await start_session_container()
+    except BaseException:
+        scheduler.release()
+        raise
+
+    process = container.process
+    try:
+        # entrega o código dos jogadores e espera o harness confirmar o carregamento
+        # o framing dos rounds é negociado aqui; o harness confirma no ack
+        codes = {"p1": code_p1, "p2": code_p2, "framing": framing or SESSION_FRAMING,
+                 **bytecode_fields(p1=code_p1, p2=code_p2)}
+        process.stdin.write((json.dumps(codes) + "\n").encode())
+        await process.stdin.drain()
+        raw = await asyncio.wait_for(process.stdout.readline(), timeout=SESSION_LOAD_TIMEOUT)
+        ack = json.loads(raw.decode().strip())
+    except asyncio.CancelledError:
+        kill_session_container(container)
+        scheduler.release()
+        raise
+    except Exception as e:
+        logger.error("Falha ao carregar codigo na sessao. session_id=%s erro=%s", session_id, str(e) or type(e).__name__)
+        kill_session_container(container)
+        scheduler.release()
+        # o Java recebe o sessionId normalmente e o erro aparece no primeiro round,
+        # como acontecia quando o código só era carregado dentro do loop de rounds
+        timed_out = isinstance(e, asyncio.TimeoutError)
+        sessions.add(session_id, {
+            "failure": {
+                "ok": False,
+                "player1Choice": None,
+                "player2Choice": None,
+                "error": "TIMEOUT" if timed_out else "EXECUTION_ERROR",
+                "errorDetail": "Tempo limite do round atingido." if timed_out else str(e),
+            }
+        })
+        return session_id
+
+    if not ack.get("loaded"):
+        # o harness responde {"error": ...} em todos os rounds — mantém a sessão
+        logger.warning("Codigo dos jogadores nao carregou. session_id=%s erro=%s", session_id, ack.get("error"))
+    else:
+        record_usage(ack.get("usage"), mode="session", path=get_backend().name, ok=True)
 
     # guarda processo e nome do container juntos
-    _sessions[session_id] = {"process": process, "container_name": container_name}
-    logger.info("Sessao criada. session_id=%s pid=%s", session_id, process.pid)
+    framing = ack.get("framing", "json")
+    sessions.add(session_id, {
+        "process": process,
+        "container_name": container.container_name,
+        "container": container,
+        "framing": framing,
+    })
+    logger.info("Sessao criada. session_id=%s pid=%s framing=%s", session_id, process.pid, framing)
 
     return session_id
 
 
 async def execute_round(session_id: str, params_p1: list, params_p2: list, timeout: int = 5) -> dict:
-    session = _sessions.get(session_id)
+    broker = get_broker_client()
+    if broker is not None:
+        try:
+            return await broker.call("execute", session_id=session_id, p1=params_p1, p2=params_p2, timeout=timeout)
+        except SessionBrokerError as e:
+            logger.error("Falha no broker de sessoes. session_id=%s erro=%s", session_id, str(e))
+            return _round_error("EXECUTION_ERROR", str(e))
+
+    # checkout protege a sessão do reaper/LRU enquanto o round roda
+    sessions = get_session_manager()
+    session = sessions.checkout(session_id)
+    try:
+        return await _execute_round(session_id, session, params_p1, params_p2, timeout)
+    finally:
+        sessions.checkin(session)
+
+
+async def _execute_round(session_id: str, session, params_p1: list, params_p2: list, timeout: int) -> dict:
+    if session is not None and "failure" in session:
+        # sessão que falhou ao carregar o código — reporta o erro uma vez
+        await _kill_session(session_id)
+        return session["failure"]
+
+    if session is not None and "tables" in session:
+        result = await _table_round(session, params_p1, params_p2, timeout)
+        if result["ok"]:
+            logger.info("Round executado. session_id=%s p1=%s p2=%s",
+                        session_id, result["player1Choice"], result["player2Choice"])
+        else:
+            logger.error("Erro no round. session_id=%s erro=%s detalhe=%s",
+                         session_id, result["error"], result["errorDetail"])
+            await _kill_session(session_id)
+        return result
+
     process = session["process"] if session else None
 
     if process is None:
@@ -284,19 +422,17 @@ async def execute_round(session_id: str, params_p1: list, params_p2: list, timeo
             "player1Choice": None,
             "player2Choice": None,
             "error": "SESSION_NOT_FOUND",
-            "errorDetail": f"Sessão '{session_id}' não existe ou já foi encerrada.",
+            "errorDetail": get_session_manager().not_found_detail(session_id),
         }
 
-    # monta o payload do round
-    payload = json.dumps({"p1": params_p1, "p2": params_p2}) + "\n"
-
     try:
-        # escreve no stdin e aguarda 1 linha no stdout com timeout por round
-        process.stdin.write(payload.encode())
+        # escreve o round no stdin e aguarda a resposta com timeout por round
+        started = time.monotonic()
+        process.stdin.write(_round_payload(session, params_p1, params_p2))
         await process.stdin.drain()
 
-        raw = await asyncio.wait_for(process.stdout.readline(), timeout=timeout)
-        response = json.loads(raw.decode().strip())
+        response = await asyncio.wait_for(_read_round_response(session), timeout=timeout)
+        usage = {**response.get("usage", {}), "wallMs": round((time.monotonic() - started) * 1000, 3)}
 
         # o script pode retornar {"error": "..."} em caso de exceção interna
         if "error" in response:
@@ -318,12 +454,14 @@ async def execute_round(session_id: str, params_p1: list, params_p2: list, timeo
             "Round executado. session_id=%s p1=%s p2=%s",
             session_id, response["p1"], response["p2"]
         )
+        record_usage(usage, mode="round", framing=session.get("framing"), ok=True)
         return {
             "ok": True,
             "player1Choice": response["p1"],
             "player2Choice": response["p2"],
             "error": None,
             "errorDetail": None,
+            "usage": usage,
         }
 
     except asyncio.TimeoutError:
@@ -350,8 +488,206 @@ async def execute_round(session_id: str, params_p1: list, params_p2: list, timeo
         }
 
 
+async def execute_rounds(session_id: str, rounds: list, timeout: int = 5) -> list:
+    """
+    Executa vários rounds de uma vez: [(params_p1, params_p2), ...].
+    Todas as linhas são enviadas ao container antes de ler as respostas
+    (pipelining), e cada round tem o próprio timeout de leitura.
+    Retorna um dict por round, no mesmo formato de execute_round.
+    Se algum round falhar a sessão é encerrada no fim, como no execute_round.
+    """
+    broker = get_broker_client()
+    if broker is not None:
+        try:
+            return await broker.call("execute_batch", session_id=session_id, rounds=rounds, timeout=timeout)
+        except SessionBrokerError as e:
+            logger.error("Falha no broker de sessoes. session_id=%s erro=%s", session_id, str(e))
+            return [_round_error("EXECUTION_ERROR", str(e)) for _ in rounds]
+
+    sessions = get_session_manager()
+    session = sessions.checkout(session_id)
+    try:
+        return await _execute_rounds(session_id, session, rounds, timeout)
+    finally:
+        sessions.checkin(session)
+
+
+async def _execute_rounds(session_id: str, session, rounds: list, timeout: int) -> list:
+    if session is not None and "failure" in session:
+        await _kill_session(session_id)
+        return [session["failure"]] + [_round_error("EXECUTION_ERROR", "Round não executado: sessão encerrada.")
+                                       for _ in rounds[1:]]
+
+    if session is not None and "tables" in session:
+        return await _table_rounds(session_id, session, rounds, timeout)
+
+    process = session["process"] if session else None
+
+    if process is None:
+        logger.error("Sessao nao encontrada. session_id=%s", session_id)
+        detail = get_session_manager().not_found_detail(session_id)
+        return [_round_error("SESSION_NOT_FOUND", detail) for _ in rounds]
+
+    payload = b"".join(_round_payload(session, p1, p2) for p1, p2 in rounds)
+
+    async def write_all():
+        process.stdin.write(payload)
+        await process.stdin.drain()
+
+    # escreve em paralelo com a leitura: se o container encher o pipe de saída
+    # antes de terminarmos de escrever, ninguém fica travado
+    writer = asyncio.create_task(write_all())
+    results = []
+    failed = False
+    try:
+        for _ in rounds:
+            if failed:
+                results.append(_round_error("EXECUTION_ERROR", "Round não executado: sessão encerrada."))
+                continue
+            try:
+                response = await asyncio.wait_for(_read_round_response(session), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.error("Timeout no round. session_id=%s", session_id)
+                results.append(_round_error("TIMEOUT", "Tempo limite do round atingido."))
+                failed = True
+                continue
+            except Exception as e:
+                logger.error("Erro inesperado no round. session_id=%s erro=%s", session_id, str(e))
+                results.append(_round_error("EXECUTION_ERROR", str(e)))
+                failed = True
+                continue
+
+            if "error" in response:
+                # erro de execução na estratégia não trava o container: os
+                # rounds seguintes já enviados continuam sendo respondidos
+                results.append(_round_error("EXECUTION_ERROR", response["error"]))
+                continue
+
+            # rounds em pipeline não têm tempo de parede próprio no host:
+            # fica o que o harness mediu
+            usage = response.get("usage", {})
+            record_usage(usage, mode="round", framing=session.get("framing"), ok=True)
+            results.append({
+                "ok": True,
+                "player1Choice": response["p1"],
+                "player2Choice": response["p2"],
+                "error": None,
+                "errorDetail": None,
+                "usage": usage,
+            })
+    finally:
+        if not writer.done():
+            writer.cancel()
+        try:
+            await writer
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    logger.info(
+        "Rounds executados em lote. session_id=%s total=%s erros=%s",
+        session_id, len(results), sum(1 for r in results if not r["ok"])
+    )
+    if any(not r["ok"] for r in results):
+        # mesma regra do execute_round: depois de um erro a sessão é encerrada
+        await _kill_session(session_id)
+    return results
+
+
+async def _table_round(session: dict, params_p1: list, params_p2: list, timeout: int) -> dict:
+    """
+    Round de uma sessão de estratégias puras: cada escolha sai da tabela-verdade.
+    Parâmetros fora do espaço do jogo rodam one-shot na sandbox — para uma
+    estratégia pura o resultado é o mesmo que o container da sessão daria.
+    """
+    started = time.monotonic()
+    choices = []
+    for code, table, params in zip(session["codes"], session["tables"], (params_p1, params_p2)):
+        found, choice = table.lookup(params)
+        if not found:
+            result = await run_tests_async(code, [params], [], timeout=timeout, lane=LANE_SESSION)
+            if result["timed_out"]:
+                return _round_error("TIMEOUT", "Tempo limite do round atingido.")
+            if not result["ok"]:
+                return _round_error("EXECUTION_ERROR", result["stderr"])
+            entry = result["results"][0]
+            if not entry["valid"]:
+                return _round_error("EXECUTION_ERROR", entry["error"])
+            choice = entry["output"]
+        choices.append(choice)
+
+    usage = {"wallMs": round((time.monotonic() - started) * 1000, 3)}
+    record_usage(usage, mode="round", framing="table", ok=True)
+    return {
+        "ok": True,
+        "player1Choice": choices[0],
+        "player2Choice": choices[1],
+        "error": None,
+        "errorDetail": None,
+        "usage": usage,
+    }
+
+
+async def _table_rounds(session_id: str, session: dict, rounds: list, timeout: int) -> list:
+    # mesma regra do lote com container: erro de execução não interrompe os
+    # rounds seguintes, timeout sim; com qualquer erro a sessão é encerrada no fim
+    results = []
+    failed = False
+    for params_p1, params_p2 in rounds:
+        if failed:
+            results.append(_round_error("EXECUTION_ERROR", "Round não executado: sessão encerrada."))
+            continue
+        result = await _table_round(session, params_p1, params_p2, timeout)
+        failed = result["error"] == "TIMEOUT"
+        results.append(result)
+
+    logger.info(
+        "Rounds executados em lote. session_id=%s total=%s erros=%s",
+        session_id, len(results), sum(1 for r in results if not r["ok"])
+    )
+    if any(not r["ok"] for r in results):
+        await _kill_session(session_id)
+    return results
+
+
+def _round_payload(session: dict, params_p1: list, params_p2: list) -> bytes:
+    if session.get("framing") == "binary":
+        return frame(encode_round(params_p1, params_p2))
+    return (json.dumps({"p1": params_p1, "p2": params_p2}) + "\n").encode()
+
+
+async def _read_round_response(session: dict) -> dict:
+    # nos dois framings a resposta vira o mesmo dict: {"p1", "p2"} ou {"error"}
+    stdout = session["process"].stdout
+    if session.get("framing") == "binary":
+        header = await stdout.readexactly(FRAME_HEADER.size)
+        (size,) = FRAME_HEADER.unpack(header)
+        return decode_response(await stdout.readexactly(size))
+    raw = await stdout.readline()
+    return json.loads(raw.decode().strip())
+
+
+def _round_error(error: str, detail: str) -> dict:
+    return {
+        "ok": False,
+        "player1Choice": None,
+        "player2Choice": None,
+        "error": error,
+        "errorDetail": detail,
+    }
+
+
 async def close_session(session_id: str) -> None:
-    if session_id not in _sessions:
+    broker = get_broker_client()
+    if broker is not None:
+        try:
+            await broker.call("close", session_id=session_id)
+        except SessionBrokerError as e:
+            # como no caminho local, fechar uma sessão que não dá para alcançar não é erro:
+            # se o dono caiu, os containers dele já foram junto
+            logger.warning("Falha no broker de sessoes ao fechar sessao. session_id=%s erro=%s", session_id, str(e))
+        return
+
+    if session_id not in get_session_manager():
         logger.warning("Tentativa de fechar sessao inexistente. session_id=%s", session_id)
         return
 
@@ -360,22 +696,5 @@ async def close_session(session_id: str) -> None:
 
 
 async def _kill_session(session_id: str) -> None:
-    session = _sessions.pop(session_id, None)
-    if session is None:
-        return
-
-    process = session["process"]
-    container_name = session["container_name"]
-
-    try:
-        # docker kill fala direto com o daemon — garante que o container morre
-        killer = await asyncio.create_subprocess_exec(
-            "docker", "kill", container_name,
-            stdout=asyncio.subprocess.DEVNULL,
-            stderr=asyncio.subprocess.DEVNULL,
-        )
-        await killer.wait()
-        process.kill()
-        await process.wait()
-    except Exception as e:
-        logger.warning("Erro ao matar processo da sessao. session_id=%s erro=%s", session_id, str(e))
\ No newline at end of file
+    # libera a vaga do scheduler e mata o container (ver SessionManager.kill)
+    await get_session_manager().kill(session_id)
@@ -0,0 +1,367 @@
+"""
+Cliente mínimo da Docker Engine API pelo socket Unix.
+
+Substitui os processos `docker run` / `docker kill` do caminho assíncrono
+quando WANDA_RUNNER_BACKEND=docker-api: as chamadas de create/start/wait/kill
+reaproveitam conexões HTTP/1.1 keep-alive com o daemon, e o stdin/stdout do
+container passa por uma conexão de attach (HTTP upgrade) própria de cada
+container, sem fork/exec do CLI.
+
+As proteções da sandbox são as mesmas do CLI: a configuração do container é
+traduzida de SANDBOX_DOCKER_FLAGS, e uma flag sem tradução derruba a
+chamada em vez de ser ignorada.
+"""
+import asyncio
+import json
+import uuid
+import logging
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+
+from .config import SANDBOX_IMAGE, SANDBOX_DOCKER_FLAGS, DOCKER_SOCKET, DOCKER_API_VERSION
+from .kill_reaper import get_kill_reaper
+from .protocol import parse_output, error_result, timeout_result
+
+logger = logging.getLogger(__name__)
+
+# conexões ociosas mantidas abertas com o daemon
+_MAX_IDLE_CONNECTIONS = 8
+_STREAM_LIMIT = 16 * 1024 * 1024
+
+_STDOUT, _STDERR = 1, 2
+
+_MEMORY_UNITS = {"b": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+
+
+class DockerAPIError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Docker API {status}: {message}")
+        self.status = status
+
+
+def _parse_memory(value: str) -> int:
+    value = value.strip().lower()
+    if value[-1] in _MEMORY_UNITS:
+        return int(float(value[:-1]) * _MEMORY_UNITS[value[-1]])
+    return int(value)
+
+
+def sandbox_container_config(image: str, init: bool = False) -> dict:
+    """Traduz SANDBOX_DOCKER_FLAGS para o corpo do POST /containers/create."""
+    config = {
+        "Image": image,
+        "AttachStdin": True,
+        "AttachStdout": True,
+        "AttachStderr": True,
+        "OpenStdin": True,
+        "StdinOnce": True,
+        "Tty": False,
+    }
+    host = {"AutoRemove": True, "Init": init}
+
+    flags = list(SANDBOX_DOCKER_FLAGS)
+    while flags:
+        flag = flags.pop(0)
+        if flag == "--read-only":
+            host["ReadonlyRootfs"] = True
+            continue
+        value = flags.pop(0)
+        if flag == "--network":
+            host["NetworkMode"] = value
+        elif flag == "--memory":
+            host["Memory"] = _parse_memory(value)
+        elif flag == "--cpus":
+            host["NanoCpus"] = int(float(value) * 1e9)
+        elif flag == "--user":
+            config["User"] = value
+        elif flag == "--cap-drop":
+            host.setdefault("CapDrop", []).append(value)
+        elif flag == "--security-opt":
+            host.setdefault("SecurityOpt", []).append(value)
+        elif flag == "--pids-limit":
+            host["PidsLimit"] = int(value)
+        else:
+            raise ValueError(f"Flag de sandbox sem tradução para a Docker API: {flag}")
+
+    config["HostConfig"] = host
+    return config
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, dict, bytes]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Daemon do docker fechou a conexão.")
+    status = int(status_line.split()[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, value = line.decode("latin-1").split(":", 1)
+        headers[name.strip().lower()] = value.strip()
+
+    if status in (101, 204, 304):
+        return status, headers, b""
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        return status, headers, b"".join(chunks)
+    if "content-length" in headers:
+        return status, headers, await reader.readexactly(int(headers["content-length"]))
+    headers["connection"] = "close"
+    return status, headers, await reader.read()
+
+
+class DockerAPI:
+    """Conexões HTTP com o daemon, reaproveitadas entre chamadas."""
+
+    def __init__(self, socket_path: str, api_version: str):
+        self.socket_path = socket_path
+        self.prefix = f"/{api_version}" if api_version else ""
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def _open(self):
+        return await asyncio.open_unix_connection(self.socket_path, limit=_STREAM_LIMIT)
+
+    @staticmethod
+    def _request_bytes(method: str, path: str, body: Optional[dict], extra_headers: str = "") -> bytes:
+        data = json.dumps(body).encode() if body is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            "Host: docker\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"{extra_headers}"
+            "\r\n"
+        )
+        return head.encode() + data
+
+    async def request(self, method: str, path: str, body: dict = None):
+        """Faz a chamada e devolve o JSON da resposta (ou None); erro HTTP vira DockerAPIError."""
+        reader, writer = self._idle.pop() if self._idle else await self._open()
+        try:
+            writer.write(self._request_bytes(method, self.prefix + path, body))
+            await writer.drain()
+            status, headers, payload = await _read_response(reader)
+        except BaseException:
+            # cancelado ou quebrado no meio da resposta: a conexão não serve mais
+            writer.close()
+            raise
+
+        if headers.get("connection", "").lower() == "close" or len(self._idle) >= _MAX_IDLE_CONNECTIONS:
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+
+        if status >= 400:
+            try:
+                message = json.loads(payload).get("message", "")
+            except ValueError:
+                message = payload.decode(errors="replace")
+            raise DockerAPIError(status, message)
+        return json.loads(payload) if payload else None
+
+    async def attach(self, container_id: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Abre a conexão de attach (stdin/stdout/stderr) — depois do 101 ela vira o stream cru."""
+        reader, writer = await self._open()
+        path = f"{self.prefix}/containers/{container_id}/attach?stream=1&stdin=1&stdout=1&stderr=1"
+        writer.write(self._request_bytes("POST", path, None, "Connection: Upgrade\r\nUpgrade: tcp\r\n"))
+        await writer.drain()
+        status, _, payload = await _read_response(reader)
+        if status not in (101, 200):
+            writer.close()
+            raise DockerAPIError(status, payload.decode(errors="replace"))
+        return reader, writer
+
+    async def create(self, name: str, config: dict) -> str:
+        response = await self.request("POST", f"/containers/create?name={quote(name)}", config)
+        return response["Id"]
+
+    async def start(self, container_id: str) -> None:
+        await self.request("POST", f"/containers/{container_id}/start")
+
+    async def wait(self, container_id: str) -> int:
+        response = await self.request("POST", f"/containers/{container_id}/wait?condition=next-exit")
+        return int(response.get("StatusCode", -1))
+
+    async def kill(self, container_id: str) -> None:
+        try:
+            await self.request("POST", f"/containers/{container_id}/kill")
+        except DockerAPIError as e:
+            # 404/409: o container já saiu (e o AutoRemove já levou)
+            if e.status not in (404, 409):
+                raise
+
+    async def remove(self, container_id: str) -> None:
+        try:
+            await self.request("DELETE", f"/containers/{container_id}?force=1")
+        except DockerAPIError as e:
+            if e.status not in (404, 409):
+                raise
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Optional[Tuple[int, bytes]]:
+    # stream multiplexado do attach sem TTY: [tipo, 0, 0, 0, tamanho uint32] + dados
+    try:
+        header = await reader.readexactly(8)
+        return header[0], await reader.readexactly(int.from_bytes(header[4:8], "big"))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+
+
+class AttachedContainer:
+    """
+    Container anexado pela API com a mesma interface usada de um
+    asyncio.subprocess.Process (stdin, stdout, returncode, kill, wait),
+    para as sessões não precisarem saber qual backend subiu o container.
+    """
+
+    def __init__(self, container_id: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.container_id = container_id
+        self.pid = container_id[:12]
+        self.returncode: Optional[int] = None
+        self.stdin = writer
+        self.stdout = asyncio.StreamReader(limit=_STREAM_LIMIT)
+        self._pump = asyncio.get_running_loop().create_task(self._demux(reader))
+
+    async def _demux(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                frame = await _read_frame(reader)
+                if frame is None:
+                    break
+                # stderr do harness é descartado; só o protocolo vai para o stdout
+                if frame[0] == _STDOUT:
+                    self.stdout.feed_data(frame[1])
+        finally:
+            self.stdout.feed_eof()
+            if self.returncode is None:
+                self.returncode = -1
+
+    def kill(self) -> None:
+        self.stdin.close()
+
+    async def wait(self) -> int:
+        await asyncio.gather(self._pump, return_exceptions=True)
+        return self.returncode
+
+
+async def start_attached(name: str, init: bool = True) -> AttachedContainer:
+    """Cria, anexa e inicia um container interativo (sessões)."""
+    api = get_docker_api()
+    container_id = await api.create(name, sandbox_container_config(SANDBOX_IMAGE, init=init))
+    try:
+        reader, writer = await api.attach(container_id)
+        await api.start(container_id)
+    except BaseException:
+        await api.remove(container_id)
+        raise
+    return AttachedContainer(container_id, reader, writer)
+
+
+async def execute_in_container(job: str, timeout: int = 5) -> dict:
+    """Mesmo contrato do docker_cli.execute_in_container, sem processos do CLI."""
+    api = get_docker_api()
+    container_name = f"wanda_runner_{uuid.uuid4().hex}"
+    logger.info("Iniciando container pela API. nome=%s timeout=%s", container_name, timeout)
+
+    try:
+        container_id = await api.create(container_name, sandbox_container_config(SANDBOX_IMAGE))
+        reader, writer = await api.attach(container_id)
+    except Exception as e:
+        logger.error("Falha ao criar container pela API. nome=%s erro=%s", container_name, str(e))
+        return error_result(str(e))
+
+    stdout, stderr = [], []
+
+    async def run() -> int:
+        # o wait é registrado antes do start para não perder a saída (AutoRemove)
+        waiter = asyncio.get_running_loop().create_task(api.wait(container_id))
+        try:
+            await api.start(container_id)
+            writer.write(job.encode() + b"\n")
+            await writer.drain()
+            writer.write_eof()
+            while True:
+                frame = await _read_frame(reader)
+                if frame is None:
+                    break
+                (stdout if frame[0] == _STDOUT else stderr).append(frame[1])
+            return await waiter
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+
+    try:
+        returncode = await asyncio.wait_for(run(), timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.error("Timeout no container. nome=%s", container_name)
+        get_kill_reaper().submit(container_name, lambda: api.kill(container_id))
+        return timeout_result()
+    except asyncio.CancelledError:
+        get_kill_reaper().submit(container_name, lambda: api.kill(container_id))
+        raise
+    except Exception as e:
+        logger.error("Erro inesperado no container. nome=%s erro=%s", container_name, str(e))
+        get_kill_reaper().submit(container_name, lambda: api.kill(container_id))
+        return error_result(str(e))
+    finally:
+        writer.close()
+
+    result = parse_output(b"".join(stdout).decode(errors="replace"), b"".join(stderr).decode(errors="replace"),
+                          returncode)
+    logger.info("Container finalizado. nome=%s returncode=%s", container_name, returncode)
+    return result
+
+
+async def kill_container(name: str) -> None:
+    await get_docker_api().kill(name)
+
+
+class DockerApiBackend:
+    name = "docker-api"
+
+    async def execute(self, job: str, timeout: int) -> dict:
+        return await execute_in_container(job, timeout)
+
+    async def start_session(self, name: str) -> AttachedContainer:
+        return await start_attached(name, init=True)
+
+    async def kill(self, name: str, process) -> None:
+        # falha no kill sobe para o reaper tentar de novo
+        await kill_container(name)
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+
+    async def close(self) -> None:
+        await shutdown_docker_api()
+
+
+_api: Optional[DockerAPI] = None
+
+
+def get_docker_api() -> DockerAPI:
+    global _api
+    if _api is None:
+        _api = DockerAPI(DOCKER_SOCKET, DOCKER_API_VERSION)
+    return _api
+
+
+async def shutdown_docker_api() -> None:
+    global _api
+    if _api is not None:
+        await _api.close()
+        _api = None
@@ -0,0 +1,169 @@
+"""
+Backend docker-cli: cada sandbox é um processo `docker run` com as flags de
+SANDBOX_DOCKER_FLAGS, e o kill passa pelo `docker kill`. É o backend padrão.
+No timeout o kill vai para o reaper (kill_reaper) e o resultado volta na hora.
+"""
+import subprocess
+import uuid
+import asyncio
+import logging
+
+from .config import SANDBOX_IMAGE, SANDBOX_DOCKER_FLAGS
+from .kill_reaper import get_kill_reaper
+from .protocol import error_result, timeout_result, parse_output
+
+logger = logging.getLogger(__name__)
+
+
+def execute_in_container_sync(job: str, timeout: int = 5) -> dict:
+    # uuid para evitar colisoes em simultaneos
+    container_name = f"wanda_runner_{uuid.uuid4().hex}"
+
+    logger.info("Iniciando container. nome=%s", container_name)
+
+    try:
+        # executa o container com protecoes
+        # o entrypoint da imagem é o harness fixo; o job vai pelo stdin
+        result = subprocess.run(
+            [
+                "docker", "run", "--rm", "--interactive",  # remove o container ao terminar
+                "--name", container_name,  # nome
+                *SANDBOX_DOCKER_FLAGS,  # limites e protecoes (ver runner/config.py)
+                SANDBOX_IMAGE,  # imagem wanda-runner (entrypoint = harness)
+            ],
+            input=job + "\n",  # entrega código e casos de teste pelo stdin
+            capture_output=True,  # captura stdout e stderr
+            text=True,  # retorna como string
+            timeout=timeout  # mata se demorar mais que timeout segundos
+        )
+
+        logger.info(
+            "Container finalizado. nome=%s returncode=%s",
+            container_name, result.returncode
+        )
+
+        # retorna resultado estruturado
+        return parse_output(result.stdout, result.stderr, result.returncode)
+
+    except subprocess.TimeoutExpired:
+        # timeout estourou: o subprocess.run já matou o cliente `docker run`;
+        # o container fica com o reaper
+        logger.error("Timeout. Matando container. nome=%s", container_name)
+        get_kill_reaper().submit(container_name, lambda: kill_container(container_name, None))
+        return timeout_result()
+
+    except Exception as e:
+        # erro inesperado
+        logger.error("Erro inesperado ao executar container. erro=%s", str(e))
+        return error_result(str(e))
+
+
+async def execute_in_container(job: str, timeout: int = 5) -> dict:
+    """
+    Versão assíncrona de execute_in_container_sync.
+    Usa asyncio.create_subprocess_exec para não bloquear o event loop
+    enquanto o container executa.
+    """
+    container_name = f"wanda_runner_{uuid.uuid4().hex}"
+
+    logger.info("Iniciando container. nome=%s", container_name)
+
+    process = None
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "docker", "run", "--rm", "--interactive",
+            "--name", container_name,
+            *SANDBOX_DOCKER_FLAGS,
+            SANDBOX_IMAGE,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate((job + "\n").encode()), timeout=timeout
+        )
+
+        logger.info(
+            "Container finalizado. nome=%s returncode=%s",
+            container_name, process.returncode
+        )
+
+        return parse_output(
+            stdout.decode(errors="replace"), stderr.decode(errors="replace"), process.returncode
+        )
+
+    except asyncio.TimeoutError:
+        logger.error("Timeout. Matando container. nome=%s", container_name)
+        get_kill_reaper().submit(container_name, lambda: kill_container(container_name, process))
+        return timeout_result()
+
+    except asyncio.CancelledError:
+        # requisição cancelada (cliente desconectou, shutdown): o `docker run` some
+        # com a task, mas o container continuaria rodando — fica com o reaper
+        get_kill_reaper().submit(container_name, lambda: kill_container(container_name, process))
+        raise
+
+    except Exception as e:
+        logger.error("Erro inesperado ao executar container. erro=%s", str(e))
+        if process is not None and process.returncode is None:
+            get_kill_reaper().submit(container_name, lambda: kill_container(container_name, process))
+        return error_result(str(e))
+
+
+def _check_kill(returncode: int, stderr: bytes, container_name: str) -> None:
+    # container que já saiu (--rm) não é falha: o que importa é ele não estar rodando
+    if returncode != 0 and b"No such container" not in stderr:
+        raise RuntimeError(f"docker kill {container_name} falhou: {stderr.decode(errors='replace').strip()}")
+
+
+async def kill_container(container_name: str, process) -> None:
+    """docker kill + espera o `docker run`. Levanta se o daemon não matou o container."""
+    killer = await asyncio.create_subprocess_exec(
+        "docker", "kill", container_name,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await killer.communicate()
+    _check_kill(killer.returncode, stderr, container_name)
+    if process is not None:
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+
+
+def kill_container_sync(container_name: str) -> None:
+    """Versão síncrona de kill_container para as threads do pool."""
+    result = subprocess.run(["docker", "kill", container_name], capture_output=True, check=False)
+    _check_kill(result.returncode, result.stderr, container_name)
+
+
+async def start_interactive(container_name: str) -> asyncio.subprocess.Process:
+    # sobe o container em modo interativo (stdin/stdout abertos)
+    # --name garante que temos um handle pra matar o container via docker kill
+    # stderr=STDOUT evita deadlock de buffer no stderr
+    # o entrypoint da imagem é o harness, que já escreve o protocolo sem buffer
+    return await asyncio.create_subprocess_exec(
+        "docker", "run", "--rm", "--interactive", "--init",
+        "--name", container_name,
+        *SANDBOX_DOCKER_FLAGS,
+        SANDBOX_IMAGE,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,  # mescla stderr no stdout — evita deadlock
+    )
+
+
+class DockerCliBackend:
+    name = "docker-cli"
+
+    async def execute(self, job: str, timeout: int) -> dict:
+        return await execute_in_container(job, timeout)
+
+    async def start_session(self, name: str):
+        return await start_interactive(name)
+
+    async def kill(self, name: str, process) -> None:
+        await kill_container(name, process)
+
+    async def close(self) -> None:
+        pass
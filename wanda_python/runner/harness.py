@@ -0,0 +1,854 @@
+"""
+Harness fixo que roda dentro da imagem wanda-runner.
+
+É copiado para a stdlib da imagem como `wanda_harness` (já compilado) e
+executado com `python -I -S -m wanda_harness`. Depende só da stdlib.
+
+Protocolo: a primeira linha do stdin é um job JSON
+    {"v": HARNESS_VERSION, "mode": "run" | "submit" | "match" | "batch" | "tournament" | "session" | "serve", ...}
+e as respostas saem uma por linha, em JSON, num canal separado do stdout
+do aluno — prints das estratégias são capturados e nunca se misturam
+com o protocolo. No modo session os rounds podem trocar frames binários
+em vez de linhas JSON (negociado ao carregar o código, ver `session`).
+No modo serve o processo vira um zygote: carrega os módulos comuns uma vez
+e executa cada job num filho (fork), então nada de um job vaza para o
+próximo.
+
+Cada código de aluno (`code`, `p1`, `p2`) pode vir acompanhado do code
+object já compilado pelo host (`code_bc`, `p1_bc`, `p2_bc`: marshal
+prefixado pelo magic do interpretador, em base64). Ele só é usado se o
+magic bater com o deste Python; senão o código-fonte é compilado aqui.
+
+As respostas de run/submit/match (e cada round de sessão) trazem `usage`:
+tempo de carga do código e dos testes, CPU user/sys e pico de RSS do
+processo que executou. No one-shot vão junto `started` (CLOCK_MONOTONIC,
+o mesmo do host) e a CPU gasta no boot do interpretador, de onde o host
+separa spawn e boot.
+"""
+import binascii
+import io
+import json
+import marshal
+import os
+import resource
+import select
+import signal
+import struct
+import sys
+import time
+from _frozen_importlib_external import MAGIC_NUMBER
+
+HARNESS_VERSION = "9"
+
+# o mais cedo possível: boot do interpretador = CPU gasta até aqui
+_STARTED = time.monotonic()
+_BOOT_CPU = time.process_time()
+
+FALLBACK_NOTE = (
+    "Retorno fora do esperado. O jogo ignora esse valor e usa a próxima carta "
+    "disponível na mão do jogador."
+)
+
+# limite de caracteres guardados de prints do aluno
+_MAX_CAPTURE = 10000
+
+# módulos carregados pelo zygote antes do primeiro fork: os filhos herdam
+# tudo já importado e o `import random` do aluno vira consulta a sys.modules
+_ZYGOTE_PRELOAD = ("random", "math", "itertools", "functools", "collections", "string", "wanda_engine")
+# limite de tempo (s) de um job no zygote quando o host não manda "timeout"
+_SERVE_JOB_TIMEOUT = 5
+# espera (s) entre conferências da saída do filho quando não há pidfd
+_EXIT_POLL_MIN = 0.001
+_EXIT_POLL_MAX = 0.05
+# varreduras atrás de processos que sobraram de um job, e a pausa entre elas
+_STRAY_ROUNDS = 20
+_STRAY_PAUSE = 0.005
+PR_SET_DUMPABLE = 4
+PR_SET_CHILD_SUBREAPER = 36
+
+# prctl da libc (None se o ctypes não carregar) e se este processo é subreaper
+_prctl = None
+_subreaper = False
+# um processo de um job sobreviveu à limpeza: ele pode forjar respostas e ler os
+# próximos jobs, então este harness não roda mais nada (ver _kill_strays)
+_compromised = False
+
+
+def _harden() -> None:
+    """
+    Tira o harness do alcance dos processos dos jobs: sem dumpable, o mesmo uid
+    não abre /proc/<harness>/fd (canal do protocolo, stdin, pipes de resultado).
+    O dumpable passa para os filhos no fork; o subreaper não (ver _become_subreaper).
+    """
+    global _prctl
+    try:
+        import ctypes
+        _prctl = ctypes.CDLL(None).prctl
+    except (ImportError, OSError, AttributeError):
+        return
+    _prctl(PR_SET_DUMPABLE, 0, 0, 0, 0)
+    _become_subreaper()
+
+
+def _become_subreaper() -> None:
+    # órfãos dos jobs (netos que saíram com setsid) viram filhos deste processo em vez
+    # de irem para o init: o que _kill_strays não achar entre os descendentes não existe
+    global _subreaper
+    _subreaper = _prctl is not None and _prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+
+
+def _open_channel():
+    """
+    Separa o canal do protocolo do stdout do aluno: o fd 1 original é
+    duplicado para uso exclusivo do harness e o fd 1 passa a apontar para
+    /dev/null, então nem escrita direta no fd vaza para o protocolo.
+    """
+    real_fd = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    return io.TextIOWrapper(io.FileIO(real_fd, "w"), encoding="utf-8", line_buffering=True)
+
+
+def _send(channel, message: dict) -> None:
+    # default=repr: retornos não serializáveis do aluno (set, objetos...) viram texto
+    channel.write(json.dumps(message, default=repr) + "\n")
+    channel.flush()
+
+
+def _describe(e: BaseException) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def _rusage_fields(usage) -> dict:
+    # ru_maxrss no Linux já vem em KB
+    return {
+        "cpuUserMs": round(usage.ru_utime * 1000, 3),
+        "cpuSysMs": round(usage.ru_stime * 1000, 3),
+        "maxRssKb": usage.ru_maxrss,
+    }
+
+
+class _Phases:
+    """Cronômetro das fases de um job: cada mark() fecha a fase desde a anterior."""
+
+    def __init__(self):
+        self.values = {}
+        self._last = time.perf_counter()
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.values[name] = round((now - self._last) * 1000, 3)
+        self._last = now
+
+
+# ---------------------------------------------------------------------------
+# Framing binário dos rounds de sessão.
+# Cada frame é um uint32 big-endian com o tamanho do payload, seguido do
+# payload. Cada valor leva 1 byte de tipo; as cartas dos jogos viram um
+# único byte de código, e strings com quebra de linha não quebram nada.
+#   round:    [n][valor]*n [n][valor]*n        (parâmetros de p1 e de p2)
+#   resposta: [0][valor p1][valor p2][usage]  ou  [1][mensagem de erro]
+# ---------------------------------------------------------------------------
+FRAMINGS = ("json", "binary")
+FRAME_CARDS = ["pedra", "papel", "tesoura", "BIT8", "BIT16", "BIT32", "FIREWALL"]
+_CARD_CODES = {card: code for code, card in enumerate(FRAME_CARDS)}
+
+_TAG_NONE, _TAG_FALSE, _TAG_TRUE, _TAG_CARD, _TAG_INT, _TAG_STR, _TAG_JSON = range(7)
+_STATUS_OK, _STATUS_ERROR = 0, 1
+
+FRAME_HEADER = struct.Struct(">I")
+_INT = struct.Struct(">q")
+_INT_MIN, _INT_MAX = -(2 ** 63), 2 ** 63 - 1
+# usage opcional no fim da resposta ok: testes, CPU user, CPU sys (µs) e pico de RSS (KB)
+_USAGE = struct.Struct(">IIII")
+_USAGE_MS_KEYS = ("testsMs", "cpuUserMs", "cpuSysMs")
+_UINT_MAX = 2 ** 32 - 1
+
+
+def _encode_value(value, out: bytearray) -> None:
+    if value is None:
+        out.append(_TAG_NONE)
+    elif value is True or value is False:
+        out.append(_TAG_TRUE if value else _TAG_FALSE)
+    elif isinstance(value, str):
+        code = _CARD_CODES.get(value)
+        if code is not None:
+            out += bytes((_TAG_CARD, code))
+        else:
+            data = value.encode("utf-8", "surrogatepass")
+            out.append(_TAG_STR)
+            out += FRAME_HEADER.pack(len(data))
+            out += data
+    elif type(value) is int and _INT_MIN <= value <= _INT_MAX:
+        out.append(_TAG_INT)
+        out += _INT.pack(value)
+    else:
+        # floats, listas, retornos estranhos do aluno: mesmo tratamento do _send
+        data = json.dumps(value, default=repr).encode()
+        out.append(_TAG_JSON)
+        out += FRAME_HEADER.pack(len(data))
+        out += data
+
+
+def _decode_value(data: bytes, pos: int):
+    tag = data[pos]
+    pos += 1
+    if tag == _TAG_NONE:
+        return None, pos
+    if tag == _TAG_FALSE:
+        return False, pos
+    if tag == _TAG_TRUE:
+        return True, pos
+    if tag == _TAG_CARD:
+        return FRAME_CARDS[data[pos]], pos + 1
+    if tag == _TAG_INT:
+        return _INT.unpack_from(data, pos)[0], pos + _INT.size
+    if tag in (_TAG_STR, _TAG_JSON):
+        (size,) = FRAME_HEADER.unpack_from(data, pos)
+        pos += FRAME_HEADER.size
+        raw = data[pos:pos + size]
+        value = raw.decode("utf-8", "surrogatepass") if tag == _TAG_STR else json.loads(raw)
+        return value, pos + size
+    raise ValueError(f"Tipo de valor desconhecido no frame: {tag}")
+
+
+def _encode_list(values: list, out: bytearray) -> None:
+    if len(values) > 255:
+        raise ValueError("Parâmetros demais para um round.")
+    out.append(len(values))
+    for value in values:
+        _encode_value(value, out)
+
+
+def _decode_list(data: bytes, pos: int):
+    count = data[pos]
+    pos += 1
+    values = []
+    for _ in range(count):
+        value, pos = _decode_value(data, pos)
+        values.append(value)
+    return values, pos
+
+
+def frame(payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def encode_round(params_p1: list, params_p2: list) -> bytes:
+    out = bytearray()
+    _encode_list(params_p1, out)
+    _encode_list(params_p2, out)
+    return bytes(out)
+
+
+def decode_round(payload: bytes):
+    params_p1, pos = _decode_list(payload, 0)
+    params_p2, _ = _decode_list(payload, pos)
+    return params_p1, params_p2
+
+
+def encode_choices(choice_p1, choice_p2, usage: dict = None) -> bytes:
+    out = bytearray((_STATUS_OK,))
+    _encode_value(choice_p1, out)
+    _encode_value(choice_p2, out)
+    if usage is not None:
+        out += _USAGE.pack(*(min(_UINT_MAX, int(usage[key] * 1000)) for key in _USAGE_MS_KEYS),
+                           min(_UINT_MAX, usage["maxRssKb"]))
+    return bytes(out)
+
+
+def encode_error(message: str) -> bytes:
+    out = bytearray((_STATUS_ERROR,))
+    _encode_value(message, out)
+    return bytes(out)
+
+
+def decode_response(payload: bytes) -> dict:
+    """Converte o frame de resposta no mesmo dict do protocolo JSON."""
+    if payload[0] == _STATUS_ERROR:
+        return {"error": _decode_value(payload, 1)[0]}
+    choice_p1, pos = _decode_value(payload, 1)
+    choice_p2, pos = _decode_value(payload, pos)
+    response = {"p1": choice_p1, "p2": choice_p2}
+    if len(payload) - pos >= _USAGE.size:
+        *values, max_rss = _USAGE.unpack_from(payload, pos)
+        response["usage"] = {**{key: value / 1000 for key, value in zip(_USAGE_MS_KEYS, values)},
+                             "maxRssKb": max_rss}
+    return response
+
+
+def _read_frame(stdin):
+    header = stdin.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    (size,) = FRAME_HEADER.unpack(header)
+    payload = stdin.read(size)
+    if len(payload) < size:
+        return None
+    return payload
+
+
+def _send_frame(channel, payload: bytes) -> None:
+    channel.flush()
+    data = memoryview(frame(payload))
+    raw = channel.buffer
+    while data:
+        written = raw.write(data)
+        data = data[written:]
+
+
+def _compile_strategy(code: str, bytecode: str = None):
+    # bytecode do host só serve para o mesmo interpretador (mesmo magic)
+    if bytecode:
+        try:
+            data = binascii.a2b_base64(bytecode)
+            if data[:len(MAGIC_NUMBER)] == MAGIC_NUMBER:
+                return marshal.loads(data[len(MAGIC_NUMBER):])
+        except (binascii.Error, ValueError, EOFError, TypeError):
+            pass
+    return compile(code, "<strategy>", "exec")
+
+
+def _exec_strategy(code_object):
+    namespace = {"__name__": "__main__"}
+    exec(code_object, namespace)
+    return namespace["strategy"]
+
+
+def load_strategy(code: str, bytecode: str = None):
+    """Executa o código do aluno num namespace próprio e devolve a função strategy."""
+    return _exec_strategy(_compile_strategy(code, bytecode))
+
+
+def run_tests(strategy, test_cases: list, valid_returns: list) -> list:
+    """Modo RUN: executa todos os casos e para no primeiro erro."""
+    results = []
+    for args in test_cases:
+        try:
+            output = strategy(*args)
+            game_valid = output in valid_returns
+            entry = {
+                "output": output,
+                "valid": True,
+                "gameValid": game_valid
+            }
+            if not game_valid:
+                entry["fallback"] = "NEXT_AVAILABLE_CARD"
+                entry["note"] = FALLBACK_NOTE
+            results.append(entry)
+        except Exception as e:
+            results.append({
+                "output": None,
+                "valid": False,
+                "gameValid": False,
+                "error": str(e)
+            })
+            break
+    return results
+
+
+def run_submit(strategy, test_cases: list):
+    """Modo SUBMIT: retorna a mensagem do primeiro caso com erro, ou None."""
+    for i, args in enumerate(test_cases):
+        try:
+            strategy(*args)
+        except Exception as e:
+            return f"Erro no caso {i}: {e}"
+    return None
+
+
+def run_match(job: dict, phases: _Phases = None) -> dict:
+    """Modo MATCH: joga a partida inteira entre p1 e p2 (regras em wanda_engine)."""
+    import wanda_engine
+
+    # mesma proteção das partidas do torneio: sys.exit() no carregamento ou num
+    # round vira erro do jogador, não derruba o job
+    strategies = []
+    for key, label in (("p1", "Jogador 1"), ("p2", "Jogador 2")):
+        try:
+            strategies.append(_guarded(load_strategy(job[key], job.get(key + "_bc"))))
+        except BaseException as e:
+            raise RuntimeError(f"{label}: {_describe(e)}")
+    if phases is not None:
+        phases.mark("loadMs")
+    return wanda_engine.play_match(
+        job["game"], job.get("function"), strategies[0], strategies[1],
+        seed=job.get("seed"), rounds=job.get("rounds")
+    )
+
+
+def run_tournament(job: dict, phases: _Phases = None) -> list:
+    """
+    Modo TOURNAMENT: joga uma fatia das partidas de um torneio todos contra todos.
+    `strategies` traz o código de cada estratégia por chave e `pairs` as
+    partidas [chave p1, chave p2, seed]. Cada estratégia é compilada uma vez;
+    cada partida roda num filho (fork) com namespaces novos e limite de
+    `match_timeout` segundos, então o estado de uma partida não passa para a
+    próxima e uma estratégia que trava perde só a própria partida. Estratégia
+    que não compila ou não carrega perde por W.O.
+    """
+    compiled, load_errors = {}, {}
+    for key, entry in job["strategies"].items():
+        try:
+            compiled[key] = _compile_strategy(entry["code"], entry.get("code_bc"))
+        except Exception as e:
+            load_errors[key] = _describe(e)
+    if phases is not None:
+        phases.mark("loadMs")
+
+    match_timeout = float(job.get("match_timeout", _SERVE_JOB_TIMEOUT))
+    results = []
+    for p1, p2, seed in job["pairs"]:
+        entry = {"p1": p1, "p2": p2, "seed": seed}
+        players = [(player, label, key) for player, label, key in (("p1", "Jogador 1", p1), ("p2", "Jogador 2", p2))
+                   if key in load_errors]
+        if players:
+            entry.update(forfeit=[player for player, _, _ in players],
+                         error="; ".join(f"{label}: {load_errors[key]}" for _, label, key in players))
+        elif _compromised:
+            # processo de uma partida anterior escapou da limpeza: as próximas não rodam aqui
+            entry["error"] = "Sandbox descartada: um processo de outra partida sobreviveu."
+        else:
+            pair = {"game": job["game"], "function": job.get("function"), "rounds": job.get("rounds"),
+                    "seed": seed, "p1": compiled[p1], "p2": compiled[p2]}
+            response = _run_forked(pair, match_timeout, target=_play_pair)
+            if response.get("ok"):
+                entry.update(response["match"])
+            else:
+                entry["error"] = response.get("error", "Partida encerrou sem resposta.")
+                if response.get("timed_out"):
+                    entry["timedOut"] = True
+        results.append(entry)
+    return results
+
+
+def _guarded(strategy):
+    # sys.exit() e afins dentro de um round viram erro comum: o engine aplica o fallback
+    def call(*args):
+        try:
+            return strategy(*args)
+        except Exception:
+            raise
+        except BaseException as e:
+            raise RuntimeError(_describe(e))
+    return call
+
+
+def _play_pair(pair: dict) -> dict:
+    # roda no filho: os code objects vieram do pai pelo fork, sem serializar
+    import wanda_engine
+
+    sys.stdout = sys.stderr = io.StringIO()
+    strategies, forfeit, errors = {}, [], []
+    for key, label in (("p1", "Jogador 1"), ("p2", "Jogador 2")):
+        try:
+            strategies[key] = _guarded(_exec_strategy(pair[key]))
+        except BaseException as e:
+            forfeit.append(key)
+            errors.append(f"{label}: {_describe(e)}")
+    if forfeit:
+        return {"ok": True, "match": {"forfeit": forfeit, "error": "; ".join(errors)}}
+
+    try:
+        match = wanda_engine.play_match(
+            pair["game"], pair["function"], strategies["p1"], strategies["p2"],
+            seed=pair["seed"], rounds=pair["rounds"]
+        )
+    except Exception as e:
+        return {"ok": False, "error": _describe(e)}
+    # o torneio só precisa do placar: o log dos rounds fica no filho
+    return {"ok": True, "match": {"score": match["score"], "winner": match["winner"]}}
+
+
+def handle(job: dict) -> dict:
+    """Executa um job de run/submit/match/tournament capturando os prints do aluno."""
+    if job.get("v") != HARNESS_VERSION:
+        return {"ok": False, "error": f"Versao do harness incompativel: {job.get('v')} != {HARNESS_VERSION}"}
+
+    out, err = io.StringIO(), io.StringIO()
+    real_stdout, real_stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = out, err
+    phases = _Phases()
+    try:
+        mode = job.get("mode")
+        if mode == "match":
+            response = {"ok": True, "match": run_match(job, phases)}
+        elif mode == "tournament":
+            response = {"ok": True, "tournament": run_tournament(job, phases)}
+        elif mode == "run":
+            strategy = load_strategy(job["code"], job.get("code_bc"))
+            phases.mark("loadMs")
+            response = {"ok": True, "results": run_tests(strategy, job["test_cases"], job["valid_returns"])}
+        elif mode == "submit":
+            strategy = load_strategy(job["code"], job.get("code_bc"))
+            phases.mark("loadMs")
+            error = run_submit(strategy, job["test_cases"])
+            response = {"ok": error is None}
+            if error is not None:
+                response["error"] = error
+        else:
+            response = {"ok": False, "error": f"Modo desconhecido: {mode}"}
+    except BaseException as e:
+        response = {"ok": False, "error": _describe(e)}
+    finally:
+        sys.stdout, sys.stderr = real_stdout, real_stderr
+    if "loadMs" in phases.values:
+        phases.mark("testsMs")
+
+    response["stdout"] = out.getvalue()[:_MAX_CAPTURE]
+    response["stderr"] = err.getvalue()[:_MAX_CAPTURE]
+    response["usage"] = {**phases.values, **_rusage_fields(resource.getrusage(resource.RUSAGE_SELF))}
+    return response
+
+
+def run_batch(job: dict, memory_limit: int = None) -> dict:
+    """
+    Modo BATCH: avalia várias submissões no mesmo container.
+    Cada item roda num processo filho (fork) com o próprio limite de tempo
+    e a própria posição na lista de resultados — um item que trava ou
+    derruba o interpretador não afeta os outros.
+    """
+    if job.get("v") != HARNESS_VERSION:
+        return {"ok": False, "error": f"Versao do harness incompativel: {job.get('v')} != {HARNESS_VERSION}"}
+
+    item_mode = job.get("item_mode", "submit")
+    item_timeout = float(job.get("item_timeout", 5))
+    results = []
+    for item in job.get("items", []):
+        if _compromised:
+            # processo de um item anterior escapou da limpeza: os próximos não rodam aqui
+            results.append({"ok": False, "error": "Sandbox descartada: um processo de outra submissão sobreviveu."})
+            continue
+        item_job = {"v": HARNESS_VERSION, "mode": item_mode, **item}
+        results.append(_run_forked(item_job, item_timeout, memory_limit))
+    return {"ok": True, "results": results}
+
+
+def _run_forked(job: dict, timeout: float, memory_limit: int = None, target=None) -> dict:
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # processo filho: executa o job e devolve a resposta pelo pipe
+        os.close(read_fd)
+        try:
+            # sessão e grupo próprios: o killpg do pai alcança o que o job criar
+            os.setsid()
+            # o job pode ter filhos próprios (torneio dentro do zygote) e limpar atrás deles
+            _become_subreaper()
+            cpu = max(1, int(timeout) + 1)
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+            if memory_limit:
+                resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+            # só o pipe de resultado fica aberto: sem o canal do protocolo, sem os
+            # próximos jobs do stdin e sem os pipes de outros filhos
+            os.closerange(3, write_fd)
+            os.closerange(write_fd + 1, resource.getrlimit(resource.RLIMIT_NOFILE)[0])
+            devnull = os.open(os.devnull, os.O_RDONLY)
+            os.dup2(devnull, 0)
+            os.close(devnull)
+            data = json.dumps((target or handle)(job), default=repr).encode()
+            with os.fdopen(write_fd, "wb") as pipe:
+                pipe.write(data)
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    # o pidfd avisa quando o filho sai: um neto segurando a ponta de escrita do
+    # pipe não deixa o EOF chegar e não pode prender o zygote até o timeout
+    try:
+        exit_fd = os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        exit_fd = None
+    watched = [read_fd] if exit_fd is None else [read_fd, exit_fd]
+    chunks = []
+    child_usage = None
+    poll = _EXIT_POLL_MIN
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        if exit_fd is None:
+            # sem pidfd, confere a saída do filho com espera crescente
+            remaining = min(remaining, poll)
+        ready, _, _ = select.select(watched, [], [], remaining)
+        if not ready:
+            poll = min(poll * 2, _EXIT_POLL_MAX)
+        if read_fd in ready:
+            chunk = os.read(read_fd, 65536)
+            if chunk:
+                chunks.append(chunk)
+                continue
+            # EOF: falta só o filho sair
+            watched.remove(read_fd)
+        exited, _, child_usage = os.wait4(pid, os.WNOHANG)
+        if exited:
+            chunks.extend(_drain(read_fd))
+            break
+        child_usage = None
+    os.close(read_fd)
+    if exit_fd is not None:
+        os.close(exit_fd)
+
+    timed_out = child_usage is None
+    if timed_out:
+        os.kill(pid, signal.SIGKILL)
+        # o rusage do wait4 é só do filho e vale até para o que foi morto
+        _, _, child_usage = os.wait4(pid, 0)
+    usage = _rusage_fields(child_usage)
+    _kill_strays(pid)
+
+    if timed_out:
+        return {"ok": False, "timed_out": True, "error": "Tempo limite de execução atingido.", "usage": usage}
+    try:
+        response = json.loads(b"".join(chunks))
+    except ValueError:
+        return {"ok": False, "error": "Processo da submissão encerrou sem resposta.", "usage": usage}
+    response["usage"] = {**response.get("usage", {}), **usage}
+    return response
+
+
+def _drain(fd: int) -> list:
+    # o filho já saiu: o que ele escreveu está no buffer do pipe
+    os.set_blocking(fd, False)
+    chunks = []
+    while True:
+        try:
+            chunk = os.read(fd, 65536)
+        except BlockingIOError:
+            return chunks
+        if not chunk:
+            return chunks
+        chunks.append(chunk)
+
+
+def _kill_strays(job_pid: int) -> None:
+    """
+    Mata tudo o que o job deixou rodando, inclusive netos que saíram do grupo
+    com setsid. Como subreaper (ou PID 1 do container), todo processo que
+    sobrou de um job é descendente do harness: sem filhos (ECHILD) não sobrou
+    nada. Se algo sobreviver, ou se não der para garantir, o harness é marcado
+    como comprometido.
+    """
+    global _compromised
+    try:
+        os.killpg(job_pid, signal.SIGKILL)
+    except OSError:
+        pass
+    if not (_subreaper or os.getpid() == 1):
+        _compromised = True
+        return
+    for attempt in range(_STRAY_ROUNDS):
+        if attempt:
+            time.sleep(_STRAY_PAUSE)
+        if _reap_children():
+            return
+        strays = _descendants()
+        if strays is None:
+            if os.getpid() != 1:
+                break
+            # sem /proc: como init do namespace, kill(-1) alcança todo o resto
+            strays = [-1]
+        for stray in strays:
+            try:
+                os.kill(stray, signal.SIGKILL)
+            except OSError:
+                pass
+    _compromised = True
+
+
+def _reap_children() -> bool:
+    # recolhe os zumbis; True quando não sobrou nenhum filho
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return True
+        if pid == 0:
+            return False
+
+
+def _descendants() -> list:
+    """Pids de todos os descendentes deste processo, pela árvore do /proc; None sem /proc."""
+    if not os.path.exists("/proc/self/stat"):
+        return None
+    children = {}
+    for name in os.listdir("/proc"):
+        if name.isdigit():
+            children.setdefault(_parent(name), []).append(int(name))
+    found, pending = [], [os.getpid()]
+    while pending:
+        for child in children.get(pending.pop(), []):
+            found.append(child)
+            pending.append(child)
+    return found
+
+
+def _parent(pid: str) -> int:
+    # ppid de /proc/<pid>/stat; o nome do processo pode ter espaços e parênteses
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            return int(f.read().rsplit(b")", 1)[1].split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def dispatch(job: dict) -> dict:
+    """Executa um job one-shot (run, submit, match, batch ou tournament)."""
+    if job.get("mode") == "batch":
+        return run_batch(job)
+    return handle(job)
+
+
+def session(job: dict, channel, stdin) -> None:
+    """
+    Modo SESSION. O container sobe sem código e avisa {"ready": true};
+    pode ficar assim parado num pool de sessões pré-aquecidas.
+    A linha seguinte traz o código dos jogadores ({"p1": "...", "p2": "...",
+    "framing": "json" | "binary"}), respondida com {"loaded": true, "framing": ...}
+    ou {"loaded": false, "error": "...", "framing": ...} — o framing confirmado
+    é o que vale para os rounds (json se o pedido não for reconhecido).
+    Depois fica em loop lendo um round por vez: em JSON, uma linha
+    {"p1": [...], "p2": [...]} respondida com {"p1": escolha, "p2": escolha,
+    "usage": {...}} ou {"error": "..."}; em binário, os frames de
+    encode_round/encode_choices. O usage de cada round traz o tempo das duas
+    estratégias e a CPU gasta desde o round anterior.
+    """
+    sys.stdout = sys.stderr = io.StringIO()
+    _send(channel, {"ready": True, "v": HARNESS_VERSION})
+
+    load_error = None
+    framing = "json"
+    phases = _Phases()
+    try:
+        if job.get("v") != HARNESS_VERSION:
+            raise RuntimeError(f"Versao do harness incompativel: {job.get('v')} != {HARNESS_VERSION}")
+        codes = json.loads(stdin.readline())
+        if codes.get("framing") in FRAMINGS:
+            framing = codes["framing"]
+        strategy_p1 = load_strategy(codes["p1"], codes.get("p1_bc"))
+        strategy_p2 = load_strategy(codes["p2"], codes.get("p2_bc"))
+        phases.mark("loadMs")
+    except BaseException as e:
+        load_error = str(e)
+
+    if load_error is None:
+        _send(channel, {"loaded": True, "framing": framing, "usage": phases.values})
+    else:
+        _send(channel, {"loaded": False, "error": load_error, "framing": framing})
+
+    last_usage = [resource.getrusage(resource.RUSAGE_SELF)]
+
+    def play(params_p1, params_p2):
+        # descarta prints acumulados do round anterior
+        sys.stdout.seek(0)
+        sys.stdout.truncate()
+        if load_error is not None:
+            raise RuntimeError(load_error)
+        started = time.perf_counter()
+        r1, r2 = strategy_p1(*params_p1), strategy_p2(*params_p2)
+        tests = time.perf_counter() - started
+        now = resource.getrusage(resource.RUSAGE_SELF)
+        before, last_usage[0] = last_usage[0], now
+        usage = {
+            "testsMs": round(tests * 1000, 3),
+            "cpuUserMs": round((now.ru_utime - before.ru_utime) * 1000, 3),
+            "cpuSysMs": round((now.ru_stime - before.ru_stime) * 1000, 3),
+            "maxRssKb": now.ru_maxrss,
+        }
+        return r1, r2, usage
+
+    if framing == "binary":
+        while True:
+            payload = _read_frame(stdin)
+            if payload is None:
+                return
+            try:
+                r1, r2, usage = play(*decode_round(payload))
+                response = encode_choices(r1, r2, usage)
+            except Exception as e:
+                response = encode_error(str(e))
+            _send_frame(channel, response)
+
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            params = json.loads(line)
+            r1, r2, usage = play(params["p1"], params["p2"])
+            _send(channel, {"p1": r1, "p2": r2, "usage": usage})
+        except Exception as e:
+            _send(channel, {"error": str(e)})
+
+
+def _preload() -> None:
+    for name in _ZYGOTE_PRELOAD:
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+
+
+def serve(job: dict, channel, stdin) -> None:
+    """
+    Modo SERVE (pool): zygote. Pré-carrega os módulos, avisa que está pronto
+    e executa cada job (uma linha) num filho com os limites de tempo e de
+    memória (`memory_limit`, em bytes, vindo no job serve). Um job que
+    estoura o tempo é morto sem derrubar o zygote. Depois de cada job não
+    sobra processo dele; se algo sobreviver, a resposta sai com "discard"
+    e o zygote encerra para o pool trocar o container.
+    """
+    _preload()
+    memory_limit = job.get("memory_limit")
+    _send(channel, {"ready": True, "v": HARNESS_VERSION})
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+        except ValueError as e:
+            _send(channel, {"ok": False, "error": _describe(e)})
+            continue
+        if job.get("mode") == "batch":
+            # o batch já roda cada item num filho próprio
+            response = run_batch(job, memory_limit)
+        else:
+            timeout = float(job.get("timeout", _SERVE_JOB_TIMEOUT))
+            response = _run_forked(job, timeout, memory_limit)
+        if _compromised:
+            # algo do job sobreviveu: responde, pede o descarte e sai
+            response["discard"] = True
+            _send(channel, response)
+            return
+        _send(channel, response)
+
+
+def main() -> None:
+    _harden()
+    channel = _open_channel()
+    # stdin binário: as linhas JSON e os frames da sessão saem do mesmo buffer
+    stdin = sys.stdin.buffer
+    line = stdin.readline()
+    try:
+        job = json.loads(line)
+    except ValueError as e:
+        _send(channel, {"ok": False, "error": _describe(e)})
+        return
+
+    mode = job.get("mode")
+    if mode == "serve":
+        serve(job, channel, stdin)
+    elif mode == "session":
+        session(job, channel, stdin)
+    else:
+        response = dispatch(job)
+        # só o one-shot sobe um processo por job: o host separa spawn e boot daqui
+        response.setdefault("usage", {}).update(started=_STARTED, bootCpuMs=round(_BOOT_CPU * 1000, 3))
+        _send(channel, response)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Reaper de sandboxes: mata containers e processos fora do caminho da requisição.
+
+Quem estoura o timeout (execução one-shot, round de sessão, worker do pool)
+entrega o kill aqui e responde na hora. O reaper executa o kill em
+background, tenta de novo com espera crescente se o daemon recusar ou
+travar, e conta as sandboxes que não morreram depois de todas as tentativas.
+
+O kill é uma função sem argumentos que devolve um awaitable e levanta
+exceção se a sandbox não morreu. Pode ser entregue de dentro do event loop
+ou de threads (pool, caminho síncrono): nesse caso roda no loop da
+aplicação, ou numa thread própria se não houver loop.
+"""
+import asyncio
+import threading
+import time
+import logging
+from typing import Awaitable, Callable, Optional
+
+from .config import KILL_ATTEMPTS, KILL_ATTEMPT_TIMEOUT, KILL_RETRY_DELAY
+from .metrics import record_kill, record_kill_failure
+
+logger = logging.getLogger(__name__)
+
+KillFn = Callable[[], Awaitable[None]]
+
+
+class KillReaper:
+    def __init__(self, attempts: int, attempt_timeout: float, retry_delay: float):
+        self.attempts = max(1, attempts)
+        self.attempt_timeout = attempt_timeout
+        self.retry_delay = retry_delay
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks = set()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._submitted = 0
+        self._killed = 0
+        self._retries = 0
+        self._failed = 0
+
+    def start(self) -> None:
+        """Chamado no startup, dentro do loop da aplicação: os kills vindos de threads rodam nele."""
+        self._loop = asyncio.get_running_loop()
+
+    def submit(self, name: str, kill: KillFn) -> None:
+        """Agenda o kill e volta na hora."""
+        with self._lock:
+            self._submitted += 1
+            self._pending += 1
+        submitted_at = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            self._track(loop.create_task(self._reap(name, kill, submitted_at)))
+        elif self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(
+                lambda: self._track(self._loop.create_task(self._reap(name, kill, submitted_at)))
+            )
+        else:
+            threading.Thread(target=asyncio.run, args=(self._reap(name, kill, submitted_at),), daemon=True).start()
+
+    def _track(self, task: asyncio.Task) -> None:
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _reap(self, name: str, kill: KillFn, submitted_at: float) -> None:
+        try:
+            for attempt in range(1, self.attempts + 1):
+                try:
+                    await asyncio.wait_for(kill(), timeout=self.attempt_timeout)
+                except Exception as e:
+                    logger.warning("Falha ao matar sandbox. nome=%s tentativa=%s erro=%s",
+                                   name, attempt, str(e) or type(e).__name__)
+                    if attempt < self.attempts:
+                        with self._lock:
+                            self._retries += 1
+                        await asyncio.sleep(self.retry_delay * attempt)
+                    continue
+                elapsed = (time.monotonic() - submitted_at) * 1000
+                with self._lock:
+                    self._killed += 1
+                record_kill(elapsed, attempt)
+                logger.info("Sandbox encerrada. nome=%s tentativas=%s latencia_ms=%.1f", name, attempt, elapsed)
+                return
+
+            with self._lock:
+                self._failed += 1
+            record_kill_failure()
+            logger.error("Sandbox nao morreu apos as tentativas. nome=%s tentativas=%s", name, self.attempts)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def drain(self, timeout: float) -> None:
+        """No shutdown: espera os kills em andamento (até `timeout` segundos)."""
+        tasks = list(self._tasks)
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "submitted": self._submitted,
+                "killed": self._killed,
+                "retries": self._retries,
+                "failed": self._failed,
+            }
+
+
+_reaper: Optional[KillReaper] = None
+_reaper_lock = threading.Lock()
+
+
+def get_kill_reaper() -> KillReaper:
+    global _reaper
+    with _reaper_lock:
+        if _reaper is None:
+            _reaper = KillReaper(KILL_ATTEMPTS, KILL_ATTEMPT_TIMEOUT, KILL_RETRY_DELAY)
+        return _reaper
+
+
+async def shutdown_kill_reaper() -> None:
+    if _reaper is not None:
+        await _reaper.drain(timeout=KILL_ATTEMPT_TIMEOUT * KILL_ATTEMPTS)
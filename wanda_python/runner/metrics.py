@@ -0,0 +1,67 @@
+"""
+Histogramas de uso de recursos das execuções (OpenTelemetry).
+
+Cada resultado do runner e cada round de sessão traz `usage` (ver
+protocol.finish_usage e o harness); aqui esses números viram histogramas
+exportados pelo MeterProvider configurado em otel.py, junto com a
+latência e as falhas do reaper de kills. Sem provider, a API
+do OpenTelemetry descarta as medições.
+"""
+from opentelemetry import metrics
+
+meter = metrics.get_meter(__name__)
+
+# as fases vão de dezenas de µs (carga de uma estratégia) a segundos (boot frio)
+_DURATION_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+_RSS_BUCKETS = [4096, 8192, 16384, 32768, 65536, 131072, 262144, 524288]
+
+_PHASES = (("spawn", "spawnMs"), ("boot", "bootMs"), ("load", "loadMs"), ("tests", "testsMs"), ("wall", "wallMs"))
+
+_phase_duration = meter.create_histogram(
+    "wanda.runner.phase.duration", unit="ms",
+    description="Tempo de parede de cada fase da execução (spawn, boot, load, tests, wall)",
+    explicit_bucket_boundaries_advisory=_DURATION_BUCKETS,
+)
+_cpu_time = meter.create_histogram(
+    "wanda.runner.cpu.time", unit="ms",
+    description="CPU gasta pela sandbox na execução, separada em user e sys",
+    explicit_bucket_boundaries_advisory=_DURATION_BUCKETS,
+)
+_peak_rss = meter.create_histogram(
+    "wanda.runner.peak_rss", unit="KiBy",
+    description="Pico de memória residente do processo que executou o código",
+    explicit_bucket_boundaries_advisory=_RSS_BUCKETS,
+)
+
+_kill_duration = meter.create_histogram(
+    "wanda.runner.kill.duration", unit="ms",
+    description="Tempo entre o pedido de kill e a sandbox confirmada morta",
+    explicit_bucket_boundaries_advisory=_DURATION_BUCKETS,
+)
+_kill_failures = meter.create_counter(
+    "wanda.runner.kill.failures", unit="{sandbox}",
+    description="Sandboxes que continuaram vivas depois de todas as tentativas de kill",
+)
+
+
+def record_kill(duration_ms: float, attempts: int) -> None:
+    _kill_duration.record(duration_ms, {"attempts": attempts})
+
+
+def record_kill_failure() -> None:
+    _kill_failures.add(1)
+
+
+def record_usage(usage: dict, **attributes) -> None:
+    """Registra o `usage` de uma execução ou round; fases ausentes são ignoradas."""
+    if not usage:
+        return
+    for phase, key in _PHASES:
+        if usage.get(key) is not None:
+            _phase_duration.record(usage[key], {**attributes, "phase": phase})
+    if usage.get("cpuUserMs") is not None:
+        _cpu_time.record(usage["cpuUserMs"], {**attributes, "cpu.mode": "user"})
+    if usage.get("cpuSysMs") is not None:
+        _cpu_time.record(usage["cpuSysMs"], {**attributes, "cpu.mode": "sys"})
+    if usage.get("maxRssKb") is not None:
+        _peak_rss.record(usage["maxRssKb"], attributes)
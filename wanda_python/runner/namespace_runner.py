@@ -0,0 +1,161 @@
+"""
+Backend de sandbox sem Docker (WANDA_RUNNER_BACKEND=namespace).
+
+Cada execução sobe o sandbox_launcher, que isola o harness com namespaces
+do Linux, raiz read-only, rlimits e seccomp, e devolve o processo com os
+mesmos pipes de um `docker run -i`. Para jobs curtos como /run e /validate
+isso troca o create/start do container por alguns forks.
+
+O harness e o motor de partidas são copiados uma vez por processo para um
+diretório temporário, como a imagem do runner faz com a stdlib.
+"""
+import asyncio
+import compileall
+import json
+import os
+import shutil
+import sys
+import tempfile
+import logging
+from typing import Optional
+
+from .config import NAMESPACE_PYTHON, NAMESPACE_MEMORY_MB, NAMESPACE_PIDS_LIMIT
+from .kill_reaper import get_kill_reaper
+from .protocol import parse_output, error_result, timeout_result
+
+logger = logging.getLogger(__name__)
+
+_RUNNER_DIR = os.path.dirname(os.path.abspath(__file__))
+_LAUNCHER = os.path.join(_RUNNER_DIR, "sandbox_launcher.py")
+_HARNESS = os.path.join(_RUNNER_DIR, "harness.py")
+_ENGINE = os.path.join(os.path.dirname(_RUNNER_DIR), "games", "engine.py")
+
+# o mínimo para o interpretador subir na raiz nova (montado read-only)
+_SYSTEM_BINDS = ["/usr", "/bin", "/lib", "/lib64", "/lib32", "/etc/ld.so.cache", "/dev/null", "/dev/urandom"]
+_NOFILE_LIMIT = 64
+_FSIZE_LIMIT = 1024 * 1024
+
+_workdir: Optional[str] = None
+
+
+def _prepare_workdir() -> str:
+    global _workdir
+    if _workdir is None:
+        workdir = tempfile.mkdtemp(prefix="wanda_ns_")
+        lib = os.path.join(workdir, "lib")
+        os.mkdir(lib)
+        os.mkdir(os.path.join(workdir, "root"))
+        shutil.copy(_HARNESS, os.path.join(lib, "wanda_harness.py"))
+        shutil.copy(_ENGINE, os.path.join(lib, "wanda_engine.py"))
+        compileall.compile_dir(lib, quiet=1)
+        # a sandbox roda como nobody: precisa atravessar e ler o diretório
+        for dirpath, _, filenames in os.walk(workdir):
+            os.chmod(dirpath, 0o755)
+            for name in filenames:
+                os.chmod(os.path.join(dirpath, name), 0o644)
+        _workdir = workdir
+    return _workdir
+
+
+def _binds(lib: str) -> list:
+    prefix = os.path.dirname(os.path.dirname(os.path.realpath(NAMESPACE_PYTHON)))
+    binds = []
+    for path in _SYSTEM_BINDS + [prefix, os.path.dirname(NAMESPACE_PYTHON), lib]:
+        # caminho já coberto por outro bind não precisa de mount próprio
+        if not any(path == b or path.startswith(b.rstrip("/") + "/") for b in binds):
+            binds.append(path)
+    return binds
+
+
+def _launcher_command(cpu_seconds: Optional[int]) -> list:
+    workdir = _prepare_workdir()
+    lib = os.path.join(workdir, "lib")
+    config = {
+        "python": NAMESPACE_PYTHON,
+        "root": os.path.join(workdir, "root"),
+        "lib": lib,
+        "binds": _binds(lib),
+        "limits": {
+            "memory": NAMESPACE_MEMORY_MB * 1024 * 1024,
+            "cpu": cpu_seconds,
+            "nproc": NAMESPACE_PIDS_LIMIT,
+            "nofile": _NOFILE_LIMIT,
+            "fsize": _FSIZE_LIMIT,
+        },
+    }
+    return [sys.executable, "-I", "-S", _LAUNCHER, json.dumps(config)]
+
+
+async def execute_in_sandbox(job: str, timeout: int = 5) -> dict:
+    """Mesmo contrato do docker_cli.execute_in_container, sem Docker."""
+    logger.info("Iniciando sandbox de namespaces. timeout=%s", timeout)
+
+    process = None
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *_launcher_command(cpu_seconds=int(timeout) + 1),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate((job + "\n").encode()), timeout=timeout
+        )
+
+        logger.info("Sandbox finalizada. pid=%s returncode=%s", process.pid, process.returncode)
+
+        return parse_output(
+            stdout.decode(errors="replace"), stderr.decode(errors="replace"), process.returncode
+        )
+
+    except asyncio.TimeoutError:
+        logger.error("Timeout. Matando sandbox. pid=%s", process.pid)
+        get_kill_reaper().submit(f"ns-{process.pid}", lambda: kill_sandbox(process))
+        return timeout_result()
+
+    except Exception as e:
+        logger.error("Erro inesperado ao executar sandbox. erro=%s", str(e))
+        if process is not None:
+            get_kill_reaper().submit(f"ns-{process.pid}", lambda: kill_sandbox(process))
+        return error_result(str(e))
+
+
+async def start_sandbox_process() -> asyncio.subprocess.Process:
+    """Sandbox interativa para as sessões — o tempo de CPU fica com os timeouts dos rounds."""
+    return await asyncio.create_subprocess_exec(
+        *_launcher_command(cpu_seconds=None),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,  # mescla stderr no stdout — evita deadlock
+    )
+
+
+async def kill_sandbox(process) -> None:
+    # o launcher leva a sandbox junto (PDEATHSIG em cascata até o PID 1 do namespace)
+    if process.returncode is None:
+        process.kill()
+    await process.wait()
+
+
+def shutdown_namespace_runner() -> None:
+    global _workdir
+    if _workdir is not None:
+        shutil.rmtree(_workdir, ignore_errors=True)
+        _workdir = None
+
+
+class NamespaceBackend:
+    name = "namespace"
+
+    async def execute(self, job: str, timeout: int) -> dict:
+        return await execute_in_sandbox(job, timeout)
+
+    async def start_session(self, name: str) -> asyncio.subprocess.Process:
+        # sem container: o nome fica só para os logs
+        return await start_sandbox_process()
+
+    async def kill(self, name: str, process) -> None:
+        await kill_sandbox(process)
+
+    async def close(self) -> None:
+        shutdown_namespace_runner()
@@ -0,0 +1,133 @@
+import base64
+import importlib.util
+import json
+import marshal
+import time
+from functools import lru_cache
+from typing import Optional
+
+from .config import SANDBOX_BYTECODE
+from .harness import HARNESS_VERSION
+# framing binário dos rounds de sessão — o codec mora no harness para host
+# e container usarem exatamente o mesmo código
+from .harness import FRAME_HEADER, frame, encode_round, decode_response  # noqa: F401
+
+
+def build_job(mode: str, **fields) -> str:
+    """Monta a linha JSON de um job para o harness."""
+    return json.dumps({"v": HARNESS_VERSION, "mode": mode, **fields})
+
+
+@lru_cache(maxsize=256)
+def compile_strategy(code: str) -> Optional[str]:
+    """
+    Compila o código do aluno uma vez no host e devolve o code object em
+    marshal, prefixado pelo magic deste interpretador, em base64 — o formato
+    de `code_bc` no job. None se não compilar: o harness recompila o fonte
+    e reporta o erro como sempre.
+    """
+    try:
+        code_object = compile(code, "<strategy>", "exec", dont_inherit=True)
+    except Exception:
+        return None
+    return base64.b64encode(importlib.util.MAGIC_NUMBER + marshal.dumps(code_object)).decode("ascii")
+
+
+def bytecode_fields(**codes) -> dict:
+    """Campos `<campo>_bc` com o bytecode de cada código, ex.: bytecode_fields(code=...)."""
+    if not SANDBOX_BYTECODE:
+        return {}
+    fields = {}
+    for field, code in codes.items():
+        bytecode = compile_strategy(code)
+        if bytecode is not None:
+            fields[f"{field}_bc"] = bytecode
+    return fields
+
+
+def error_result(message: str, timed_out: bool = False) -> dict:
+    return {
+        "ok": False,
+        "timed_out": timed_out,
+        "stdout": "",
+        "stderr": message,
+        "returncode": -1
+    }
+
+
+def timeout_result() -> dict:
+    return error_result("Tempo limite de execução atingido.", timed_out=True)
+
+
+def result_from_response(response: dict, returncode: int = 0) -> dict:
+    """
+    Converte a resposta do harness no dict padrão do runner
+    (ok/timed_out/stdout/stderr/returncode/usage e, no modo run, results;
+    no modo match, match; no modo tournament, tournament).
+    """
+    timed_out = bool(response.get("timed_out", False))
+    if timed_out:
+        returncode = -1
+    elif not response.get("ok") and returncode == 0:
+        # job que falhou dentro do harness conta como saída 1, como um script com erro
+        returncode = 1
+    result = {
+        "ok": bool(response.get("ok")),
+        "timed_out": timed_out,
+        "stdout": str(response.get("stdout", "")).strip(),
+        "stderr": str(response.get("error") or response.get("stderr", "")).strip(),
+        "returncode": returncode
+    }
+    if "results" in response:
+        result["results"] = response["results"]
+    if "match" in response:
+        result["match"] = response["match"]
+    if "tournament" in response:
+        result["tournament"] = response["tournament"]
+    if "usage" in response:
+        result["usage"] = response["usage"]
+    return result
+
+
+def finish_usage(result: dict, launched_at: float) -> dict:
+    """
+    Completa result["usage"] do lado do host: wallMs desde `launched_at`
+    (time.monotonic()) e, quando o harness foi one-shot, spawnMs (sandbox
+    subindo até o interpretador rodar) e bootMs (CPU do interpretador até o
+    harness). O harness e o host leem o mesmo CLOCK_MONOTONIC do kernel.
+    """
+    now = time.monotonic()
+    usage = result.setdefault("usage", {})
+    started = usage.pop("started", None)
+    boot = usage.pop("bootCpuMs", None)
+    if started is not None and boot is not None and launched_at <= started <= now:
+        usage["spawnMs"] = round(max(0.0, (started - launched_at) * 1000 - boot), 3)
+        usage["bootMs"] = boot
+    usage["wallMs"] = round((now - launched_at) * 1000, 3)
+    return result
+
+
+def parse_output(stdout: str, stderr: str, returncode: int) -> dict:
+    """Interpreta a saída de um container one-shot (última linha = resposta do harness)."""
+    lines = stdout.strip().split("\n")
+    try:
+        response = json.loads(lines[-1])
+    except (json.JSONDecodeError, IndexError):
+        result = error_result(stderr.strip() or "Erro interno ao processar resultado.")
+        result["returncode"] = returncode
+        return result
+    return result_from_response(response, returncode)
+
+
+def batch_results_from(result: dict, size: int) -> list:
+    """
+    Separa o resultado de um job batch em um dict padrão por submissão.
+    Se o container inteiro falhou (timeout, erro de infraestrutura), todas
+    as submissões recebem o mesmo erro.
+    """
+    if not result["ok"] or len(result.get("results", [])) != size:
+        failed = dict(result)
+        failed.pop("results", None)
+        failed["ok"] = False
+        return [dict(failed) for _ in range(size)]
+    return [result_from_response(response) for response in result["results"]]
@@ -0,0 +1,117 @@
+"""
+Cache de resultados de execução endereçado pelo conteúdo.
+
+O aluno aperta "run" várias vezes sem mudar o código, e os casos de teste de
+cada jogo são fixos: o mesmo job sempre dá o mesmo resultado. A chave é o
+hash do código normalizado + modo + casos de teste + retornos válidos +
+versão do harness, então mudar qualquer um deles (inclusive subir o harness)
+invalida a entrada.
+
+Só entram resultados ok: timeout, erro interno e falha de infraestrutura
+nunca são cacheados. Código que usa fontes de não determinismo (random,
+time...) também fica de fora — repetir a saída de uma estratégia aleatória
+mudaria o que o aluno vê.
+"""
+import copy
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .config import RESULT_CACHE_SIZE, RESULT_CACHE_TTL
+from .harness import HARNESS_VERSION
+
+_NONDETERMINISTIC = re.compile(r"\b(random|time|datetime|secrets|uuid|os)\b")
+
+
+def normalize_code(code: str) -> str:
+    # só o que não muda a execução: quebras de linha, espaços no fim das linhas
+    # e linhas vazias no fim — os números de linha dos erros continuam iguais
+    lines = code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).rstrip("\n")
+
+
+def cache_key(mode: str, code: str, test_cases: list, valid_returns: Optional[list]) -> Optional[str]:
+    """Chave do job, ou None se o resultado não pode ser cacheado."""
+    normalized = normalize_code(code)
+    if _NONDETERMINISTIC.search(normalized):
+        return None
+    payload = json.dumps([HARNESS_VERSION, mode, normalized, test_cases, valid_returns], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """LRU limitado a `max_entries`, com entradas expirando após `ttl` segundos."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # o caminho síncrono do runner roda em threads
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+
+    def get(self, key: Optional[str]) -> Optional[dict]:
+        if key is None or self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] >= self.ttl:
+                del self._entries[key]
+                self._expired += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        # cópia: quem chama pode mexer no dict sem estragar a entrada
+        return copy.deepcopy(entry[1])
+
+    def put(self, key: Optional[str], result: dict) -> None:
+        if key is None or self.max_entries <= 0 or not result.get("ok") or result.get("timed_out"):
+            return
+        # o usage é da execução que gerou o resultado, não de quem acerta o cache
+        stored = copy.deepcopy({field: value for field, value in result.items() if field != "usage"})
+        with self._lock:
+            self._entries[key] = (time.monotonic(), stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "ttlS": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hitRatio": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expired": self._expired,
+            }
+
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+        return _cache
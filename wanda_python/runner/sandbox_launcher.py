@@ -0,0 +1,338 @@
+"""
+Launcher da sandbox de namespaces (backend WANDA_RUNNER_BACKEND=namespace).
+
+Roda no host, só com a stdlib (`python -I -S sandbox_launcher.py <config>`),
+e deixa o harness no mesmo isolamento que o container daria, sem Docker:
+
+    - namespaces de usuário, mount, pid, rede, IPC e UTS próprios — sem
+      interfaces de rede e sem enxergar os processos do host;
+    - raiz nova em tmpfs com só o interpretador e as bibliotecas do sistema
+      montados read-only (o código da aplicação e o .env ficam de fora);
+    - rlimits de memória, CPU, processos, arquivos abertos e escrita;
+    - no_new_privs + filtro seccomp negando rede, ptrace, mount, namespaces
+      novos (unshare, setns, clone com flags de namespace), módulos do
+      kernel, bpf e afins.
+
+São três processos: o launcher escreve o mapa de uid/gid do filho (de fora
+do namespace de usuário), o filho cria os namespaces e o neto vira o PID 1
+do namespace novo e executa o harness. Cada um morre junto com o pai
+(PDEATHSIG), então matar o launcher derruba a sandbox inteira.
+
+O stdin/stdout/stderr passam direto para o harness — o protocolo é o mesmo
+do container.
+"""
+import ctypes
+import json
+import os
+import platform
+import resource
+import signal
+import sys
+
+CLONE_NEWNS = 0x00020000
+CLONE_NEWCGROUP = 0x02000000
+CLONE_NEWUTS = 0x04000000
+CLONE_NEWIPC = 0x08000000
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWPID = 0x20000000
+CLONE_NEWNET = 0x40000000
+
+MS_RDONLY = 1
+MS_NOSUID = 2
+MS_NODEV = 4
+MS_NOEXEC = 8
+MS_REMOUNT = 32
+MS_NOATIME = 1024
+MS_NODIRATIME = 2048
+MS_BIND = 4096
+MS_REC = 16384
+MS_PRIVATE = 1 << 18
+MS_RELATIME = 1 << 21
+MNT_DETACH = 2
+
+PR_SET_PDEATHSIG = 1
+PR_SET_SECCOMP = 22
+PR_SET_NO_NEW_PRIVS = 38
+SECCOMP_MODE_FILTER = 2
+
+SECCOMP_RET_KILL_PROCESS = 0x80000000
+SECCOMP_RET_ERRNO = 0x00050000
+SECCOMP_RET_ALLOW = 0x7FFF0000
+EPERM = 1
+ENOSYS = 38
+
+BPF_LD_W_ABS = 0x20
+BPF_JEQ_K = 0x15
+BPF_JGE_K = 0x35
+BPF_JSET_K = 0x45
+BPF_RET_K = 0x06
+
+# uid/gid de dentro da sandbox (nobody, como o --user 65534 do container)
+SANDBOX_ID = 65534
+
+# clone com qualquer flag de namespace daria ao código do aluno um namespace de usuário
+# novo, com todas as capabilities — o mesmo que o unshare bloqueado abaixo
+_CLONE_NS_FLAGS = (CLONE_NEWUSER | CLONE_NEWNS | CLONE_NEWPID | CLONE_NEWNET | CLONE_NEWIPC | CLONE_NEWUTS
+                   | CLONE_NEWCGROUP)
+# offset do args[0] em seccomp_data (parte baixa em little-endian: as flags cabem em 32 bits)
+_SECCOMP_ARG0 = 16
+
+# syscalls negadas com EPERM, e os números delas por arquitetura: (AUDIT_ARCH, {nome: número})
+_BLOCKED = ("socket", "socketpair", "connect", "bind", "listen", "accept", "accept4", "ptrace",
+            "process_vm_readv", "process_vm_writev", "mount", "umount2", "pivot_root", "chroot",
+            "unshare", "setns", "kexec_load", "kexec_file_load", "init_module", "finit_module",
+            "delete_module", "bpf", "perf_event_open", "keyctl", "add_key", "request_key",
+            "userfaultfd", "reboot", "swapon", "swapoff", "name_to_handle_at", "open_by_handle_at",
+            "io_uring_setup", "open_tree", "move_mount", "fsopen", "fsmount")
+ARCHES = {
+    "x86_64": (0xC000003E, {
+        "socket": 41, "socketpair": 53, "connect": 42, "bind": 49, "listen": 50, "accept": 43,
+        "accept4": 288, "ptrace": 101, "process_vm_readv": 310, "process_vm_writev": 311,
+        "mount": 165, "umount2": 166, "pivot_root": 155, "chroot": 161, "unshare": 272, "setns": 308,
+        "kexec_load": 246, "kexec_file_load": 320, "init_module": 175, "finit_module": 313,
+        "delete_module": 176, "bpf": 321, "perf_event_open": 298, "keyctl": 250, "add_key": 248,
+        "request_key": 249, "userfaultfd": 323, "reboot": 169, "swapon": 167, "swapoff": 168,
+        "name_to_handle_at": 303, "open_by_handle_at": 304, "io_uring_setup": 425, "open_tree": 428,
+        "move_mount": 429, "fsopen": 430, "fsmount": 432, "clone": 56, "clone3": 435,
+    }),
+    "aarch64": (0xC00000B7, {
+        "socket": 198, "socketpair": 199, "connect": 203, "bind": 200, "listen": 201, "accept": 202,
+        "accept4": 242, "ptrace": 117, "process_vm_readv": 270, "process_vm_writev": 271,
+        "mount": 40, "umount2": 39, "pivot_root": 41, "chroot": 51, "unshare": 97, "setns": 268,
+        "kexec_load": 104, "kexec_file_load": 294, "init_module": 105, "finit_module": 273,
+        "delete_module": 106, "bpf": 280, "perf_event_open": 241, "keyctl": 219, "add_key": 217,
+        "request_key": 218, "userfaultfd": 282, "reboot": 142, "swapon": 224, "swapoff": 225,
+        "name_to_handle_at": 264, "open_by_handle_at": 265, "io_uring_setup": 425, "open_tree": 428,
+        "move_mount": 429, "fsopen": 430, "fsmount": 432, "clone": 220, "clone3": 435,
+    }),
+}
+# x86_64: números com o bit do ABI x32 contornariam a lista
+_X32_SYSCALL_BIT = 0x40000000
+
+libc = ctypes.CDLL(None, use_errno=True)
+libc.mount.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_ulong, ctypes.c_char_p]
+libc.umount2.argtypes = [ctypes.c_char_p, ctypes.c_int]
+libc.unshare.argtypes = [ctypes.c_int]
+
+
+class SockFilter(ctypes.Structure):
+    _fields_ = [("code", ctypes.c_ushort), ("jt", ctypes.c_ubyte), ("jf", ctypes.c_ubyte), ("k", ctypes.c_uint)]
+
+
+class SockFprog(ctypes.Structure):
+    _fields_ = [("len", ctypes.c_ushort), ("filter", ctypes.POINTER(SockFilter))]
+
+
+def _check(result: int, what: str) -> None:
+    if result != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"{what}: {os.strerror(errno)}")
+
+
+def _mount(source, target, fstype, flags, data=None) -> None:
+    enc = lambda value: value.encode() if isinstance(value, str) else value  # noqa: E731
+    _check(libc.mount(enc(source), enc(target), enc(fstype), flags, enc(data)), f"mount {target}")
+
+
+def _prctl(option: int, arg) -> None:
+    _check(libc.prctl(option, arg, ctypes.c_ulong(0), ctypes.c_ulong(0), ctypes.c_ulong(0)), f"prctl {option}")
+
+
+def _die_with_parent() -> None:
+    _prctl(PR_SET_PDEATHSIG, ctypes.c_ulong(signal.SIGKILL))
+    # o pai pode ter morrido antes do prctl
+    if os.getppid() == 1:
+        os._exit(1)
+
+
+def _write_id_maps(pid: int) -> None:
+    # root no host vira nobody lá fora também; sem root, só dá para mapear o próprio uid
+    outside_uid = SANDBOX_ID if os.geteuid() == 0 else os.geteuid()
+    outside_gid = SANDBOX_ID if os.geteuid() == 0 else os.getegid()
+    with open(f"/proc/{pid}/setgroups", "w") as f:
+        f.write("deny")
+    with open(f"/proc/{pid}/gid_map", "w") as f:
+        f.write(f"{SANDBOX_ID} {outside_gid} 1")
+    with open(f"/proc/{pid}/uid_map", "w") as f:
+        f.write(f"{SANDBOX_ID} {outside_uid} 1")
+
+
+def _remount_readonly(target: str) -> None:
+    # o remount precisa manter as flags travadas pelo namespace de origem
+    st = os.statvfs(target).f_flag
+    flags = MS_REMOUNT | MS_BIND | MS_RDONLY | (st & (MS_NOSUID | MS_NODEV | MS_NOEXEC | MS_NOATIME | MS_NODIRATIME))
+    if st & os.ST_RELATIME:
+        flags |= MS_RELATIME
+    _mount(None, target, None, flags)
+
+
+def _bind(source_fd: int, target: str, is_dir: bool) -> None:
+    if is_dir:
+        os.makedirs(target, exist_ok=True)
+    else:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        open(target, "w").close()
+    # origem pelo fd aberto antes de trocar de uid: o caminho pode não ser visível para o nobody
+    _mount(f"/proc/self/fd/{source_fd}", target, None, MS_BIND | MS_REC)
+    _remount_readonly(target)
+
+
+def _setup_root(config: dict, binds: list) -> None:
+    root = config["root"]
+    _mount(None, "/", None, MS_REC | MS_PRIVATE)
+    _mount("tmpfs", root, "tmpfs", MS_NOSUID | MS_NODEV, "size=1m,mode=0755")
+
+    for path, fd, link in binds:
+        target = root + path
+        if link is not None:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.symlink(link, target)
+        else:
+            _bind(fd, target, os.path.isdir(f"/proc/self/fd/{fd}"))
+
+    proc = root + "/proc"
+    os.makedirs(proc, exist_ok=True)
+    try:
+        _mount("proc", proc, "proc", MS_NOSUID | MS_NODEV | MS_NOEXEC)
+    except OSError:
+        # /proc mascarado (ex.: dentro de um container): a sandbox fica sem /proc
+        pass
+
+    os.chdir(root)
+    # sem wrapper na libc: pivot_root(".", ".") e desmonta a raiz antiga empilhada
+    _check(libc.syscall(ARCHES[platform.machine()][1]["pivot_root"], b".", b"."), "pivot_root")
+    _check(libc.umount2(b".", MNT_DETACH), "umount2")
+    os.chdir("/")
+    _mount(None, "/", None, MS_REMOUNT | MS_BIND | MS_RDONLY | MS_NOSUID | MS_NODEV)
+
+
+def _set_limits(limits: dict) -> None:
+    resource.setrlimit(resource.RLIMIT_AS, (limits["memory"], limits["memory"]))
+    resource.setrlimit(resource.RLIMIT_NPROC, (limits["nproc"], limits["nproc"]))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (limits["nofile"], limits["nofile"]))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (limits["fsize"], limits["fsize"]))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    if limits.get("cpu"):
+        resource.setrlimit(resource.RLIMIT_CPU, (limits["cpu"], limits["cpu"]))
+
+
+def _seccomp_filter() -> SockFprog:
+    audit_arch, numbers = ARCHES[platform.machine()]
+    program = [
+        SockFilter(BPF_LD_W_ABS, 0, 0, 4),  # seccomp_data.arch
+        SockFilter(BPF_JEQ_K, 1, 0, audit_arch),
+        SockFilter(BPF_RET_K, 0, 0, SECCOMP_RET_KILL_PROCESS),
+        SockFilter(BPF_LD_W_ABS, 0, 0, 0),  # seccomp_data.nr
+    ]
+    if platform.machine() == "x86_64":
+        program += [SockFilter(BPF_JGE_K, 0, 1, _X32_SYSCALL_BIT),
+                    SockFilter(BPF_RET_K, 0, 0, SECCOMP_RET_ERRNO | EPERM)]
+    for name in _BLOCKED:
+        program += [SockFilter(BPF_JEQ_K, 0, 1, numbers[name]),
+                    SockFilter(BPF_RET_K, 0, 0, SECCOMP_RET_ERRNO | EPERM)]
+    # as flags do clone3 ficam na memória, fora do alcance do filtro: ENOSYS faz a
+    # libc cair no clone, que o filtro consegue olhar
+    program += [SockFilter(BPF_JEQ_K, 0, 1, numbers["clone3"]),
+                SockFilter(BPF_RET_K, 0, 0, SECCOMP_RET_ERRNO | ENOSYS)]
+    # clone: fork e threads passam; com flag de namespace, EPERM
+    program += [SockFilter(BPF_JEQ_K, 0, 3, numbers["clone"]),
+                SockFilter(BPF_LD_W_ABS, 0, 0, _SECCOMP_ARG0),
+                SockFilter(BPF_JSET_K, 0, 1, _CLONE_NS_FLAGS),
+                SockFilter(BPF_RET_K, 0, 0, SECCOMP_RET_ERRNO | EPERM)]
+    program.append(SockFilter(BPF_RET_K, 0, 0, SECCOMP_RET_ALLOW))
+
+    filters = (SockFilter * len(program))(*program)
+    return SockFprog(len(program), filters)
+
+
+def _sandbox(config: dict, binds: list) -> None:
+    """Neto: PID 1 do namespace novo. Monta a raiz, aplica os limites e vira o harness."""
+    _die_with_parent()
+    _setup_root(config, binds)
+    _set_limits(config["limits"])
+    _prctl(PR_SET_NO_NEW_PRIVS, ctypes.c_ulong(1))
+    prog = _seccomp_filter()
+    _check(libc.prctl(PR_SET_SECCOMP, ctypes.c_ulong(SECCOMP_MODE_FILTER), ctypes.byref(prog),
+                      ctypes.c_ulong(0), ctypes.c_ulong(0)), "seccomp")
+
+    bootstrap = (f"import sys; sys.path.insert(0, {config['lib']!r}); "
+                 "import wanda_harness; wanda_harness.main()")
+    os.execve(config["python"], [config["python"], "-I", "-S", "-c", bootstrap], {})
+
+
+def _exit_status(status: int) -> int:
+    if os.WIFSIGNALED(status):
+        return 128 + os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def _open_binds(paths: list) -> list:
+    # abre as origens ainda com o uid do host, já no namespace de mount novo
+    # (bind de um mount de outro namespace não é permitido)
+    binds = []
+    for path in paths:
+        if os.path.islink(path):
+            binds.append((path, None, os.readlink(path)))
+        elif os.path.exists(path):
+            binds.append((path, os.open(path, os.O_PATH), None))
+    return binds
+
+
+def _child(config: dict, ready_w: int, mapped_r: int) -> None:
+    """Filho: cria os namespaces, espera o mapa de ids e sobe o PID 1."""
+    _die_with_parent()
+    _check(libc.unshare(CLONE_NEWUSER | CLONE_NEWNS | CLONE_NEWPID | CLONE_NEWNET | CLONE_NEWIPC | CLONE_NEWUTS),
+           "unshare")
+    os.write(ready_w, b"1")
+    os.close(ready_w)
+    if os.read(mapped_r, 1) != b"1":
+        os._exit(1)
+    os.close(mapped_r)
+    binds = _open_binds(config["binds"])
+    # vira o nobody mapeado; as capabilities do namespace novo continuam até o exec
+    os.setresgid(SANDBOX_ID, SANDBOX_ID, SANDBOX_ID)
+    os.setresuid(SANDBOX_ID, SANDBOX_ID, SANDBOX_ID)
+    # a troca de uid zera o PDEATHSIG
+    _die_with_parent()
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _sandbox(config, binds)
+        except BaseException as e:
+            sys.stderr.write(f"Falha ao montar a sandbox: {e}\n")
+        os._exit(1)
+    _, status = os.waitpid(pid, 0)
+    os._exit(_exit_status(status))
+
+
+def main() -> None:
+    config = json.loads(sys.argv[1])
+    if platform.machine() not in ARCHES:
+        sys.stderr.write(f"Arquitetura sem filtro seccomp: {platform.machine()}\n")
+        sys.exit(1)
+
+    ready_r, ready_w = os.pipe()
+    mapped_r, mapped_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(ready_r)
+        os.close(mapped_w)
+        try:
+            _child(config, ready_w, mapped_r)
+        except BaseException as e:
+            sys.stderr.write(f"Falha ao criar a sandbox: {e}\n")
+        os._exit(1)
+
+    os.close(ready_w)
+    os.close(mapped_r)
+    if os.read(ready_r, 1) == b"1":
+        _write_id_maps(pid)
+        os.write(mapped_w, b"1")
+    os.close(mapped_w)
+    _, status = os.waitpid(pid, 0)
+    sys.exit(_exit_status(status))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import os
+import queue
+import select
+import subprocess
+import threading
+import time
+import uuid
+import logging
+from typing import Optional
+
+from .protocol import build_job, error_result, timeout_result, result_from_response
+from .config import (SANDBOX_IMAGE, SANDBOX_DOCKER_FLAGS, POOL_SIZE, POOL_MAX_JOBS_PER_CONTAINER,
+    POOL_ACQUIRE_TIMEOUT, POOL_BOOT_TIMEOUT, POOL_RESPAWN_DELAY, POOL_JOB_MEMORY_MB)
+from .docker_cli import kill_container_sync
+from .kill_reaper import get_kill_reaper
+
+logger = logging.getLogger(__name__)
+
+# folga (s) do host sobre o limite que o zygote aplica no filho: o timeout
+# normal volta como resposta do próprio zygote, sem descartar o container
+_ZYGOTE_GRACE = 2
+
+
+class _Worker:
+    """Um container do pool, com o harness em modo serve esperando jobs."""
+
+    def __init__(self, process: subprocess.Popen, container_name: str):
+        self.process = process
+        self.container_name = container_name
+        self.jobs = 0
+        self._buffer = b""
+
+    def send(self, payload: str) -> None:
+        self.process.stdin.write(payload.encode() + b"\n")
+        self.process.stdin.flush()
+
+    def readline(self, timeout: float) -> str:
+        # le uma linha do stdout sem bloquear além do timeout
+        deadline = time.monotonic() + timeout
+        fd = self.process.stdout.fileno()
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError()
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise EOFError("Container do pool encerrou inesperadamente.")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return line.decode()
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+
+class SandboxPool:
+    """
+    Pool de containers de sandbox pré-iniciados.
+
+    Cada container sobe com as mesmas proteções do caminho frio, roda o
+    harness em modo serve (zygote) e fica esperando jobs no stdin. Cada job
+    roda num fork do zygote, então o estado de uma submissão não chega na
+    próxima. Depois de `max_jobs` execuções (ou de erro/timeout do próprio
+    container) o container é descartado e um novo é iniciado em background.
+    """
+
+    def __init__(self, size: int, max_jobs: int = 1, acquire_timeout: float = 2):
+        self.size = size
+        self.max_jobs = max(1, max_jobs)
+        self.acquire_timeout = acquire_timeout
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._replacing = 0
+        self._started = False
+        self._stopped = False
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        logger.info("Iniciando pool de sandboxes. tamanho=%s", self.size)
+        for _ in range(self.size):
+            self._spawn_in_background()
+
+    def stop(self) -> None:
+        self._stopped = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._kill(worker)
+        logger.info("Pool de sandboxes encerrado.")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": self._idle.qsize(),
+                "busy": self._busy,
+                "replacing": self._replacing,
+            }
+
+    def execute(self, job: str, timeout: int = 5) -> Optional[dict]:
+        """
+        Executa o job (linha JSON do harness) em um container livre do pool.
+        Retorna None se nenhum container ficou livre a tempo — o chamador
+        deve cair no caminho frio.
+        """
+        worker = self._acquire()
+        if worker is None:
+            return None
+
+        logger.info("Executando job no pool. nome=%s", worker.container_name)
+        try:
+            # o zygote aplica o timeout no filho e responde timed_out sem morrer
+            payload = json.loads(job)
+            payload["timeout"] = timeout
+            worker.send(json.dumps(payload))
+            raw = worker.readline(timeout + _ZYGOTE_GRACE)
+            response = json.loads(raw)
+        except TimeoutError:
+            logger.error("Timeout no pool. Descartando container. nome=%s", worker.container_name)
+            self._release(worker, discard=True)
+            return timeout_result()
+        except Exception as e:
+            logger.error("Erro no container do pool. nome=%s erro=%s", worker.container_name, str(e))
+            self._release(worker, discard=True)
+            return error_result(str(e))
+
+        worker.jobs += 1
+        if response.get("discard"):
+            # um processo do job sobreviveu à limpeza do zygote: o container não serve mais
+            logger.error("Processo do job sobreviveu no zygote. Descartando container. nome=%s",
+                         worker.container_name)
+        self._release(worker, discard=worker.jobs >= self.max_jobs or bool(response.get("discard")))
+        return result_from_response(response)
+
+    def _acquire(self) -> Optional[_Worker]:
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning("Nenhum container livre no pool. stats=%s", self.stats())
+                return None
+            try:
+                worker = self._idle.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if not worker.alive():
+                # morreu enquanto esperava — repõe e tenta o próximo
+                self._replace(worker)
+                continue
+            with self._lock:
+                self._busy += 1
+            return worker
+
+    def _release(self, worker: _Worker, discard: bool) -> None:
+        with self._lock:
+            self._busy -= 1
+        if discard or self._stopped or not worker.alive():
+            self._replace(worker)
+        else:
+            self._idle.put(worker)
+
+    def _replace(self, worker: _Worker) -> None:
+        # o kill sai do caminho do job: o reaper roda o docker kill numa thread
+        get_kill_reaper().submit(worker.container_name, lambda: asyncio.to_thread(self._kill_now, worker))
+        if not self._stopped:
+            self._spawn_in_background()
+
+    def _spawn_in_background(self) -> None:
+        with self._lock:
+            self._replacing += 1
+        threading.Thread(target=self._spawn, daemon=True).start()
+
+    def _spawn(self) -> None:
+        try:
+            while not self._stopped:
+                try:
+                    worker = self._start_worker()
+                except Exception as e:
+                    logger.error("Falha ao iniciar container do pool. erro=%s", str(e))
+                    time.sleep(POOL_RESPAWN_DELAY)
+                    continue
+                if self._stopped:
+                    self._kill(worker)
+                else:
+                    self._idle.put(worker)
+                return
+        finally:
+            with self._lock:
+                self._replacing -= 1
+
+    def _start_worker(self) -> _Worker:
+        container_name = f"wanda_pool_{uuid.uuid4().hex}"
+        process = subprocess.Popen(
+            [
+                "docker", "run", "--rm", "--interactive", "--init",
+                "--name", container_name,
+                *SANDBOX_DOCKER_FLAGS,
+                SANDBOX_IMAGE,
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        worker = _Worker(process, container_name)
+        try:
+            worker.send(build_job("serve", memory_limit=POOL_JOB_MEMORY_MB * 1024 * 1024))
+            ready = json.loads(worker.readline(POOL_BOOT_TIMEOUT))
+            if not ready.get("ready"):
+                raise RuntimeError(f"Resposta inesperada no boot: {ready}")
+        except Exception:
+            self._kill(worker)
+            raise
+        logger.info("Container do pool pronto. nome=%s", container_name)
+        return worker
+
+    def _kill_now(self, worker: _Worker) -> None:
+        kill_container_sync(worker.container_name)
+        worker.process.kill()
+        worker.process.wait()
+
+    def _kill(self, worker: _Worker) -> None:
+        try:
+            self._kill_now(worker)
+        except Exception as e:
+            logger.warning("Erro ao matar container do pool. nome=%s erro=%s", worker.container_name, str(e))
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> Optional[SandboxPool]:
+    """Retorna o pool global (criando e iniciando na primeira chamada) ou None se desativado."""
+    global _pool
+    if POOL_SIZE <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = SandboxPool(POOL_SIZE, POOL_MAX_JOBS_PER_CONTAINER, POOL_ACQUIRE_TIMEOUT)
+            _pool.start()
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.stop()
+            _pool = None
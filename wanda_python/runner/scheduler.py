@@ -0,0 +1,163 @@
+import asyncio
+import time
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict
+
+from .config import SCHEDULER_MAX_SANDBOXES, SCHEDULER_QUEUE_LIMITS, SCHEDULER_QUEUE_MAX_WAIT
+
+logger = logging.getLogger(__name__)
+
+# Lanes em ordem de prioridade: rounds de partida primeiro, depois /validate,
+# depois /run (e /feedback, que entra na mesma fila quando executa código)
+LANE_SESSION = "session"
+LANE_VALIDATE = "validate"
+LANE_RUN = "run"
+LANES = (LANE_SESSION, LANE_VALIDATE, LANE_RUN)
+
+
+class SandboxQueueFull(Exception):
+    """Fila da lane cheia — a requisição deve ser recusada com 429."""
+
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"Fila de execução '{lane}' cheia.")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class _LaneStats:
+    def __init__(self):
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.admitted += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+
+class SandboxScheduler:
+    """
+    Controle global de admissão de sandboxes.
+
+    No máximo `max_sandboxes` containers rodam ao mesmo tempo; o excedente
+    espera numa fila por lane. Quando uma vaga abre, ela vai para a lane de
+    maior prioridade que tiver alguém esperando. Se a fila da lane estiver
+    cheia, a requisição é recusada na hora com SandboxQueueFull; quem espera
+    mais que `max_waits[lane]` segundos sai da fila com a mesma exceção.
+    """
+
+    def __init__(self, max_sandboxes: int, queue_limits: Dict[str, int], max_waits: Dict[str, float] = None):
+        self.max_sandboxes = max(1, max_sandboxes)
+        self.queue_limits = queue_limits
+        self.max_waits = max_waits or {}
+        self._active = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._stats: Dict[str, _LaneStats] = {lane: _LaneStats() for lane in LANES}
+        # média móvel de quanto tempo uma vaga fica ocupada — base do Retry-After
+        self._avg_hold = 1.0
+
+    async def acquire(self, lane: str) -> None:
+        queue = self._queues[lane]
+        start = time.monotonic()
+
+        if self._active < self.max_sandboxes and not self._has_waiters_up_to(lane):
+            self._active += 1
+            self._stats[lane].record_wait(0.0)
+            return
+
+        if len(queue) >= self.queue_limits.get(lane, 0):
+            self._stats[lane].rejected += 1
+            retry_after = self._retry_after()
+            logger.warning("Fila de sandbox cheia. lane=%s fila=%s retry_after=%s", lane, len(queue), retry_after)
+            raise SandboxQueueFull(lane, retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_waits.get(lane))
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # o release() concedeu a vaga junto com o timeout: a vaga é nossa
+                self._stats[lane].record_wait(time.monotonic() - start)
+                return
+            # o wait_for cancela o waiter, então o release() não o escolhe mais
+            if waiter in queue:
+                queue.remove(waiter)
+            self._stats[lane].timed_out += 1
+            retry_after = self._retry_after()
+            logger.warning("Espera por sandbox estourou. lane=%s espera_s=%.1f retry_after=%s",
+                           lane, time.monotonic() - start, retry_after)
+            raise SandboxQueueFull(lane, retry_after)
+        except asyncio.CancelledError:
+            if waiter in queue:
+                queue.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                # a vaga já tinha sido concedida — devolve
+                self.release()
+            raise
+        self._stats[lane].record_wait(time.monotonic() - start)
+
+    def release(self, held_for: float = None) -> None:
+        if held_for is not None:
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * held_for
+        # passa a vaga direto para o próximo da lane mais prioritária
+        for lane in LANES:
+            queue = self._queues[lane]
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self, lane: str):
+        await self.acquire(lane)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    def stats(self) -> dict:
+        lanes = {}
+        for lane in LANES:
+            s = self._stats[lane]
+            lanes[lane] = {
+                "queueDepth": len(self._queues[lane]),
+                "queueLimit": self.queue_limits.get(lane, 0),
+                "admitted": s.admitted,
+                "rejected": s.rejected,
+                "timedOut": s.timed_out,
+                "waitAvgMs": round(s.wait_total / s.admitted * 1000, 1) if s.admitted else 0.0,
+                "waitMaxMs": round(s.wait_max * 1000, 1),
+            }
+        return {"maxSandboxes": self.max_sandboxes, "active": self._active, "lanes": lanes}
+
+    def _has_waiters_up_to(self, lane: str) -> bool:
+        # alguém de prioridade igual ou maior já está esperando — entra na fila
+        for other in LANES:
+            if self._queues[other]:
+                return True
+            if other == lane:
+                return False
+        return False
+
+    def _retry_after(self) -> int:
+        waiting = sum(len(q) for q in self._queues.values())
+        return max(1, int(self._avg_hold * (waiting + 1) / self.max_sandboxes + 0.999))
+
+
+_scheduler = None
+
+
+def get_scheduler() -> SandboxScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SandboxScheduler(SCHEDULER_MAX_SANDBOXES, SCHEDULER_QUEUE_LIMITS, SCHEDULER_QUEUE_MAX_WAIT)
+    return _scheduler
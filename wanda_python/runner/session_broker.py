@@ -0,0 +1,265 @@
+"""
+Broker de sessões para rodar a API com vários workers (uvicorn --workers N).
+
+Os containers de sessão são filhos do processo que os criou, então só esse
+processo consegue falar com eles. Com WANDA_SESSION_BROKER_SOCKET definido,
+o primeiro worker que pegar o lock do socket vira o dono de todas as
+sessões e atende os outros por um socket Unix; os demais viram clientes e
+repassam create/execute/close para ele. Qualquer worker consegue então
+dirigir qualquer sessão.
+
+Protocolo: uma linha JSON por mensagem, multiplexada por id
+    pedido:   {"id": 1, "op": "create" | "execute" | "execute_batch" | "close" | "stats", "args": {...}}
+    resposta: {"id": 1, "result": ...} ou {"id": 1, "error": {"type": ..., "detail": ...}}
+"""
+import asyncio
+import fcntl
+import itertools
+import json
+import os
+import logging
+from typing import Dict, Optional
+
+from .config import SESSION_BROKER_SOCKET
+from .scheduler import SandboxQueueFull
+
+logger = logging.getLogger(__name__)
+
+# código dos jogadores e lotes de rounds passam do limite padrão de 64KB por linha
+_STREAM_LIMIT = 16 * 1024 * 1024
+# tentativas de conexão enquanto o dono ainda está subindo o socket
+_CONNECT_ATTEMPTS = 5
+_CONNECT_RETRY_DELAY = 0.2
+
+
+class SessionBrokerError(Exception):
+    """Broker de sessões inacessível ou falha ao atender o pedido."""
+
+
+async def _dispatch(op: str, args: dict):
+    # import tardio: o container_runner importa este módulo para rotear as chamadas
+    from . import container_runner
+
+    if op == "create":
+        return await container_runner.create_session(args["p1"], args["p2"], args.get("framing"))
+    if op == "execute":
+        return await container_runner.execute_round(args["session_id"], args["p1"], args["p2"], args["timeout"])
+    if op == "execute_batch":
+        rounds = [(p1, p2) for p1, p2 in args["rounds"]]
+        return await container_runner.execute_rounds(args["session_id"], rounds, args["timeout"])
+    if op == "close":
+        return await container_runner.close_session(args["session_id"])
+    if op == "stats":
+        return _local_session_stats()
+    raise ValueError(f"Operação desconhecida: {op}")
+
+
+class SessionBroker:
+    """Lado dono: atende os outros workers no socket Unix."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        # socket que sobrou de um dono anterior que morreu
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path, limit=_STREAM_LIMIT)
+        logger.info("Broker de sessoes iniciado. socket=%s pid=%s", self.path, os.getpid())
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        logger.info("Broker de sessoes encerrado.")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                # cada pedido roda em paralelo: rounds de sessões diferentes não se esperam
+                task = asyncio.get_running_loop().create_task(self._serve(json.loads(line), writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except Exception as e:
+            logger.warning("Conexao com worker encerrada. erro=%s", str(e))
+        finally:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def _serve(self, request: dict, writer: asyncio.StreamWriter, lock: asyncio.Lock) -> None:
+        response = {"id": request.get("id")}
+        try:
+            response["result"] = await _dispatch(request.get("op"), request.get("args", {}))
+        except SandboxQueueFull as e:
+            response["error"] = {"type": "SANDBOX_QUEUE_FULL", "detail": str(e), "lane": e.lane,
+                                 "retryAfter": e.retry_after}
+        except Exception as e:
+            logger.error("Erro no broker de sessoes. op=%s erro=%s", request.get("op"), str(e))
+            response["error"] = {"type": "ERROR", "detail": str(e)}
+
+        try:
+            async with lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, OSError):
+            logger.warning("Worker desconectou antes da resposta. op=%s", request.get("op"))
+
+
+class SessionBrokerClient:
+    """Lado cliente: uma conexão por worker, com vários pedidos em andamento."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+    async def call(self, op: str, **args):
+        await self._connect()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            async with self._write_lock:
+                self._writer.write(json.dumps({"id": request_id, "op": op, "args": args}).encode() + b"\n")
+                await self._writer.drain()
+            response = await future
+        except (ConnectionError, OSError) as e:
+            raise SessionBrokerError(f"Falha ao falar com o broker de sessões: {e}")
+        finally:
+            self._pending.pop(request_id, None)
+
+        error = response.get("error")
+        if error is None:
+            return response.get("result")
+        if error["type"] == "SANDBOX_QUEUE_FULL":
+            raise SandboxQueueFull(error["lane"], error["retryAfter"])
+        raise SessionBrokerError(error["detail"])
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def _connect(self) -> None:
+        if self._writer is not None:
+            return
+        async with self._connect_lock:
+            if self._writer is not None:
+                return
+            for attempt in range(_CONNECT_ATTEMPTS):
+                try:
+                    reader, writer = await asyncio.open_unix_connection(self.path, limit=_STREAM_LIMIT)
+                    break
+                except OSError as e:
+                    if attempt == _CONNECT_ATTEMPTS - 1:
+                        raise SessionBrokerError(f"Broker de sessões indisponível: {e}")
+                    await asyncio.sleep(_CONNECT_RETRY_DELAY)
+            self._writer = writer
+            self._reader_task = asyncio.get_running_loop().create_task(self._read_responses(reader, writer))
+
+    async def _read_responses(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._pending.get(response.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except Exception as e:
+            logger.error("Erro lendo respostas do broker de sessoes. erro=%s", str(e))
+        finally:
+            # conexão caiu (dono reiniciou?): o próximo call reconecta
+            if self._writer is writer:
+                self._writer = None
+            writer.close()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(SessionBrokerError("Conexão com o broker de sessões caiu."))
+
+
+_broker: Optional[SessionBroker] = None
+_client: Optional[SessionBrokerClient] = None
+_lock_fd: Optional[int] = None
+
+
+async def start_session_broker() -> bool:
+    """
+    Decide quem é o dono das sessões neste processo. Retorna True se as
+    sessões rodam aqui (broker desligado, ou este worker ganhou o lock) e
+    False se este worker é só cliente do broker.
+    """
+    global _broker, _client, _lock_fd
+    if not SESSION_BROKER_SOCKET:
+        return True
+
+    fd = os.open(SESSION_BROKER_SOCKET + ".lock", os.O_CREAT | os.O_RDWR, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        _client = SessionBrokerClient(SESSION_BROKER_SOCKET)
+        logger.info("Sessoes atendidas pelo broker. socket=%s pid=%s", SESSION_BROKER_SOCKET, os.getpid())
+        return False
+
+    # o lock fica com o processo até ele morrer; aí outro worker pode assumir
+    _lock_fd = fd
+    _broker = SessionBroker(SESSION_BROKER_SOCKET)
+    await _broker.start()
+    return True
+
+
+def get_broker_client() -> Optional[SessionBrokerClient]:
+    """Cliente do broker, ou None se as sessões deste processo são locais."""
+    return _client
+
+
+def _local_session_stats() -> dict:
+    from .session_manager import get_session_manager
+    from .session_pool import get_session_pool
+
+    session_pool = get_session_pool()
+    return {
+        "sessionPool": session_pool.stats() if session_pool else None,
+        "sessions": get_session_manager().stats(),
+    }
+
+
+async def session_stats() -> dict:
+    """Contadores do pool de sessões e das sessões, vindos do worker dono."""
+    if _client is not None:
+        return await _client.call("stats")
+    return _local_session_stats()
+
+
+def broker_stats() -> Optional[dict]:
+    if not SESSION_BROKER_SOCKET:
+        return None
+    return {"socket": SESSION_BROKER_SOCKET, "role": "client" if _client is not None else "owner", "pid": os.getpid()}
+
+
+async def shutdown_session_broker() -> None:
+    global _broker, _client, _lock_fd
+    if _client is not None:
+        await _client.close()
+        _client = None
+    if _broker is not None:
+        await _broker.stop()
+        _broker = None
+    if _lock_fd is not None:
+        os.close(_lock_fd)
+        _lock_fd = None
@@ -0,0 +1,216 @@
+import asyncio
+import time
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+from .config import (SESSION_MAX_SESSIONS, SESSION_IDLE_TTL, SESSION_MAX_LIFETIME,
+    SESSION_REAPER_INTERVAL)
+from .scheduler import get_scheduler, SandboxQueueFull, LANE_SESSION
+from .session_pool import kill_session_container
+
+logger = logging.getLogger(__name__)
+
+EVICT_IDLE_TTL = "idleTtl"
+EVICT_MAX_LIFETIME = "maxLifetime"
+EVICT_LRU = "lru"
+
+# quantos ids de sessões removidas guardar para explicar o SESSION_NOT_FOUND
+_MAX_TOMBSTONES = 1024
+
+_EVICTION_DETAILS = {
+    EVICT_IDLE_TTL: "encerrada por inatividade",
+    EVICT_MAX_LIFETIME: "encerrada por tempo máximo de vida",
+    EVICT_LRU: "encerrada para liberar espaço para novas sessões",
+}
+
+
+class SessionManager:
+    """
+    Registro das sessões de partida abertas.
+
+    Guarda as sessões em ordem de uso (LRU) e encerra as abandonadas: a
+    sessão que fica `idle_ttl` segundos sem round, ou que passa de
+    `max_lifetime` segundos de vida, é morta pelo reaper em background.
+    Acima de `max_sessions` sessões com container, criar uma sessão nova
+    derruba a ociosa usada há mais tempo. Sessões com round em andamento nunca são removidas.
+    """
+
+    def __init__(self, max_sessions: int, idle_ttl: float, max_lifetime: float, reaper_interval: float):
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl = idle_ttl
+        self.max_lifetime = max_lifetime
+        self.reaper_interval = reaper_interval
+        self._sessions: "OrderedDict[str, dict]" = OrderedDict()
+        self._tombstones: "OrderedDict[str, str]" = OrderedDict()
+        self._created = 0
+        self._closed = 0
+        self._evicted = {EVICT_IDLE_TTL: 0, EVICT_MAX_LIFETIME: 0, EVICT_LRU: 0}
+        self._reaper: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._reaper is None:
+            logger.info(
+                "Iniciando reaper de sessoes. max_sessoes=%s idle_ttl=%s max_vida=%s",
+                self.max_sessions, self.idle_ttl, self.max_lifetime
+            )
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_forever())
+
+    async def stop(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+        # containers de sessão não sobrevivem à aplicação
+        for session_id in list(self._sessions):
+            await self.kill(session_id)
+        logger.info("Gerenciador de sessoes encerrado.")
+
+    def add(self, session_id: str, session: dict) -> None:
+        now = time.monotonic()
+        session["created_at"] = now
+        session["last_used"] = now
+        session["busy"] = 0
+        self._sessions[session_id] = session
+        self._created += 1
+
+    def checkout(self, session_id: str) -> Optional[dict]:
+        """Pega a sessão para executar rounds — fica protegida do reaper até o checkin."""
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session["busy"] += 1
+            session["last_used"] = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def checkin(self, session: Optional[dict]) -> None:
+        if session is not None:
+            session["busy"] -= 1
+            session["last_used"] = time.monotonic()
+
+    def pop(self, session_id: str) -> Optional[dict]:
+        return self._sessions.pop(session_id, None)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def not_found_detail(self, session_id: str) -> str:
+        reason = self._tombstones.get(session_id)
+        if reason is not None:
+            return f"Sessão '{session_id}' foi {_EVICTION_DETAILS[reason]}."
+        return f"Sessão '{session_id}' não existe ou já foi encerrada."
+
+    async def kill(self, session_id: str, reason: str = None, release_slot: bool = True) -> bool:
+        """
+        Remove a sessão e mata o container. Devolve True se a sessão segurava
+        uma vaga do scheduler; com `release_slot=False` essa vaga não é
+        liberada e passa a ser de quem chamou.
+        """
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        if reason is None:
+            self._closed += 1
+        else:
+            self._evicted[reason] += 1
+            self._tombstones[session_id] = reason
+            while len(self._tombstones) > _MAX_TOMBSTONES:
+                self._tombstones.popitem(last=False)
+        if "container" not in session:
+            # sessão que nem chegou a carregar ou respondida por tabelas-verdade:
+            # não tem container nem vaga
+            return False
+
+        # libera a vaga do scheduler ocupada desde o create_session
+        if release_slot:
+            get_scheduler().release()
+        kill_session_container(session["container"])
+        return True
+
+    async def make_room(self) -> bool:
+        """
+        Chamado antes de criar uma sessão: no limite, derruba as sessões
+        ociosas usadas há mais tempo. Se todas estiverem com round em
+        andamento, recusa a nova sessão com SandboxQueueFull (429).
+
+        Devolve True quando a vaga do scheduler da sessão derrubada ficou
+        com quem chamou — a sessão nova usa essa vaga sem passar pelo
+        acquire (e deve liberá-la se não chegar a usar).
+        """
+        handed = False
+        # só contam as sessões com container: o limite existe por causa das vagas do scheduler
+        while self._sandboxed() >= self.max_sessions:
+            victim = next((sid for sid, s in self._sessions.items() if s["busy"] == 0 and "container" in s), None)
+            if victim is None:
+                logger.warning("Limite de sessoes atingido sem sessoes ociosas. ativas=%s", self._sandboxed())
+                raise SandboxQueueFull(LANE_SESSION, retry_after=1)
+            logger.warning("Sessao removida por LRU. session_id=%s", victim)
+            # a vaga da primeira vítima vai direto para a sessão nova: com release()
+            # ela iria para o próximo da fila e a sessão nova teria que esperar outra
+            if handed:
+                await self.kill(victim, EVICT_LRU)
+            else:
+                handed = await self.kill(victim, EVICT_LRU, release_slot=False)
+        return handed
+
+    def _sandboxed(self) -> int:
+        return sum(1 for session in self._sessions.values() if "container" in session)
+
+    async def reap(self) -> None:
+        now = time.monotonic()
+        expired = []
+        for session_id, session in self._sessions.items():
+            if session["busy"]:
+                continue
+            if now - session["created_at"] >= self.max_lifetime:
+                expired.append((session_id, EVICT_MAX_LIFETIME))
+            elif now - session["last_used"] >= self.idle_ttl:
+                expired.append((session_id, EVICT_IDLE_TTL))
+        for session_id, reason in expired:
+            logger.warning("Sessao expirada. session_id=%s motivo=%s", session_id, reason)
+            await self.kill(session_id, reason)
+
+    async def _reap_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.reaper_interval)
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error("Erro no reaper de sessoes. erro=%s", str(e))
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        ages = [now - s["created_at"] for s in self._sessions.values()]
+        idles = [now - s["last_used"] for s in self._sessions.values() if not s["busy"]]
+        return {
+            "active": len(self._sessions),
+            "tabled": sum(1 for s in self._sessions.values() if "tables" in s),
+            "busy": sum(1 for s in self._sessions.values() if s["busy"]),
+            "maxSessions": self.max_sessions,
+            "idleTtlS": self.idle_ttl,
+            "maxLifetimeS": self.max_lifetime,
+            "created": self._created,
+            "closed": self._closed,
+            "evicted": dict(self._evicted),
+            "ageAvgS": round(sum(ages) / len(ages), 1) if ages else 0.0,
+            "ageMaxS": round(max(ages), 1) if ages else 0.0,
+            "idleMaxS": round(max(idles), 1) if idles else 0.0,
+        }
+
+
+_manager: Optional[SessionManager] = None
+
+
+def get_session_manager() -> SessionManager:
+    global _manager
+    if _manager is None:
+        _manager = SessionManager(SESSION_MAX_SESSIONS, SESSION_IDLE_TTL, SESSION_MAX_LIFETIME,
+                                  SESSION_REAPER_INTERVAL)
+    return _manager
+
+
+async def shutdown_session_manager() -> None:
+    global _manager
+    if _manager is not None:
+        await _manager.stop()
+        _manager = None
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import uuid
+import logging
+from collections import deque
+from typing import Deque, Optional, Set
+
+from .backends import get_backend
+from .config import SESSION_POOL_SIZE, SESSION_BOOT_TIMEOUT, POOL_RESPAWN_DELAY
+from .kill_reaper import get_kill_reaper
+from .protocol import build_job
+
+logger = logging.getLogger(__name__)
+
+
+class SessionContainer:
+    """Container de sessão com o harness no ar, ainda sem o código dos jogadores."""
+
+    def __init__(self, process, container_name: str):
+        self.process = process
+        self.container_name = container_name
+
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+
+async def start_session_container() -> SessionContainer:
+    """Sobe um container de sessão e espera o harness avisar que está pronto."""
+    container_name = f"wanda_session_{uuid.uuid4().hex}"
+
+    # o backend sobe a sandbox interativa; o entrypoint é o harness, que já
+    # escreve o protocolo sem buffer
+    process = await get_backend().start_session(container_name)
+    container = SessionContainer(process, container_name)
+
+    try:
+        process.stdin.write((build_job("session") + "\n").encode())
+        await process.stdin.drain()
+        raw = await asyncio.wait_for(process.stdout.readline(), timeout=SESSION_BOOT_TIMEOUT)
+        ready = json.loads(raw.decode().strip())
+        if not ready.get("ready"):
+            raise RuntimeError(f"Resposta inesperada no boot: {ready}")
+    except BaseException:
+        kill_session_container(container)
+        raise
+
+    return container
+
+
+def kill_session_container(container: SessionContainer) -> None:
+    """Entrega o container ao reaper de kills e volta na hora (erros e retries ficam lá)."""
+    backend = get_backend()
+    get_kill_reaper().submit(container.container_name,
+                             lambda: backend.kill(container.container_name, container.process))
+
+
+class SessionPool:
+    """
+    Pool de containers de sessão ociosos, com o interpretador já no ar.
+    O create_session só entrega o código dos jogadores a um deles; a
+    reposição acontece em background.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: Deque[SessionContainer] = deque()
+        self._booting = 0
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopped = False
+
+    def start(self) -> None:
+        logger.info("Iniciando pool de sessoes. tamanho=%s", self.size)
+        for _ in range(self.size):
+            self._refill()
+
+    async def stop(self) -> None:
+        self._stopped = True
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        # espera os boots cancelados terminarem de matar o que já tinham subido
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while self._idle:
+            kill_session_container(self._idle.popleft())
+        logger.info("Pool de sessoes encerrado.")
+
+    def acquire(self) -> Optional[SessionContainer]:
+        """Retorna um container pronto, ou None se não houver nenhum ocioso."""
+        while self._idle:
+            container = self._idle.popleft()
+            self._refill()
+            if container.alive():
+                return container
+            logger.warning("Container de sessao ocioso morreu. nome=%s", container.container_name)
+        return None
+
+    def stats(self) -> dict:
+        return {"size": self.size, "idle": len(self._idle), "booting": self._booting}
+
+    def _refill(self) -> None:
+        if self._stopped:
+            return
+        task = asyncio.get_running_loop().create_task(self._boot())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _boot(self) -> None:
+        self._booting += 1
+        try:
+            while not self._stopped:
+                try:
+                    container = await start_session_container()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error("Falha ao iniciar container de sessao. erro=%s", str(e))
+                    await asyncio.sleep(POOL_RESPAWN_DELAY)
+                    continue
+                self._idle.append(container)
+                return
+        finally:
+            self._booting -= 1
+
+
+_session_pool: Optional[SessionPool] = None
+
+
+def get_session_pool() -> Optional[SessionPool]:
+    """Retorna o pool de sessões (criado no startup da aplicação) ou None se desativado."""
+    global _session_pool
+    if SESSION_POOL_SIZE <= 0:
+        return None
+    if _session_pool is None:
+        _session_pool = SessionPool(SESSION_POOL_SIZE)
+        _session_pool.start()
+    return _session_pool
+
+
+async def shutdown_session_pool() -> None:
+    global _session_pool
+    if _session_pool is not None:
+        await _session_pool.stop()
+        _session_pool = None
@@ -0,0 +1,409 @@
+"""
+Tabela-verdade de estratégias puras.
+
+O espaço de entradas dos jogos é minúsculo: 27 mãos no jokenpo1, 81 no
+jokenpo2 e 16×5 no BITS (quatro bits + `opp_last`). Uma estratégia sem
+estado — a saída depende só dos parâmetros — pode ser avaliada inteira numa
+única chamada à sandbox e guardada como tabela; os rounds de sessão e o
+/round passam a ser uma consulta a um dict, sem container.
+
+A pureza é decidida em duas etapas:
+- análise da AST (`pure_arity`), conservadora: só funções e literais no
+  nível do módulo, nenhum import fora dos módulos puros, nada de
+  global/nonlocal, I/O, reflexão, argumento padrão mutável ou escrita em
+  estrutura do módulo. Qualquer dúvida = não é pura;
+- avaliação na sandbox, com todas as entradas em ordem direta e depois em
+  ordem inversa no mesmo processo: se alguma saída mudar, a estratégia guarda
+  estado e fica de fora. Erro em qualquer entrada também deixa de fora
+  (o erro aparece no round, pelo caminho normal).
+
+A tabela é indexada pelo hash do código normalizado; códigos recusados
+também ficam guardados, para não avaliar de novo a cada sessão.
+"""
+import ast
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from wanda_python.games.engine import JOKENPO_CARDS, BITS_CARDS
+from .config import TRUTH_TABLE_SIZE
+from .harness import HARNESS_VERSION
+from .result_cache import normalize_code
+
+logger = logging.getLogger(__name__)
+
+# aridade da strategy -> (entradas possíveis, retornos válidos do jogo)
+INPUT_SPACES = {
+    3: ([list(hand) for hand in itertools.product(JOKENPO_CARDS, repeat=3)], JOKENPO_CARDS),
+    4: ([list(hand) for hand in itertools.product(JOKENPO_CARDS, repeat=4)], JOKENPO_CARDS),
+    5: ([list(bits) + [last] for bits in itertools.product((1, 0), repeat=4) for last in [None] + BITS_CARDS],
+        BITS_CARDS),
+}
+
+# módulos sem estado nem I/O que a estratégia pode importar
+_PURE_MODULES = {"math", "itertools", "functools", "collections", "string", "operator"}
+# builtins de I/O, reflexão ou não determinísticos (hash/id mudam entre processos);
+# print fica liberado: na sessão a saída do aluno é descartada
+_FORBIDDEN_NAMES = {
+    "open", "input", "exec", "eval", "compile", "__import__", "globals", "locals", "vars",
+    "getattr", "setattr", "delattr", "id", "hash", "breakpoint", "memoryview", "help", "exit", "quit",
+}
+# métodos que alteram listas, dicts e sets
+_MUTATORS = {
+    "append", "extend", "insert", "pop", "remove", "clear", "update", "setdefault", "popitem",
+    "add", "discard", "sort", "reverse", "difference_update", "intersection_update",
+    "symmetric_difference_update", "__setitem__", "__delitem__",
+}
+# como um valor mutável do módulo pode aparecer: só em leitura
+_READ_METHODS = {"get", "keys", "values", "items", "index", "count", "copy"}
+_READ_CALLS = {"len", "sorted", "list", "tuple", "set", "frozenset", "dict", "min", "max", "sum", "any", "all",
+               "enumerate", "zip", "reversed"}
+_MUTABLE_LITERALS = (ast.List, ast.Dict, ast.Set, ast.ListComp, ast.DictComp, ast.SetComp)
+# a ordem de iteração de um set de strings muda com o hash seed de cada processo:
+# sets só podem aparecer onde a ordem não importa (ver _unordered_use)
+_SET_BUILDERS = {"set", "frozenset"}
+
+
+def pure_arity(code: str) -> Optional[int]:
+    """Aridade da strategy se o código passar na análise de pureza; senão None."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+
+    mutable_globals = set()
+    set_globals = set()
+    strategy = None
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef):
+            if node.decorator_list:
+                return None
+            if node.name == "strategy":
+                strategy = node
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            if not _pure_import(node):
+                return None
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            if node.value is None or not all(isinstance(t, ast.Name) for t in targets) or not _literal(node.value):
+                return None
+            if any(isinstance(n, _MUTABLE_LITERALS) for n in ast.walk(node.value)):
+                mutable_globals.update(t.id for t in targets)
+            if isinstance(node.value, ast.Set):
+                set_globals.update(t.id for t in targets)
+            elif any(isinstance(n, ast.Set) for n in ast.walk(node.value)):
+                return None
+        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            continue
+        elif not isinstance(node, ast.Pass):
+            return None
+
+    if strategy is None:
+        return None
+    args = strategy.args
+    if args.vararg or args.kwarg or args.kwonlyargs or args.defaults:
+        return None
+    arity = len(args.posonlyargs) + len(args.args)
+    if arity not in INPUT_SPACES:
+        return None
+
+    for function in tree.body:
+        if isinstance(function, ast.FunctionDef) and not _pure_function(function, mutable_globals, set_globals):
+            return None
+    return arity
+
+
+def _pure_import(node) -> bool:
+    if isinstance(node, ast.Import):
+        return all(alias.name in _PURE_MODULES for alias in node.names)
+    return node.level == 0 and node.module in _PURE_MODULES
+
+
+def _literal(node) -> bool:
+    try:
+        ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return False
+    return True
+
+
+def _root_name(node) -> Optional[str]:
+    # nome na base de a[0].b[1]...
+    while isinstance(node, (ast.Subscript, ast.Attribute)):
+        node = node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _pure_function(function: ast.FunctionDef, mutable_globals: set, set_globals: set) -> bool:
+    parents = {}
+    local_names = set()
+    for node in ast.walk(function):
+        for child in ast.iter_child_nodes(node):
+            parents[child] = node
+        if isinstance(node, ast.arguments):
+            if any(not _literal(default) or isinstance(default, _MUTABLE_LITERALS)
+                   for default in node.defaults + [d for d in node.kw_defaults if d is not None]):
+                return False
+            local_names.update(a.arg for a in node.posonlyargs + node.args + node.kwonlyargs)
+            local_names.update(a.arg for a in (node.vararg, node.kwarg) if a is not None)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            local_names.add(node.id)
+        elif isinstance(node, ast.FunctionDef) and node is not function:
+            local_names.add(node.name)
+    # um nome do módulo reatribuído dentro da função vira local dela
+    shadowed = mutable_globals & local_names
+
+    for node in ast.walk(function):
+        if isinstance(node, (ast.Global, ast.Nonlocal, ast.Yield, ast.YieldFrom, ast.Await, ast.AsyncFunctionDef,
+                             ast.ClassDef)):
+            return False
+        if isinstance(node, ast.FunctionDef) and node.decorator_list:
+            return False
+        if isinstance(node, (ast.Import, ast.ImportFrom)) and not _pure_import(node):
+            return False
+        if isinstance(node, ast.Name) and node.id in _FORBIDDEN_NAMES:
+            return False
+        if isinstance(node, ast.Attribute):
+            if node.attr.startswith("__") or isinstance(node.ctx, (ast.Store, ast.Del)):
+                return False
+            if node.attr in _MUTATORS and _root_name(node.value) not in local_names:
+                return False
+        if isinstance(node, ast.Subscript) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            if _root_name(node.value) not in local_names:
+                return False
+        if (isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id in mutable_globals
+                and node.id not in shadowed and not _read_only_use(node, parents)):
+            return False
+        if isinstance(node, (ast.Set, ast.SetComp)) and not _unordered_use(node, parents):
+            return False
+        if isinstance(node, ast.Name) and node.id in _SET_BUILDERS:
+            # set(...) e frozenset(...) seguem a regra dos literais; o nome solto (s = set) não passa
+            call = parents.get(node)
+            if not (isinstance(call, ast.Call) and call.func is node and _unordered_use(call, parents)):
+                return False
+        if (isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id in set_globals
+                and node.id not in local_names and not _unordered_use(node, parents)):
+            return False
+    return True
+
+
+def _unordered_use(node, parents: dict) -> bool:
+    # `in`, comparações, len() e sorted() sem key não dependem da ordem de iteração;
+    # for, min/max, list(), join etc. dependem
+    parent = parents.get(node)
+    if isinstance(parent, ast.Compare):
+        return True
+    if isinstance(parent, ast.Call) and node in parent.args and isinstance(parent.func, ast.Name):
+        return parent.func.id == "len" or (parent.func.id == "sorted" and not parent.keywords)
+    return False
+
+
+def _read_only_use(node, parents: dict) -> bool:
+    parent = parents.get(node)
+    if isinstance(parent, ast.Subscript) and parent.value is node:
+        # BEATS[x] só pode ser lido, e o valor lido não pode ser alterado
+        grandparent = parents.get(parent)
+        return not (isinstance(grandparent, ast.Attribute) and grandparent.attr not in _READ_METHODS)
+    if isinstance(parent, ast.Compare):
+        return True
+    if isinstance(parent, (ast.For, ast.comprehension)) and parent.iter is node:
+        return True
+    if isinstance(parent, ast.Attribute) and parent.attr in _READ_METHODS:
+        return isinstance(parents.get(parent), ast.Call)
+    if isinstance(parent, ast.Call) and node in parent.args:
+        return isinstance(parent.func, ast.Name) and parent.func.id in _READ_CALLS
+    return False
+
+
+class TruthTable:
+    """Saída da strategy para cada entrada do espaço do jogo."""
+
+    __slots__ = ("arity", "_outputs")
+
+    def __init__(self, arity: int, outputs: dict):
+        self.arity = arity
+        self._outputs = outputs
+
+    @staticmethod
+    def key(params: list) -> str:
+        # JSON e não tupla: 1 e True são entradas diferentes para a estratégia
+        return json.dumps(params, separators=(",", ":"))
+
+    def lookup(self, params: list) -> tuple:
+        """(True, saída) se a entrada está na tabela; (False, None) se não está."""
+        try:
+            key = self.key(params)
+        except (TypeError, ValueError):
+            return False, None
+        if key in self._outputs:
+            return True, self._outputs[key]
+        return False, None
+
+    def outputs(self) -> list:
+        """Saídas na ordem das entradas de INPUT_SPACES[arity]."""
+        return list(self._outputs.values())
+
+    def __len__(self) -> int:
+        return len(self._outputs)
+
+
+def table_from_results(arity: int, results: Optional[list]) -> Optional[TruthTable]:
+    """
+    Monta a tabela a partir dos resultados da avaliação (entradas em ordem
+    direta e depois inversa, ver evaluation_inputs). None se algum caso deu
+    erro ou se a segunda passada discordou da primeira.
+    """
+    inputs = INPUT_SPACES[arity][0]
+    if results is None or len(results) != 2 * len(inputs):
+        return None
+    if not all(result.get("valid") for result in results):
+        return None
+    outputs = {}
+    for params, forward, backward in zip(inputs, results, reversed(results[len(inputs):])):
+        if forward.get("output") != backward.get("output"):
+            return None
+        outputs[TruthTable.key(params)] = forward.get("output")
+    return TruthTable(arity, outputs)
+
+
+def evaluation_inputs(arity: int) -> tuple:
+    """Casos de teste da avaliação (ida e volta) e os retornos válidos do jogo."""
+    inputs, valid_returns = INPUT_SPACES[arity]
+    return inputs + inputs[::-1], valid_returns
+
+
+def table_key(code: str) -> str:
+    return hashlib.sha256(f"{HARNESS_VERSION}\n{normalize_code(code)}".encode()).hexdigest()
+
+
+# recebe [(código, aridade), ...] e devolve, na mesma ordem, os resultados do
+# modo run de cada um (None se a avaliação deu timeout); levanta exceção se a
+# sandbox inteira falhou
+Evaluate = Callable[[list], Awaitable[list]]
+
+
+class TruthTableStore:
+    """
+    LRU de tabelas por hash do código (até `max_entries`), incluindo os
+    códigos recusados. Avaliações simultâneas do mesmo código esperam a mesma.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Optional[TruthTable]]" = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._built = 0
+        self._impure = 0
+        self._rejected = 0
+        self._evictions = 0
+
+    async def get_or_build(self, code: str, evaluate: Evaluate) -> Optional[TruthTable]:
+        """Tabela do código, avaliando na sandbox se ainda não existir; None se não for pura."""
+        return (await self.get_or_build_many([code], evaluate))[0]
+
+    async def get_or_build_many(self, codes: list, evaluate: Evaluate) -> list:
+        """
+        Tabelas de vários códigos, na mesma ordem. Os que ainda não têm
+        tabela e passam na análise da AST são avaliados juntos, numa única
+        chamada a `evaluate`.
+        """
+        if self.max_entries <= 0:
+            return [None] * len(codes)
+        keys = [table_key(code) for code in codes]
+        found, waiting, pending = {}, {}, {}
+        with self._lock:
+            for key, code in zip(keys, codes):
+                if key in found or key in waiting or key in pending:
+                    continue
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    found[key] = self._entries[key]
+                elif key in self._inflight:
+                    waiting[key] = self._inflight[key]
+                else:
+                    pending[key] = code
+
+        items = []
+        for key, code in pending.items():
+            arity = pure_arity(code)
+            if arity is None:
+                with self._lock:
+                    self._impure += 1
+                self._put(key, None)
+                found[key] = None
+            else:
+                items.append((key, code, arity))
+
+        if items:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key, _, _ in items}
+            self._inflight.update(futures)
+            tables = {}
+            try:
+                results = await evaluate([(code, arity) for _, code, arity in items])
+                for (key, _, arity), result in zip(items, results):
+                    tables[key] = table_from_results(arity, result)
+            except Exception as e:
+                # falha de infraestrutura não diz nada sobre o código: não guarda e usa o container
+                logger.warning("Falha ao montar tabelas-verdade. codigos=%s erro=%s", len(items), str(e) or type(e).__name__)
+                tables = {key: None for key, _, _ in items}
+            else:
+                for key, table in tables.items():
+                    with self._lock:
+                        if table is None:
+                            self._rejected += 1
+                        else:
+                            self._built += 1
+                    self._put(key, table)
+                logger.info("Tabelas-verdade avaliadas. codigos=%s puras=%s",
+                            len(items), sum(1 for table in tables.values() if table is not None))
+            finally:
+                for key, future in futures.items():
+                    self._inflight.pop(key, None)
+                    future.set_result(tables.get(key))
+            found.update(tables)
+
+        for key, future in waiting.items():
+            found[key] = await asyncio.shield(future)
+        return [found[key] for key in keys]
+
+    def _put(self, key: str, table: Optional[TruthTable]) -> None:
+        with self._lock:
+            self._entries[key] = table
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "tables": sum(1 for table in self._entries.values() if table is not None),
+                "maxEntries": self.max_entries,
+                "hits": self._hits,
+                "built": self._built,
+                "impure": self._impure,
+                "rejected": self._rejected,
+                "evictions": self._evictions,
+            }
+
+
+_store: Optional[TruthTableStore] = None
+_store_lock = threading.Lock()
+
+
+def get_truth_tables() -> TruthTableStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TruthTableStore(TRUTH_TABLE_SIZE)
+        return _store
@@ -0,0 +1,73 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
+
+from wanda_python.games.matchups import MONTE_CARLO, match_rounds
+from wanda_python.runner.config import ANALYTICS_MAX_SAMPLE_ROUNDS
+from wanda_python.schema.tournament_dto import TournamentStrategyDTO
+
+
+class MatchupRequestDTO(BaseModel):
+    gameName: str = Field(..., description="Jogo da análise: JOKENPO ou BITS")
+    functionName: str = Field(..., description="Função do jogo (jokenpo1, jokenpo2 ou bits)")
+    strategies: List[TournamentStrategyDTO] = Field(..., min_length=2, description="Estratégias analisadas, com ids únicos")
+    rounds: Optional[int] = Field(None, ge=1, le=100, description="Rounds de cada partida (o BITS tem no máximo 4)")
+    method: Literal["exact", "montecarlo"] = Field(
+        "exact", description="exact: probabilidades exatas; montecarlo: partidas sorteadas (só Jokenpo)"
+    )
+    samples: int = Field(500, ge=1, le=5000, description="Partidas sorteadas por par no Monte Carlo")
+    seed: Optional[int] = Field(None, description="Semente do Monte Carlo")
+
+    @model_validator(mode="after")
+    def _check_monte_carlo_size(self):
+        # o custo do Monte Carlo cresce com partidas x rounds em cada par
+        size = self.samples * match_rounds(self.gameName, self.rounds)
+        if self.method == MONTE_CARLO and size > ANALYTICS_MAX_SAMPLE_ROUNDS:
+            raise ValueError(f"samples x rounds deve ser no máximo {ANALYTICS_MAX_SAMPLE_ROUNDS}.")
+        return self
+
+
+class MatchupExcludedDTO(BaseModel):
+    id: str
+    reason: str = Field(..., description="NOT_PURE, EVALUATION_FAILED ou WRONG_FUNCTION")
+
+
+class MatchupSummaryDTO(BaseModel):
+    position: int = Field(..., description="Posição pelos pontos esperados, começando em 1")
+    id: str
+    winRate: float = Field(..., description="Média da taxa de vitória contra os outros jogadores")
+    drawRate: float
+    lossRate: float
+    expectedPoints: float = Field(..., description="Pontos esperados por partida: 3 por vitória, 1 por empate")
+
+
+class MatchupResponseDTO(BaseModel):
+    gameName: str
+    functionName: str
+    rulesVersion: Optional[str] = Field(None, description="Versão das regras do jogo usada na análise")
+    method: Optional[str] = None
+    rounds: Optional[int] = Field(None, description="Rounds de cada partida")
+    players: List[str] = Field(default_factory=list, description="Ids das estratégias analisadas, na ordem do pedido")
+    winRate: List[List[float]] = Field(
+        default_factory=list,
+        description="winRate[i][j]: probabilidade de players[i] (jogador 1) vencer players[j]; "
+                    "derrota = 1 - winRate - drawRate"
+    )
+    drawRate: List[List[float]] = Field(default_factory=list, description="drawRate[i][j]: probabilidade de empate")
+    summary: List[MatchupSummaryDTO] = Field(default_factory=list, description="Desempenho médio de cada estratégia")
+    excluded: List[MatchupExcludedDTO] = Field(
+        default_factory=list, description="Estratégias fora da análise (sem tabela-verdade ou de outra função)"
+    )
+    error: Optional[str] = Field(None, description="Tipo do erro: EXECUTION_ERROR ou None")
+    errorDetail: Optional[str] = Field(None, description="Mensagem detalhada do erro")
+
+    @classmethod
+    def failed(cls, game_name: str, function_name: str, rules_version: Optional[str], error: str, detail: str,
+               excluded: list = None):
+        return cls(
+            gameName=game_name,
+            functionName=function_name,
+            rulesVersion=rules_version,
+            excluded=excluded or [],
+            error=error,
+            errorDetail=detail,
+        )
@@ -0,0 +1,86 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+
+class MatchRequestDTO(BaseModel):
+    gameName: str = Field(..., description="Jogo da partida: JOKENPO ou BITS")
+    functionName: str = Field(..., description="Função do jogo (jokenpo1, jokenpo2 ou bits)")
+    player1Function: str = Field(..., description="Código da função do jogador 1")
+    player2Function: str = Field(..., description="Código da função do jogador 2")
+    seed: Optional[int] = Field(None, description="Semente da distribuição de cartas; a mesma seed reproduz a partida")
+    rounds: Optional[int] = Field(None, ge=1, le=100, description="Quantidade de rounds (o BITS tem no máximo 4)")
+
+
+class MatchPlayDTO(BaseModel):
+    parameters: List[Any] = Field(..., description="Parâmetros passados para a função do jogador")
+    output: Optional[Any] = Field(None, description="Retorno da função do jogador")
+    card: str = Field(..., description="Carta efetivamente jogada")
+    fallback: Optional[str] = Field(None, description="NEXT_AVAILABLE_CARD quando o retorno não era uma carta da mão")
+    error: Optional[str] = Field(None, description="Erro lançado pela função do jogador no round")
+
+    @classmethod
+    def create(cls, play: dict):
+        return cls(
+            parameters=play["params"],
+            output=play.get("output"),
+            card=play["card"],
+            fallback=play.get("fallback"),
+            error=play.get("error"),
+        )
+
+
+class MatchRoundDTO(BaseModel):
+    round: int = Field(..., description="Número do round, começando em 1")
+    player1: MatchPlayDTO
+    player2: MatchPlayDTO
+    winner: Optional[str] = Field(None, description="PLAYER1, PLAYER2 ou None em caso de empate")
+
+
+class MatchResponseDTO(BaseModel):
+    gameName: str
+    functionName: str
+    rulesVersion: Optional[str] = Field(None, description="Versão das regras do jogo usada na partida")
+    seed: Optional[int] = Field(None, description="Semente usada na partida")
+    rounds: List[MatchRoundDTO] = Field(default_factory=list, description="Log dos rounds, em ordem")
+    player1Score: int = 0
+    player2Score: int = 0
+    draws: int = 0
+    winner: Optional[str] = Field(None, description="PLAYER1, PLAYER2 ou None em caso de empate")
+    error: Optional[str] = Field(None, description="Tipo do erro: TIMEOUT, EXECUTION_ERROR ou None")
+    errorDetail: Optional[str] = Field(None, description="Mensagem detalhada do erro")
+
+    @classmethod
+    def create(cls, game_name: str, function_name: str, rules_version: str, match: dict):
+        return cls(
+            gameName=game_name,
+            functionName=function_name,
+            rulesVersion=rules_version,
+            seed=match["seed"],
+            rounds=[
+                MatchRoundDTO(
+                    round=r["round"],
+                    player1=MatchPlayDTO.create(r["p1"]),
+                    player2=MatchPlayDTO.create(r["p2"]),
+                    winner=_winner_label(r["winner"]),
+                )
+                for r in match["rounds"]
+            ],
+            player1Score=match["score"]["p1"],
+            player2Score=match["score"]["p2"],
+            draws=match["score"]["draws"],
+            winner=_winner_label(match["winner"]),
+        )
+
+    @classmethod
+    def failed(cls, game_name: str, function_name: str, rules_version: Optional[str], error: str, detail: str):
+        return cls(
+            gameName=game_name,
+            functionName=function_name,
+            rulesVersion=rules_version,
+            error=error,
+            errorDetail=detail,
+        )
+
+
+def _winner_label(winner: Optional[str]) -> Optional[str]:
+    return {"p1": "PLAYER1", "p2": "PLAYER2"}.get(winner)
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from typing import Any, List, Optional
 
+from wanda_python.runner.config import SESSION_BATCH_MAX_ROUNDS
+
 
 class SessionCreateRequestDTO(BaseModel):
     player1Function: str = Field(..., description="Código da função do jogador 1")
@@ -36,4 +38,23 @@ class SessionExecuteResponseDTO(BaseModel):
             player2Choice=p2 if isinstance(p2, str) else None,
             error=result.get("error"),
             errorDetail=result.get("errorDetail"),
-        )
\ No newline at end of file
+        )
+
+
+class SessionRoundParametersDTO(BaseModel):
+    player1Parameters: List[Any] = Field(..., description="Parâmetros para a função do jogador 1")
+    player2Parameters: List[Any] = Field(..., description="Parâmetros para a função do jogador 2")
+
+
+class SessionExecuteBatchRequestDTO(BaseModel):
+    rounds: List[SessionRoundParametersDTO] = Field(
+        ..., max_length=SESSION_BATCH_MAX_ROUNDS, description="Parâmetros de cada round, em ordem"
+    )
+
+
+class SessionExecuteBatchResponseDTO(BaseModel):
+    results: List[SessionExecuteResponseDTO] = Field(..., description="Resultado de cada round, na mesma ordem")
+
+    @classmethod
+    def create(cls, results: List[dict]):
+        return cls(results=[SessionExecuteResponseDTO.create(r) for r in results])
@@ -0,0 +1,67 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class TournamentStrategyDTO(BaseModel):
+    id: str = Field(..., description="Identificador da estratégia no resultado (ex.: id do aluno ou da submissão)")
+    code: str = Field(..., description="Código da função da estratégia")
+
+
+class TournamentRequestDTO(BaseModel):
+    gameName: str = Field(..., description="Jogo do torneio: JOKENPO ou BITS")
+    functionName: str = Field(..., description="Função do jogo (jokenpo1, jokenpo2 ou bits)")
+    strategies: List[TournamentStrategyDTO] = Field(..., min_length=2, description="Estratégias participantes, com ids únicos")
+    seed: Optional[int] = Field(None, description="Semente do torneio; a mesma seed reproduz todas as partidas")
+    rounds: Optional[int] = Field(None, ge=1, le=100, description="Rounds de cada partida (o BITS tem no máximo 4)")
+
+
+class TournamentMatchDTO(BaseModel):
+    player1: str = Field(..., description="Id da estratégia que jogou como jogador 1")
+    player2: str = Field(..., description="Id da estratégia que jogou como jogador 2")
+    seed: int = Field(..., description="Semente da partida; reproduz a partida em POST /api/match")
+    player1Score: int = 0
+    player2Score: int = 0
+    draws: int = 0
+    winner: Optional[str] = Field(None, description="PLAYER1, PLAYER2 ou None em caso de empate ou sem resultado")
+    forfeit: Optional[str] = Field(None, description="PLAYER1, PLAYER2 ou BOTH quando a estratégia não carregou (W.O.)")
+    error: Optional[str] = Field(None, description="Tipo do erro: TIMEOUT, EXECUTION_ERROR ou None")
+    errorDetail: Optional[str] = Field(None, description="Mensagem detalhada do erro")
+
+
+class TournamentStandingDTO(BaseModel):
+    position: int = Field(..., description="Posição na classificação, começando em 1")
+    id: str
+    points: int = Field(..., description="Pontos: 3 por vitória, 1 por empate")
+    played: int = Field(..., description="Partidas com resultado (inclui W.O.)")
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    roundsWon: int = 0
+    roundsLost: int = 0
+
+
+class TournamentResponseDTO(BaseModel):
+    gameName: str
+    functionName: str
+    rulesVersion: Optional[str] = Field(None, description="Versão das regras do jogo usada no torneio")
+    seed: Optional[int] = Field(None, description="Semente usada no torneio")
+    players: List[str] = Field(default_factory=list, description="Ids das estratégias, na ordem do pedido")
+    matrix: List[List[Optional[str]]] = Field(
+        default_factory=list,
+        description="matrix[i][j]: resultado de players[i] contra players[j] — WIN, DRAW, LOSS ou None "
+                    "(diagonal e partidas sem resultado)"
+    )
+    matches: List[TournamentMatchDTO] = Field(default_factory=list, description="Uma partida por par de estratégias")
+    standings: List[TournamentStandingDTO] = Field(default_factory=list, description="Classificação final")
+    error: Optional[str] = Field(None, description="Tipo do erro: EXECUTION_ERROR ou None")
+    errorDetail: Optional[str] = Field(None, description="Mensagem detalhada do erro")
+
+    @classmethod
+    def failed(cls, game_name: str, function_name: str, rules_version: Optional[str], error: str, detail: str):
+        return cls(
+            gameName=game_name,
+            functionName=function_name,
+            rulesVersion=rules_version,
+            error=error,
+            errorDetail=detail,
+        )
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Literal
+from typing import List, Literal
+
+from wanda_python.runner.config import VALIDATE_BATCH_MAX_CODES
 
 # DTO que vai ser recebido na requisição. O próprio BaseModel faz a validação e atribuição
 class ValidateRequest(BaseModel):
@@ -16,4 +18,18 @@ class ValidateResponse(BaseModel):
     # Método de classe para facilitar a criação da instância
     @classmethod
     def create(cls, valid: bool, answer: str, thought: str):
-        return cls(valid=valid, answer=answer, thought=thought)
\ No newline at end of file
+        return cls(valid=valid, answer=answer, thought=thought)
+
+# DTO da validação em lote (revalidar uma turma inteira num único sandbox)
+class ValidateBatchRequest(BaseModel):
+    codes: List[str] = Field(..., max_length=VALIDATE_BATCH_MAX_CODES, description="Funções enviadas pelos alunos")
+    assistantStyle: str = Field(..., description="estilo do agente")
+    functionName: str = Field(..., description="qual função está sendo analisada")
+    gameName: Literal["JOKENPO", "BITS"]
+
+class ValidateBatchResponse(BaseModel):
+    results: List[ValidateResponse] # um resultado por código, na mesma ordem
+
+    @classmethod
+    def create(cls, results: List[ValidateResponse]):
+        return cls(results=results)
@@ -0,0 +1,109 @@
+from wanda_python.schema.analytics_dto import (MatchupRequestDTO, MatchupResponseDTO, MatchupExcludedDTO,
+                                               MatchupSummaryDTO)
+from wanda_python.games.registry import REGISTRY
+from wanda_python.games.matchups import FUNCTION_ARITY, match_rounds, matchup_rates, strategy_cards
+from wanda_python.runner.config import ANALYTICS_MAX_STRATEGIES
+from wanda_python.runner.container_runner import truth_tables
+from wanda_python.runner.truth_table import INPUT_SPACES, pure_arity
+import numpy as np
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsService:
+
+    async def matchups(self, data: MatchupRequestDTO) -> MatchupResponseDTO:
+        """
+        Taxas de vitória/empate/derrota de todos os pares de estratégias,
+        calculadas a partir das tabelas-verdade (sem jogar as partidas).
+        Estratégias que não são puras ficam de fora, em `excluded`.
+        """
+        spec = REGISTRY.get(data.gameName)
+        if spec is None or data.functionName not in spec.functions:
+            logger.error('Analise com jogo ou funcao invalida. game=%s function=%s', data.gameName, data.functionName)
+            return MatchupResponseDTO.failed(
+                data.gameName, data.functionName, None, "EXECUTION_ERROR",
+                f"Função '{data.functionName}' não é válida para {data.gameName}"
+            )
+        ids = [strategy.id for strategy in data.strategies]
+        if len(set(ids)) != len(ids):
+            return MatchupResponseDTO.failed(
+                data.gameName, data.functionName, spec.rulesVersion, "EXECUTION_ERROR",
+                "Os ids das estratégias devem ser únicos."
+            )
+        if len(ids) > ANALYTICS_MAX_STRATEGIES:
+            return MatchupResponseDTO.failed(
+                data.gameName, data.functionName, spec.rulesVersion, "EXECUTION_ERROR",
+                f"A análise aceita no máximo {ANALYTICS_MAX_STRATEGIES} estratégias."
+            )
+
+        started = time.monotonic()
+        codes = [strategy.code for strategy in data.strategies]
+        tables = await truth_tables(codes)
+        arity = FUNCTION_ARITY[data.functionName]
+        inputs = INPUT_SPACES[arity][0]
+        players, rows, excluded = [], [], []
+        for strategy_id, code, table in zip(ids, codes, tables):
+            if table is None:
+                reason = "NOT_PURE" if pure_arity(code) is None else "EVALUATION_FAILED"
+            elif table.arity != arity:
+                reason = "WRONG_FUNCTION"
+            else:
+                players.append(strategy_id)
+                rows.append(strategy_cards(data.functionName, table.outputs(), inputs))
+                continue
+            excluded.append(MatchupExcludedDTO(id=strategy_id, reason=reason))
+        tables_ms = (time.monotonic() - started) * 1000
+
+        if len(players) < 2:
+            logger.warning('Analise sem estrategias suficientes. game=%s function=%s excluidas=%s',
+                           data.gameName, data.functionName, len(excluded))
+            return MatchupResponseDTO.failed(
+                data.gameName, data.functionName, spec.rulesVersion, "EXECUTION_ERROR",
+                "A análise precisa de pelo menos 2 estratégias puras da função.", excluded
+            )
+
+        # o Monte Carlo só existe para o Jokenpo: o BITS não tem sorteio
+        method = data.method if data.gameName == "JOKENPO" else "exact"
+        rounds = match_rounds(data.gameName, data.rounds)
+        # a conta é só CPU (NumPy): roda numa thread para não travar o event loop
+        wins, draws, losses = await asyncio.to_thread(
+            matchup_rates, data.gameName, data.functionName, np.stack(rows), rounds=rounds, method=method,
+            samples=data.samples, seed=data.seed
+        )
+        logger.info('Analise concluida. game=%s function=%s metodo=%s estrategias=%s excluidas=%s '
+                    'tabelas_ms=%.1f calculo_ms=%.1f', data.gameName, data.functionName, method, len(players),
+                    len(excluded), tables_ms, (time.monotonic() - started) * 1000 - tables_ms)
+        return MatchupResponseDTO(
+            gameName=data.gameName,
+            functionName=data.functionName,
+            rulesVersion=spec.rulesVersion,
+            method=method,
+            rounds=rounds,
+            players=players,
+            winRate=np.round(wins, 4).tolist(),
+            drawRate=np.round(draws, 4).tolist(),
+            summary=_summary(players, wins, draws, losses),
+            excluded=excluded,
+        )
+
+
+def _summary(players: list, wins: np.ndarray, draws: np.ndarray, losses: np.ndarray) -> list:
+    # média contra os outros jogadores, fora a diagonal, jogando de jogador 1 e de jogador 2
+    count = len(players)
+    others = ~np.eye(count, dtype=bool)
+    win = (np.where(others, wins, 0).sum(axis=1) + np.where(others, losses, 0).sum(axis=0)) / (2 * (count - 1))
+    draw = (np.where(others, draws, 0).sum(axis=1) + np.where(others, draws, 0).sum(axis=0)) / (2 * (count - 1))
+    loss = 1 - win - draw
+    points = 3 * win + draw
+    ranked = sorted(range(count), key=lambda i: (-points[i], -win[i]))
+    return [
+        MatchupSummaryDTO(
+            position=position, id=players[i], winRate=round(float(win[i]), 4), drawRate=round(float(draw[i]), 4),
+            lossRate=round(float(loss[i]), 4), expectedPoints=round(float(points[i]), 4),
+        )
+        for position, i in enumerate(ranked, start=1)
+    ]
@@ -0,0 +1,43 @@
+from wanda_python.schema.match_dto import MatchRequestDTO, MatchResponseDTO
+from wanda_python.games.registry import REGISTRY
+from wanda_python.runner.container_runner import run_match_async
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MatchService:
+
+    async def play_match(self, data: MatchRequestDTO) -> MatchResponseDTO:
+        """
+        Joga a partida inteira entre os dois jogadores em uma única sandbox
+        e retorna o log de rounds e o placar.
+        """
+        spec = REGISTRY.get(data.gameName)
+        if spec is None or data.functionName not in spec.functions:
+            logger.error('Partida com jogo ou funcao invalida. game=%s function=%s', data.gameName, data.functionName)
+            return MatchResponseDTO.failed(
+                data.gameName, data.functionName, None, "EXECUTION_ERROR",
+                f"Função '{data.functionName}' não é válida para {data.gameName}"
+            )
+
+        logger.info('Partida iniciada. game=%s function=%s seed=%s', data.gameName, data.functionName, data.seed)
+        result = await run_match_async(
+            data.gameName, data.functionName, data.player1Function, data.player2Function,
+            seed=data.seed, rounds=data.rounds
+        )
+
+        if result["timed_out"]:
+            logger.error('Timeout na partida. game=%s function=%s', data.gameName, data.functionName)
+            return MatchResponseDTO.failed(
+                data.gameName, data.functionName, spec.rulesVersion, "TIMEOUT", "Tempo limite da partida atingido."
+            )
+        if not result["ok"]:
+            logger.error('Erro na partida. game=%s function=%s erro=%s', data.gameName, data.functionName, result["stderr"])
+            return MatchResponseDTO.failed(
+                data.gameName, data.functionName, spec.rulesVersion, "EXECUTION_ERROR", result["stderr"]
+            )
+
+        match = result["match"]
+        logger.info('Partida concluida. game=%s seed=%s placar=%s', data.gameName, match["seed"], match["score"])
+        return MatchResponseDTO.create(data.gameName, data.functionName, spec.rulesVersion, match)
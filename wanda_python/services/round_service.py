@@ -1,6 +1,7 @@
 from wanda_python.schema.round_dto import RoundRequestDTO, RoundResponseDTO
 from wanda_python.runner.container_runner import (create_session as runner_create_session,
-    execute_round as runner_execute_round, close_session as runner_close_session)
+    execute_round as runner_execute_round, execute_rounds as runner_execute_rounds,
+    close_session as runner_close_session, truth_table)
 from typing import List, Optional, Any
 import logging
 
@@ -22,12 +23,12 @@ class RoundService:
         try:
             logger.info('Round iniciado')
             # executar dinamicamente a função do jogador 1
-            player1_choice = await self.execute_player_function(
+            player1_choice = await self.player_choice(
                 data.player1Function, data.player1Parameters
             )
 
             # executar dinamicamente a função do jogador 2
-            player2_choice = await self.execute_player_function(
+            player2_choice = await self.player_choice(
                 data.player2Function, data.player2Parameters
             )
             logger.info('Round concluido. player1=%s player2=%s', player1_choice, player2_choice)
@@ -38,6 +39,15 @@ class RoundService:
             logger.error('Erro no round. erro=%s', str(err), exc_info=True)
             return RoundResponseDTO.create(player1_choice=None, player2_choice=None)
     
+    async def player_choice(self, function_code: str, parameters: List[Any]) -> str:
+        # estratégia pura responde pela tabela-verdade; o resto executa a função
+        table = await truth_table(function_code)
+        if table is not None:
+            found, choice = table.lookup(parameters)
+            if found:
+                return choice
+        return await self.execute_player_function(function_code, parameters)
+
     async def execute_player_function(self, function_code: str, parameters: List[Any]) -> str:
         try:
             # Criar um ambiente local para execução segura
@@ -64,6 +74,10 @@ class RoundService:
         result = await runner_execute_round(session_id, params_p1, params_p2, timeout)
         return result
 
+    async def execute_rounds(self, session_id: str, rounds: list, timeout: int = 5) -> list:
+        logger.info('Executando rounds em lote. session_id=%s total=%s', session_id, len(rounds))
+        return await runner_execute_rounds(session_id, rounds, timeout)
+
     async def close_session(self, session_id: str) -> None:
         logger.info('Encerrando sessao. session_id=%s', session_id)
         await runner_close_session(session_id)
\ No newline at end of file
@@ -0,0 +1,129 @@
+from wanda_python.schema.tournament_dto import (TournamentRequestDTO, TournamentResponseDTO, TournamentMatchDTO,
+                                                TournamentStandingDTO)
+from wanda_python.games.registry import REGISTRY
+from wanda_python.runner.config import TOURNAMENT_MAX_STRATEGIES
+from wanda_python.runner.container_runner import run_tournament_async
+import logging
+
+logger = logging.getLogger(__name__)
+
+WIN, DRAW, LOSS = "WIN", "DRAW", "LOSS"
+POINTS = {WIN: 3, DRAW: 1, LOSS: 0}
+_PLAYER_LABELS = {"p1": "PLAYER1", "p2": "PLAYER2"}
+
+
+class TournamentService:
+
+    async def play_tournament(self, data: TournamentRequestDTO) -> TournamentResponseDTO:
+        """
+        Joga um torneio todos contra todos entre as estratégias, com as partidas
+        divididas em poucas sandboxes, e retorna as partidas, a matriz de
+        resultados e a classificação.
+        """
+        spec = REGISTRY.get(data.gameName)
+        if spec is None or data.functionName not in spec.functions:
+            logger.error('Torneio com jogo ou funcao invalida. game=%s function=%s', data.gameName, data.functionName)
+            return TournamentResponseDTO.failed(
+                data.gameName, data.functionName, None, "EXECUTION_ERROR",
+                f"Função '{data.functionName}' não é válida para {data.gameName}"
+            )
+        players = [strategy.id for strategy in data.strategies]
+        if len(set(players)) != len(players):
+            return TournamentResponseDTO.failed(
+                data.gameName, data.functionName, spec.rulesVersion, "EXECUTION_ERROR",
+                "Os ids das estratégias devem ser únicos."
+            )
+        if len(players) > TOURNAMENT_MAX_STRATEGIES:
+            return TournamentResponseDTO.failed(
+                data.gameName, data.functionName, spec.rulesVersion, "EXECUTION_ERROR",
+                f"O torneio aceita no máximo {TOURNAMENT_MAX_STRATEGIES} estratégias."
+            )
+
+        logger.info('Torneio iniciado. game=%s function=%s estrategias=%s seed=%s',
+                    data.gameName, data.functionName, len(players), data.seed)
+        tournament = await run_tournament_async(
+            data.gameName, data.functionName, [strategy.code for strategy in data.strategies],
+            seed=data.seed, rounds=data.rounds
+        )
+
+        matches = [_match_dto(players, match) for match in tournament["matches"]]
+        matrix = [[None] * len(players) for _ in players]
+        for match in tournament["matches"]:
+            outcome_p1, outcome_p2 = _outcomes(match)
+            matrix[match["p1"]][match["p2"]] = outcome_p1
+            matrix[match["p2"]][match["p1"]] = outcome_p2
+        failed = sum(1 for match in matches if match.error is not None and match.forfeit is None)
+        if failed:
+            logger.error('Partidas do torneio sem resultado. game=%s seed=%s partidas=%s',
+                         data.gameName, tournament["seed"], failed)
+
+        standings = _standings(players, tournament["matches"], matrix)
+        logger.info('Torneio concluido. game=%s seed=%s partidas=%s lider=%s',
+                    data.gameName, tournament["seed"], len(matches), standings[0].id)
+        return TournamentResponseDTO(
+            gameName=data.gameName,
+            functionName=data.functionName,
+            rulesVersion=spec.rulesVersion,
+            seed=tournament["seed"],
+            players=players,
+            matrix=matrix,
+            matches=matches,
+            standings=standings,
+        )
+
+
+def _outcomes(match: dict) -> tuple:
+    """Resultado da partida para p1 e para p2 (None se a partida ficou sem resultado)."""
+    forfeit = match.get("forfeit")
+    if forfeit:
+        return (LOSS if "p1" in forfeit else WIN), (LOSS if "p2" in forfeit else WIN)
+    if match.get("error"):
+        return None, None
+    return {"p1": (WIN, LOSS), "p2": (LOSS, WIN)}.get(match["winner"], (DRAW, DRAW))
+
+
+def _match_dto(players: list, match: dict) -> TournamentMatchDTO:
+    score = match.get("score", {})
+    forfeit = match.get("forfeit")
+    if match.get("timedOut"):
+        error = "TIMEOUT"
+    elif match.get("error"):
+        error = "EXECUTION_ERROR"
+    else:
+        error = None
+    return TournamentMatchDTO(
+        player1=players[match["p1"]],
+        player2=players[match["p2"]],
+        seed=match["seed"],
+        player1Score=score.get("p1", 0),
+        player2Score=score.get("p2", 0),
+        draws=score.get("draws", 0),
+        winner=_PLAYER_LABELS.get(match.get("winner")),
+        forfeit=("BOTH" if len(forfeit) == 2 else _PLAYER_LABELS[forfeit[0]]) if forfeit else None,
+        error=error,
+        errorDetail=match.get("error"),
+    )
+
+
+def _standings(players: list, matches: list, matrix: list) -> list:
+    rows = [{"id": player, "points": 0, "played": 0, "wins": 0, "draws": 0, "losses": 0, "roundsWon": 0, "roundsLost": 0}
+            for player in players]
+    for i, row in enumerate(rows):
+        for outcome in matrix[i]:
+            if outcome is None:
+                continue
+            row["played"] += 1
+            row["points"] += POINTS[outcome]
+            row[{WIN: "wins", DRAW: "draws", LOSS: "losses"}[outcome]] += 1
+    for match in matches:
+        score = match.get("score")
+        if score:
+            rows[match["p1"]]["roundsWon"] += score["p1"]
+            rows[match["p1"]]["roundsLost"] += score["p2"]
+            rows[match["p2"]]["roundsWon"] += score["p2"]
+            rows[match["p2"]]["roundsLost"] += score["p1"]
+
+    # desempate: vitórias, saldo de rounds, rounds ganhos e, por fim, a ordem do pedido
+    ranked = sorted(rows, key=lambda row: (-row["points"], -row["wins"], row["roundsLost"] - row["roundsWon"],
+                                           -row["roundsWon"]))
+    return [TournamentStandingDTO(position=position, **row) for position, row in enumerate(ranked, start=1)]
@@ -1,4 +1,5 @@
-from wanda_python.schema.validate_dto import ValidateRequest, ValidateResponse
+from wanda_python.schema.validate_dto import (ValidateRequest, ValidateResponse, ValidateBatchRequest,
+    ValidateBatchResponse)
 from dotenv import load_dotenv
 from wanda_python.validators.syntax_validator import SyntaxValidator
 from wanda_python.validators.signature_validator import SignatureValidator
@@ -6,6 +7,7 @@ from wanda_python.validators.malicious_checker import MaliciousChecker
 from wanda_python.validators.execution_validator import ExecutionValidator
 from wanda_python.validators.semantics_validator import SemanticsValidator
 from ..games.router import resolve_pipeline
+from ..llm.cache import feedback_scope
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,9 +30,11 @@ class ValidateService:
 
     async def validate(self, data: ValidateRequest) -> ValidateResponse:
         logger.info('Validacao iniciada. game=%s function=%s', data.gameName, data.functionName)
+        # jogo e função entram na chave do cache de feedbacks da OpenAI
+        feedback_scope(data.gameName, data.functionName)
         code = data.code  # Pega a função
         # 1 Validação: Sintaxe e indentação
-        response_validate = self.syntax_validator.validate(code, data.assistantStyle, self.openai_api_key)
+        response_validate = await self.syntax_validator.validate(code, data.assistantStyle, self.openai_api_key)
         if response_validate:
             logger.info('Validacao reprovada na sintaxe. game=%s function=%s', data.gameName, data.functionName)
             thought = response_validate["pensamento"]
@@ -68,12 +72,53 @@ class ValidateService:
         # Passou em todas as validações
         logger.info('Validacao aprovada. game=%s function=%s', data.gameName, data.functionName)
         return ValidateResponse.create(valid=True, answer="aceita", thought="")
+    async def validate_batch(self, data: ValidateBatchRequest) -> ValidateBatchResponse:
+        """
+        Valida várias submissões de uma vez (ex.: revalidar a turma depois de
+        uma mudança de regra). Sintaxe e comandos maliciosos são checados aqui,
+        sem OpenAI; o restante vai para a pipeline, que executa todas as
+        submissões aprovadas num único sandbox.
+        """
+        logger.info('Validacao em lote iniciada. game=%s function=%s total=%s', data.gameName, data.functionName, len(data.codes))
+        results = [None] * len(data.codes)
+        pending = []
+        for i, code in enumerate(data.codes):
+            try:
+                tree = ast.parse(code)
+            except SyntaxError as err:
+                results[i] = ValidateResponse.create(valid=False, answer=f"Erro de sintaxe: {err}", thought="")
+                continue
+            malicious_errors = self.malicious_checker.validate(tree)
+            if malicious_errors:
+                results[i] = ValidateResponse.create(valid=False, answer=malicious_errors, thought="")
+                continue
+            pending.append(i)
+
+        _, pipeline = resolve_pipeline(data.gameName, data.functionName)
+        outs = await pipeline.validate_batch(
+            codes=[data.codes[i] for i in pending],
+            assistant_style=data.assistantStyle,
+            function_name=data.functionName
+        )
+        for i, out in zip(pending, outs):
+            results[i] = ValidateResponse.create(
+                valid=bool(out.get("valid", False)),
+                answer=str(out.get("answer", "")),
+                thought=str(out.get("thought", ""))
+            )
+
+        logger.info('Validacao em lote concluida. game=%s function=%s aprovados=%s',
+                    data.gameName, data.functionName, sum(1 for r in results if r.valid))
+        return ValidateBatchResponse.create(results)
+
     # service -> Feedback
     async def feedback(self, data: ValidateRequest) -> ValidateResponse:
         logger.info('Feedback iniciado. game=%s function=%s style=%s', data.gameName, data.functionName, data.assistantStyle)
+        # jogo e função entram na chave do cache de feedbacks da OpenAI
+        feedback_scope(data.gameName, data.functionName)
         code = data.code # Pega a função
         # 1 Validação: Sintaxe e indentação
-        response_validate = self.syntax_validator.validate(code, data.assistantStyle, self.openai_api_key)
+        response_validate = await self.syntax_validator.validate(code, data.assistantStyle, self.openai_api_key)
         if response_validate:
             logger.info('Feedback: reprovado na sintaxe. game=%s function=%s', data.gameName, data.functionName)
             thought = response_validate["pensamento"]
@@ -96,7 +141,7 @@ class ValidateService:
 
         # Caso passe em todas as validações, faz uma validação da semântica
         """
-        semantic_feedback = self.semantics_validator.validator(code, tree, data.assistantStyle, self.openai_api_key, data.functionName)
+        semantic_feedback = await self.semantics_validator.validator(code, tree, data.assistantStyle, self.openai_api_key, data.functionName)
         thought = semantic_feedback["pensamento"]
         answer = semantic_feedback["resposta"]
         """
@@ -119,10 +164,12 @@ class ValidateService:
     # Run 
     async def run(self, data: ValidateRequest) -> ValidateResponse:
         logger.info('Run iniciado. game=%s function=%s', data.gameName, data.functionName)
+        # jogo e função entram na chave do cache de feedbacks da OpenAI
+        feedback_scope(data.gameName, data.functionName)
         code = data.code
 
         # 1) Sintaxe
-        response_validate = self.syntax_validator.validate(code, data.assistantStyle, self.openai_api_key)
+        response_validate = await self.syntax_validator.validate(code, data.assistantStyle, self.openai_api_key)
         if response_validate:
             logger.warning('Run: erro de sintaxe no parse AST. game=%s function=%s', data.gameName, data.functionName)
             return ValidateResponse.create(
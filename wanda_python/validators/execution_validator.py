@@ -1,64 +1,29 @@
-import openai
-import json
-from openai import OpenAIError
 import logging
-from opentelemetry import trace
 
-logger = logging.getLogger(__name__)
-tracer = trace.get_tracer(__name__)
-
-def ask_openai(prompt: str, api_key: str) -> dict:
-    with tracer.start_as_current_span("openai.chat") as span:
-        span.set_attribute("openai.model", "gpt-4o-mini")
-        span.set_attribute("openai.prompt_length", len(prompt))
-
-        client = openai.OpenAI(api_key=api_key)
+from ..llm.cache import feedback_key
+from ..llm.gateway import ask_openai
 
-        system_msg = {
-            "role": "system",
-            "content": (
-                'Responda EXCLUSIVAMENTE com um objeto JSON contendo '
-                'as chaves "pensamento" e "resposta". Nada fora das chaves.'
-            )
-        }
-
-        try:
-            answer = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[system_msg, {"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                max_tokens=600,
-            )
-
-            span.set_attribute("openai.tokens_total", answer.usage.total_tokens)
-            span.set_attribute("openai.tokens_prompt", answer.usage.prompt_tokens)
-            span.set_attribute("openai.tokens_completion", answer.usage.completion_tokens)
-
-            return json.loads(answer.choices[0].message.content)
-
-        except OpenAIError as e:
-            span.record_exception(e)
-            span.set_status(trace.StatusCode.ERROR)
-            logger.error("Erro na chamada OpenAI", exc_info=True)
-            return {"pensamento": "", "resposta": ""}
+logger = logging.getLogger(__name__)
 
+# versão dos prompts deste arquivo: mudou um prompt, sobe a versão (invalida o cache de feedbacks)
+PROMPTS_VERSION = "1"
 
 class ExecutionValidator:
 
-    def feedback_tests(self, code: str, assistantStyle: str, function_type: str, openai_api_key: str) -> dict:
+    async def feedback_tests(self, code: str, assistantStyle: str, function_type: str, openai_api_key: str) -> dict:
         """
         com base no type da função (jokenpo1 ou jokenpo2).
         """
         if function_type == "jokenpo1":
-            return self.feedback_tests_jokenpo1(code, assistantStyle, openai_api_key)
+            return await self.feedback_tests_jokenpo1(code, assistantStyle, openai_api_key)
         elif function_type == "jokenpo2":
-            return self.feedback_tests_jokenpo2(code, assistantStyle, openai_api_key)
+            return await self.feedback_tests_jokenpo2(code, assistantStyle, openai_api_key)
         else:
             raise ValueError("Tipo de função desconhecido. Use 'jokenpo1' ou 'jokenpo2'.")
     
 
 
-    def feedback_tests_jokenpo1(self, code: str, assistantStyle: str, openai_api_key: str) -> dict:
+    async def feedback_tests_jokenpo1(self, code: str, assistantStyle: str, openai_api_key: str) -> dict:
         test_inputs = [
             ("pedra", "pedra", "papel"),
             ("pedra", "papel", "tesoura"),
@@ -87,14 +52,14 @@ class ExecutionValidator:
                     "gameValid": game_valid,
                 })
             except Exception as err:
-                llm_answer = self.error_execution(code, err, openai_api_key, assistantStyle)
+                llm_answer = await self.error_execution(code, err, openai_api_key, assistantStyle)
                 return llm_answer
 
-        tests_feedback = self.feedback_outputs_tests_jokenpo(results, openai_api_key, assistantStyle)
+        tests_feedback = await self.feedback_outputs_tests_jokenpo(results, openai_api_key, assistantStyle)
         return tests_feedback
 
 
-    def feedback_tests_jokenpo2(self, code: str, assistantStyle: str, openai_api_key: str) -> dict:
+    async def feedback_tests_jokenpo2(self, code: str, assistantStyle: str, openai_api_key: str) -> dict:
         # Test inputs para jokenpo2: 4 parâmetros
         test_inputs = [
             ("pedra", "papel", "tesoura", "pedra"),
@@ -135,15 +100,15 @@ class ExecutionValidator:
                         )
                     })
             except Exception as err:
-                llm_answer = self.error_execution(code, err, openai_api_key)
+                llm_answer = await self.error_execution(code, err, openai_api_key)
                 return llm_answer
         
-        tests_feedback = self.feedback_outputs_tests_jokenpo(results, openai_api_key, assistantStyle)
+        tests_feedback = await self.feedback_outputs_tests_jokenpo(results, openai_api_key, assistantStyle)
         return tests_feedback
     
 
 
-    def feedback_outputs_tests_jokenpo(self, results, openai_api_key: str, assistantStyle: str) -> dict:
+    async def feedback_outputs_tests_jokenpo(self, results, openai_api_key: str, assistantStyle: str) -> dict:
         # pré-processa a tabela
         linhas = []
         for i, r in enumerate(results, 1):
@@ -298,25 +263,26 @@ sempre gere como saída um JSON no formato abaixo:
     "resposta": String
 }}
 """
-        answer = ask_openai(prompt, openai_api_key)
+        cache_key = feedback_key("execution.tests_jokenpo", PROMPTS_VERSION, assistantStyle, code=None, context=results)
+        answer = await ask_openai(prompt, openai_api_key, cache_key=cache_key)
         return answer
 
 
-    def validator(self, code: str, assistantStyle: str, function_type: str, openai_api_key: str) -> dict:
+    async def validator(self, code: str, assistantStyle: str, function_type: str, openai_api_key: str) -> dict:
         local_env = {}
         exec(code, {}, local_env)
         strategy_function = local_env["strategy"]
         if function_type == "jokenpo1":
-            results = self.run_outputs_tests_jokenpo1(code, strategy_function, openai_api_key, assistantStyle)
+            results = await self.run_outputs_tests_jokenpo1(code, strategy_function, openai_api_key, assistantStyle)
         elif function_type == "jokenpo2":
-            results = self.run_outputs_tests_jokenpo2(code, strategy_function, openai_api_key, assistantStyle)
+            results = await self.run_outputs_tests_jokenpo2(code, strategy_function, openai_api_key, assistantStyle)
         else:
             results = "Tipo de função inválido."
         return results
     
 
 
-    def run_outputs_tests_jokenpo1(self, code: str, strategy_function: callable, openai_api_key: str, assistantStyle: str) -> dict:
+    async def run_outputs_tests_jokenpo1(self, code: str, strategy_function: callable, openai_api_key: str, assistantStyle: str) -> dict:
         test_inputs = [
             ("pedra", "pedra", "papel"),
             ("pedra", "papel", "tesoura"),
@@ -339,13 +305,13 @@ sempre gere como saída um JSON no formato abaixo:
             try:
                 output = strategy_function(*test_case)
             except Exception as err:
-                llm_answer = self.error_execution(code, err, openai_api_key, assistantStyle)
+                llm_answer = await self.error_execution(code, err, openai_api_key, assistantStyle)
                 return llm_answer
         return ""
     
 
     
-    def run_outputs_tests_jokenpo2(self, code: str, strategy_function: callable, openai_api_key: str, assistantStyle: str) -> dict:
+    async def run_outputs_tests_jokenpo2(self, code: str, strategy_function: callable, openai_api_key: str, assistantStyle: str) -> dict:
         """
         Implementação placeholder para testes do tipo jokenpo2.
         """
@@ -372,11 +338,11 @@ sempre gere como saída um JSON no formato abaixo:
             try:
                 output = strategy_function(*test_case)
             except Exception as err:
-                llm_answer = self.error_execution(code, err, openai_api_key, assistantStyle)
+                llm_answer = await self.error_execution(code, err, openai_api_key, assistantStyle)
                 return llm_answer
         return ""
     
-    def feedback_tests_bits(self, code: str, assistantStyle: str, openai_api_key: str) -> dict:
+    async def feedback_tests_bits(self, code: str, assistantStyle: str, openai_api_key: str) -> dict:
         test_inputs = [
             (1, 1, 1, 1, None),
             (1, 0, 1, 0, "BIT32"),
@@ -395,7 +361,7 @@ sempre gere como saída um JSON no formato abaixo:
         try:
             exec(code, {}, local_env)
         except Exception as err:
-            return self.error_execution(code, err, openai_api_key, assistantStyle)
+            return await self.error_execution(code, err, openai_api_key, assistantStyle)
 
         strategy_fn = local_env.get("strategy")
         if not strategy_fn:
@@ -422,12 +388,12 @@ sempre gere como saída um JSON no formato abaixo:
                         )
                     })
             except Exception as err:
-                return self.error_execution(code, err, openai_api_key, assistantStyle)
+                return await self.error_execution(code, err, openai_api_key, assistantStyle)
 
-        return self.feedback_outputs_tests_bits(results, openai_api_key, assistantStyle)
+        return await self.feedback_outputs_tests_bits(results, openai_api_key, assistantStyle)
     
     # Feedbacks do jogo BITS
-    def feedback_outputs_tests_bits(self, results, openai_api_key: str, assistantStyle: str) -> dict:
+    async def feedback_outputs_tests_bits(self, results, openai_api_key: str, assistantStyle: str) -> dict:
 
         if assistantStyle == "VERBOSE":
             prompt = f"""
@@ -586,12 +552,12 @@ sempre gere como saída um JSON no formato abaixo:
 }}
     """
 
-        answer = ask_openai(prompt, openai_api_key)
+        cache_key = feedback_key("execution.tests_bits", PROMPTS_VERSION, assistantStyle, code=None, context=results)
+        answer = await ask_openai(prompt, openai_api_key, cache_key=cache_key)
         return answer
 
 
-    def error_execution(self, code: str, erro: Exception, openai_api_key: str, assistantStyle: str) -> str:
-        client = openai.OpenAI(api_key=openai_api_key)
+    async def error_execution(self, code: str, erro: Exception, openai_api_key: str, assistantStyle: str) -> str:
         
         if assistantStyle == "VERBOSE":
             prompt = f"""\
@@ -703,15 +669,16 @@ sempre gere como saída um JSON no formato abaixo:
     "resposta": String
 }}
 """
-        answer = ask_openai(prompt, openai_api_key)
+        cache_key = feedback_key("execution.error", PROMPTS_VERSION, assistantStyle, code=code, context=str(erro))
+        answer = await ask_openai(prompt, openai_api_key, cache_key=cache_key)
         return answer
 
-    def validator_bits(self, code: str, assistantStyle: str, openai_api_key: str) -> dict:
+    async def validator_bits(self, code: str, assistantStyle: str, openai_api_key: str) -> dict:
         local_env = {}
         try:
             exec(code, {}, local_env)
         except Exception as err:
-            return self.error_execution(code, err, openai_api_key, assistantStyle)
+            return await self.error_execution(code, err, openai_api_key, assistantStyle)
 
         strategy_fn = local_env.get("strategy")
         if not strategy_fn:
@@ -738,6 +705,6 @@ sempre gere como saída um JSON no formato abaixo:
             try:
                 _ = strategy_fn(*test_case)
             except Exception as err:
-                return self.error_execution(code, err, openai_api_key, assistantStyle)
+                return await self.error_execution(code, err, openai_api_key, assistantStyle)
 
         return ""
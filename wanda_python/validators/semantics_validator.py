@@ -1,65 +1,29 @@
-import openai
 import ast
-import json
-from openai import OpenAIError
 from typing import Set, Iterable
 import logging
-from opentelemetry import trace
 
 from ..games.registry import GameSpec
+from ..llm.cache import feedback_key
+from ..llm.gateway import ask_openai
 
 logger = logging.getLogger(__name__)
-tracer = trace.get_tracer(__name__)
 
-
-def ask_openai(prompt: str, api_key: str) -> dict:
-    with tracer.start_as_current_span("openai.chat") as span:
-        span.set_attribute("openai.model", "gpt-4o-mini")
-        span.set_attribute("openai.prompt_length", len(prompt))
-
-        client = openai.OpenAI(api_key=api_key)
-
-        system_msg = {
-            "role": "system",
-            "content": (
-                'Responda EXCLUSIVAMENTE com um objeto JSON contendo '
-                'as chaves "pensamento" e "resposta". Nada fora das chaves.'
-            )
-        }
-
-        try:
-            answer = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[system_msg, {"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                max_tokens=600,
-            )
-
-            span.set_attribute("openai.tokens_total", answer.usage.total_tokens)
-            span.set_attribute("openai.tokens_prompt", answer.usage.prompt_tokens)
-            span.set_attribute("openai.tokens_completion", answer.usage.completion_tokens)
-
-            return json.loads(answer.choices[0].message.content)
-
-        except OpenAIError as e:
-            span.record_exception(e)
-            span.set_status(trace.StatusCode.ERROR)
-            logger.error("Erro na chamada OpenAI", exc_info=True)
-            return {"pensamento": "", "resposta": ""}
+# versão dos prompts deste arquivo: mudou um prompt, sobe a versão (invalida o cache de feedbacks)
+PROMPTS_VERSION = "1"
 
 
 class SemanticsValidator:
-    def validator(self, code: str, tree: ast.AST, assistantStyle: str, openai_api_key: str, functionType: str) -> dict:
+    async def validator(self, code: str, tree: ast.AST, assistantStyle: str, openai_api_key: str, functionType: str) -> dict:
         """
         Método orquestrador que chama o validador específico com base em functionType.
         functionType: "jokenpo1" ou "jokenpo2".
         """
         if functionType == "jokenpo1":
-            return self.validate_semantics_jokenpo1(
+            return await self.validate_semantics_jokenpo1(
                 code, tree, assistantStyle, openai_api_key
             )
         elif functionType == "jokenpo2":
-            return self.validate_semantics_jokenpo2(
+            return await self.validate_semantics_jokenpo2(
                 code, tree, assistantStyle, openai_api_key
             )
         else:
@@ -67,7 +31,7 @@ class SemanticsValidator:
                 "Tipo de função não reconhecido. Use 'jokenpo1' ou 'jokenpo2'."
             )
 
-    def validate_semantics_jokenpo1(self, code: str, tree: ast.AST, assistantStyle: str, openai_api_key: str) -> dict:
+    async def validate_semantics_jokenpo1(self, code: str, tree: ast.AST, assistantStyle: str, openai_api_key: str) -> dict:
         """
         Validação semântica para jokenpo1.
         """
@@ -222,10 +186,11 @@ sempre gere como saída um JSON no formato abaixo:
 }}
 """
         # Chama o centralizador que força JSON e faz parsing
-        answer = ask_openai(prompt, openai_api_key)
+        cache_key = feedback_key("semantics.jokenpo1", PROMPTS_VERSION, assistantStyle, code=code)
+        answer = await ask_openai(prompt, openai_api_key, cache_key=cache_key)
         return answer
 
-    def validate_semantics_jokenpo2(self, code: str, tree: ast.AST, assistantStyle: str, openai_api_key: str) -> dict:
+    async def validate_semantics_jokenpo2(self, code: str, tree: ast.AST, assistantStyle: str, openai_api_key: str) -> dict:
         """
         Validação semântica para jokenpo2 (mantido igual ao seu código).
         """
@@ -399,7 +364,8 @@ sempre gere como saída um JSON no formato abaixo:
     "resposta": String
 }}
 """
-        answer = ask_openai(prompt, openai_api_key)
+        cache_key = feedback_key("semantics.jokenpo2", PROMPTS_VERSION, assistantStyle, code=code)
+        answer = await ask_openai(prompt, openai_api_key, cache_key=cache_key)
         return answer
     
     def _extract_used_params(self, tree: ast.AST, expected: Iterable[str]) -> Set[str]:
@@ -424,7 +390,7 @@ sempre gere como saída um JSON no formato abaixo:
 
         return used
     
-    def validate_semantics_bits(self,code: str,tree: ast.AST,assistantStyle: str, openai_api_key: str,spec: GameSpec) -> dict:
+    async def validate_semantics_bits(self,code: str,tree: ast.AST,assistantStyle: str, openai_api_key: str,spec: GameSpec) -> dict:
         """
         Validação semântica para o jogo BITS.
         - Pega a assinatura e retornos válidos do GameSpec.
@@ -585,4 +551,5 @@ sempre gere como saída um JSON no formato abaixo:
     "resposta": String
 }}
 """
-        return ask_openai(prompt, openai_api_key)
+        cache_key = feedback_key("semantics.bits", PROMPTS_VERSION, assistantStyle, code=code)
+        return await ask_openai(prompt, openai_api_key, cache_key=cache_key)
@@ -1,50 +1,16 @@
-import openai
-import json
-from openai import OpenAIError
 import logging
-from opentelemetry import trace
 
-logger = logging.getLogger(__name__)
-tracer = trace.get_tracer(__name__)
-
-def ask_openai(prompt: str, api_key: str) -> dict:
-    with tracer.start_as_current_span("openai.chat") as span:
-        span.set_attribute("openai.model", "gpt-4o-mini")
-        span.set_attribute("openai.prompt_length", len(prompt))
-
-        client = openai.OpenAI(api_key=api_key)
-
-        system_msg = {
-            "role": "system",
-            "content": (
-                'Responda EXCLUSIVAMENTE com um objeto JSON contendo '
-                'as chaves "pensamento" e "resposta". Nada fora das chaves.'
-            )
-        }
+from ..llm.cache import feedback_key
+from ..llm.gateway import ask_openai
 
-        try:
-            answer = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[system_msg, {"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                max_tokens=300,
-            )
-
-            span.set_attribute("openai.tokens_total", answer.usage.total_tokens)
-            span.set_attribute("openai.tokens_prompt", answer.usage.prompt_tokens)
-            span.set_attribute("openai.tokens_completion", answer.usage.completion_tokens)
-
-            return json.loads(answer.choices[0].message.content)
+logger = logging.getLogger(__name__)
 
-        except OpenAIError as e:
-            span.record_exception(e)
-            span.set_status(trace.StatusCode.ERROR)
-            logger.error("Erro na chamada OpenAI", exc_info=True)
-            return {"pensamento": "", "resposta": ""}
+# versão dos prompts deste arquivo: mudou um prompt, sobe a versão (invalida o cache de feedbacks)
+PROMPTS_VERSION = "1"
 
 class SyntaxValidator:
 
-    def validate(self, code: str, assistantStyle: str, openai_api_key: str) -> dict:
+    async def validate(self, code: str, assistantStyle: str, openai_api_key: str) -> dict:
         """
         Valida a sintaxe e a indentação do código.
         Retorna uma string vazia se não houver erros, 
@@ -54,10 +20,10 @@ class SyntaxValidator:
             compile(code, "<string>", "exec")
             return ""
         except (SyntaxError, IndentationError) as err:
-            llm_answer = self.feedback_sintaxe_openai(code, err, assistantStyle, openai_api_key) # Chama a função que usa a IA
+            llm_answer = await self.feedback_sintaxe_openai(code, err, assistantStyle, openai_api_key) # Chama a função que usa a IA
             return llm_answer # Resposta da LLM
     
-    def feedback_sintaxe_openai(self, code: str, erro: str, assistantStyle: str, openai_api_key: str) -> dict:
+    async def feedback_sintaxe_openai(self, code: str, erro: str, assistantStyle: str, openai_api_key: str) -> dict:
 
         prompt_verbose = f"""
 Você é um assistente virtual de programação Python integrado à plataforma Wanda,
@@ -154,5 +120,6 @@ sempre gere como saída um JSON no formato abaixo:
         else:
             prompt = prompt_intermediary
 
-        answer = ask_openai(prompt, openai_api_key)
+        cache_key = feedback_key("syntax", PROMPTS_VERSION, assistantStyle, code=code, context=str(erro))
+        answer = await ask_openai(prompt, openai_api_key, max_tokens=300, cache_key=cache_key)
         return answer
\ No newline at end of file